@@ -1,57 +1,112 @@
 # backend/ab_tester.py
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel, Field
-from resume_parser import analyze_resume # Reusing your existing parser
+
+from ats_scorer import rank_resumes
+from resume_parser import extract_resume_text  # Cached by content hash, no LLM
 
 load_dotenv()
 
 llm = ChatGroq(
-    temperature=0.4, 
+    temperature=0.4,
     model_name="llama-3.3-70b-versatile",
     groq_api_key=os.getenv("GROQ_API_KEY")
 )
 
+# --- STRATEGIES ---
+# name -> (display name, brief for the writer)
+STRATEGIES = {
+    "specialist": ("The Specialist", "Focus purely on hard skills, keywords, and technical depth matching the JD. Remove fluff."),
+    "generalist": ("The Generalist", "Focus on soft skills, adaptability, culture fit, and potential."),
+    "impact": ("The Closer", "Lead every bullet with a measurable outcome (latency, revenue, users, cost). Numbers first."),
+    "leader": ("The Leader", "Emphasize ownership, mentoring, cross-team decisions and scope of responsibility."),
+}
+DEFAULT_STRATEGIES = ["specialist", "generalist"]
+MAX_VARIANTS = int(os.getenv("AB_MAX_VARIANTS", "4"))
+
+
 class ResumeVariant(BaseModel):
     variant_name: str
     strategy_explanation: str
     tailored_content: str = Field(..., description="The full markdown/text of the new resume.")
 
-class ABTestResult(BaseModel):
-    variant_a: ResumeVariant
-    variant_b: ResumeVariant
-    recommendation: str
 
-def run_ab_test(file_path: str, job_description: str):
-    """
-    Generates two strategic variations of a resume.
-    """
-    # 1. Parse Original Resume
-    current_resume_content = analyze_resume(file_path)
-    
-    # 2. Define Strategies
+def generate_variant(resume_text: str, job_description: str, strategy: str) -> dict:
+    """One strategy, one call. Independent of the other variants so they can run side by side."""
+    display_name, brief = STRATEGIES[strategy]
     system_prompt = (
         f"You are a Career Scientist running an A/B Test on a candidate's resume. "
-        f"Job Description: {job_description}. "
-        f"Candidate Profile: {current_resume_content}. "
-        f"\n\n"
-        f"TASK: Generate two distinct versions of the resume:\n"
-        f"VARIANT A (The Specialist): Focus purely on hard skills, keywords, and technical depth matching the JD. Remove fluff.\n"
-        f"VARIANT B (The Generalist): Focus on soft skills, adaptability, culture fit, and potential. "
-        f"\n"
-        f"Finally, recommend which one fits this specific Job Description better."
+        f"Rewrite the resume as VARIANT '{display_name}': {brief} "
+        f"Do NOT invent skills or experience the candidate doesn't have."
     )
-    
-    structured_llm = llm.with_structured_output(ABTestResult)
-    
-    try:
-        result = structured_llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content="Generate the A/B variants.")
-        ])
-        return result.dict()
-    except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+    structured_llm = llm.with_structured_output(ResumeVariant)
+    variant = structured_llm.invoke([
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=f"JOB DESCRIPTION:\n{job_description}\n\nCURRENT RESUME:\n{resume_text}")
+    ])
+    return {"strategy": strategy, **variant.dict()}
+
+
+def _recommend(variants: List[dict], baseline: int) -> str:
+    ranked = sorted(variants, key=lambda v: -v["match_score"])
+    best = ranked[0]
+    text = f"'{best['variant_name']}' scores {best['match_score']}/100 against the JD (original resume: {baseline})"
+    if len(ranked) > 1:
+        runner_up = ranked[1]
+        text += f", ahead of '{runner_up['variant_name']}' at {runner_up['match_score']}"
+    text += "."
+    if best["missing_keywords"]:
+        text += f" Still missing: {', '.join(best['missing_keywords'][:5])}."
+    return text
+
+
+def run_ab_test(file_path: str, job_description: str, strategies: Optional[List[str]] = None,
+                target_role: str = "Software Engineer"):
+    """
+    Generates strategic variations of a resume and lets the local ATS scorer pick the winner.
+    1. Reads the (cached) extracted text.
+    2. Writes every variant concurrently, one call per strategy: wall time ~ one variant.
+    3. Scores all variants plus the original against the JD in one vectorized pass.
+    """
+    strategies = [s for s in dict.fromkeys(strategies or DEFAULT_STRATEGIES) if s in STRATEGIES][:MAX_VARIANTS]
+    if not strategies:
+        return {"error": f"No known strategy. Choose from: {', '.join(STRATEGIES)}"}
+
+    resume_text = extract_resume_text(file_path)
+    if not resume_text:
+        return {"error": "Failed to read resume file."}
+
+    print(f"--- [A/B] Generating {len(strategies)} variants concurrently: {strategies} ---")
+    variants, failures = [], []
+    with ThreadPoolExecutor(max_workers=len(strategies), thread_name_prefix="ab-variant") as pool:
+        futures = [(s, pool.submit(generate_variant, resume_text, job_description, s)) for s in strategies]
+        for strategy, future in futures:
+            try:
+                variants.append(future.result())
+            except Exception as e:
+                print(f"A/B Variant Error ({strategy}): {e}")
+                failures.append({"strategy": strategy, "error": str(e)})
+
+    if not variants:
+        return {"error": failures[0]["error"] if failures else "No variants generated."}
+
+    # Same scorer as the ATS check; the original goes last as the baseline
+    scores = rank_resumes([v["tailored_content"] for v in variants] + [resume_text], job_description, target_role)
+    for variant, score in zip(variants, scores):
+        variant.update({k: score[k] for k in ("match_score", "matched_keywords", "missing_keywords")})
+    baseline = scores[-1]["match_score"]
+
+    return {
+        "variants": variants,
+        "failed": failures,
+        "baseline_score": baseline,
+        "recommended": max(variants, key=lambda v: v["match_score"])["strategy"],
+        "recommendation": _recommend(variants, baseline),
+    }
@@ -0,0 +1,261 @@
+# backend/ats_scorer.py
+
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# --- SKILL DICTIONARY ---
+# canonical term -> surface forms seen in resumes / JDs (lowercase)
+SKILL_TERMS: Dict[str, List[str]] = {
+    "python": ["python", "python3"],
+    "java": ["java"],
+    "javascript": ["javascript", "js", "ecmascript", "es6"],
+    "typescript": ["typescript", "ts"],
+    "go": ["golang", "go lang"],
+    "rust": ["rust", "rustlang"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", "csharp", ".net", "dotnet"],
+    "ruby": ["ruby", "rails", "ruby on rails"],
+    "php": ["php", "laravel"],
+    "kotlin": ["kotlin"],
+    "swift": ["swift", "swiftui", "swift ui"],
+    "scala": ["scala"],
+    "sql": ["sql", "t-sql", "pl/sql"],
+    "postgresql": ["postgresql", "postgres", "psql"],
+    "mysql": ["mysql", "mariadb"],
+    "mongodb": ["mongodb", "mongo"],
+    "redis": ["redis"],
+    "elasticsearch": ["elasticsearch", "opensearch", "elastic search"],
+    "kafka": ["kafka"],
+    "rabbitmq": ["rabbitmq"],
+    "graphql": ["graphql"],
+    "rest": ["rest", "restful", "rest api", "rest apis", "rest services"],
+    "grpc": ["grpc"],
+    "react": ["react", "reactjs", "react.js"],
+    "next.js": ["next.js", "nextjs"],
+    "vue": ["vue", "vuejs", "vue.js"],
+    "angular": ["angular", "angularjs"],
+    "redux": ["redux"],
+    "html": ["html", "html5"],
+    "css": ["css", "css3", "sass", "scss"],
+    "tailwind": ["tailwind", "tailwindcss"],
+    "node.js": ["node.js", "nodejs"],
+    "express": ["express.js", "expressjs"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "spring": ["spring", "spring boot", "springboot", "spring framework", "spring mvc"],
+    "docker": ["docker", "containers", "containerization", "docker containers"],
+    "kubernetes": ["kubernetes", "k8s", "helm"],
+    "terraform": ["terraform", "infrastructure as code", "iac"],
+    "aws": ["aws", "amazon web services", "ec2", "s3", "lambda"],
+    "gcp": ["gcp", "google cloud", "bigquery"],
+    "azure": ["azure"],
+    "ci/cd": ["ci/cd", "cicd", "continuous integration", "continuous delivery", "github actions", "jenkins", "gitlab ci"],
+    "linux": ["linux", "unix", "bash", "shell scripting"],
+    "git": ["git", "github", "gitlab"],
+    "microservices": ["microservices", "microservice", "service oriented"],
+    "system design": ["system design", "distributed systems", "scalability", "high availability"],
+    "testing": ["unit testing", "unit tests", "pytest", "jest", "tdd", "test driven", "integration testing"],
+    "machine learning": ["machine learning", "ml", "scikit-learn", "sklearn"],
+    "deep learning": ["deep learning", "pytorch", "tensorflow", "keras", "neural networks"],
+    "llm": ["llm", "llms", "large language models", "langchain", "langgraph", "rag", "prompt engineering"],
+    "nlp": ["nlp", "natural language processing"],
+    "data analysis": ["data analysis", "pandas", "numpy", "data analytics"],
+    "spark": ["spark", "pyspark", "databricks"],
+    "airflow": ["airflow", "etl", "data pipelines"],
+    "security": ["security", "application security", "web security", "owasp", "oauth", "authentication", "encryption"],
+    "agile": ["agile", "scrum", "kanban"],
+    "leadership": ["leadership", "mentoring", "mentored", "led a team", "team lead"],
+    "communication": ["communication", "stakeholder", "stakeholders", "cross-functional"],
+}
+
+# Bare forms that are also ordinary English ("the rest of the team", "every spring", "platform security").
+# They only count as a skill when they stand alone as a list item ("Skills: Java, Spring, REST");
+# in running prose only a qualified form ("spring boot", "rest api", "restful") matches.
+AMBIGUOUS_ALIASES = {"rest", "spring", "security", "swift", "rust", "containers", "lambda", "helm", "spark", "rails", "rag"}
+
+# Soft / generic terms count for less than hard skills
+TERM_WEIGHTS = {"agile": 0.5, "communication": 0.4, "leadership": 0.6, "git": 0.5}
+
+# Used when no job description is supplied: typical asks for the target role
+ROLE_PROFILES: Dict[str, List[str]] = {
+    "frontend": ["javascript", "typescript", "react", "next.js", "html", "css", "testing", "git"],
+    "backend": ["python", "sql", "postgresql", "rest", "docker", "microservices", "system design", "testing"],
+    "full stack": ["javascript", "typescript", "react", "node.js", "sql", "rest", "docker", "git"],
+    "data": ["python", "sql", "data analysis", "spark", "airflow", "machine learning"],
+    "machine learning": ["python", "machine learning", "deep learning", "data analysis", "llm", "sql"],
+    "ai": ["python", "llm", "machine learning", "deep learning", "nlp", "rest"],
+    "devops": ["linux", "docker", "kubernetes", "terraform", "aws", "ci/cd", "python"],
+    "mobile": ["kotlin", "swift", "rest", "git", "testing"],
+    "software engineer": ["python", "javascript", "sql", "git", "testing", "system design", "rest", "docker"],
+}
+
+SECTION_HEADINGS = {
+    "summary": ["summary", "profile", "objective", "about me", "professional summary"],
+    "experience": ["experience", "work experience", "employment", "professional experience", "work history"],
+    "skills": ["skills", "technical skills", "technologies", "tech stack", "core competencies"],
+    "education": ["education", "academic background", "qualifications"],
+    "projects": ["projects", "personal projects", "side projects", "open source"],
+    "certifications": ["certifications", "certificates", "licenses"],
+}
+
+# --- VOCABULARY (built once at import) ---
+VOCAB: List[str] = list(SKILL_TERMS)
+TERM_INDEX = {term: i for i, term in enumerate(VOCAB)}
+WEIGHTS = np.array([TERM_WEIGHTS.get(term, 1.0) for term in VOCAB])
+
+_ALIASES = sorted(((alias, TERM_INDEX[term]) for term, aliases in SKILL_TERMS.items() for alias in aliases),
+                  key=lambda item: -len(item[0]))
+# One alternation, longest alias first, bounded so 'java' doesn't fire inside 'javascript'
+_ALIAS_RE = re.compile(
+    r"(?<![\w+#.])(" + "|".join(re.escape(a) for a, _ in _ALIASES if a not in AMBIGUOUS_ALIASES) + r")(?![\w+#]|\.\w)"
+    # Ambiguous bare forms: a whole item between list delimiters (or line ends)
+    r"|(?:^|(?<=[,;:/|(•*\-]))[ \t]*(" + "|".join(re.escape(a) for a in sorted(AMBIGUOUS_ALIASES))
+    + r")(?=[ \t]*(?:[,;/|).•]|$))",
+    re.MULTILINE)
+_ALIAS_TO_INDEX = dict(_ALIASES)
+
+# BM25 term-frequency saturation
+K1 = 0.9
+B = 0.5
+# Fixed corpus statistic for length normalization (a typical 1-2 page resume). Normalizing by the
+# submitted pool's mean instead would make a resume's score depend on who else is in the batch.
+AVG_RESUME_WORDS = 450.0
+PASS_THRESHOLD = 70
+
+
+def term_indices(text: str) -> np.ndarray:
+    """Vocabulary index of every skill mention in text (sparse representation: one int per hit)."""
+    return np.fromiter((_ALIAS_TO_INDEX[m.group(1) or m.group(2)] for m in _ALIAS_RE.finditer(text.lower())), dtype=np.int64)
+
+
+def term_counts(texts: List[str]) -> np.ndarray:
+    """Documents x vocabulary count matrix, built from the sparse hit lists with one bincount per document."""
+    counts = np.zeros((len(texts), len(VOCAB)), dtype=np.float64)
+    for row, text in enumerate(texts):
+        hits = term_indices(text)
+        if hits.size:
+            counts[row] = np.bincount(hits, minlength=len(VOCAB))
+    return counts
+
+
+def _has_phrase(tokens: List[str], phrase: List[str]) -> bool:
+    n = len(phrase)
+    return any(tokens[i:i + n] == phrase for i in range(len(tokens) - n + 1))
+
+
+def role_query(target_role: str) -> np.ndarray:
+    # Whole-token match: 'ai' must not fire inside 'maintenance' or 'retail'
+    tokens = re.findall(r"[a-z0-9+#]+", target_role.lower())
+    terms = next((profile for key, profile in ROLE_PROFILES.items() if _has_phrase(tokens, key.split())),
+                 ROLE_PROFILES["software engineer"])
+    query = np.zeros(len(VOCAB))
+    query[[TERM_INDEX[t] for t in terms]] = 1.0
+    return query
+
+
+def build_query(job_description: str = "", target_role: str = "Software Engineer") -> np.ndarray:
+    """JD skill counts, or the role's default profile when the JD is empty or names no known skill."""
+    query = term_counts([job_description])[0] if job_description.strip() else np.zeros(len(VOCAB))
+    return query if query.any() else role_query(target_role)
+
+
+def heading_kind(line: str) -> Optional[str]:
+    """The section a line opens if it is just a known heading ('Work Experience:'), else None."""
+    label = line.strip().strip(":").strip().lower()
+    if not label or len(label) >= 40:
+        return None
+    return next((name for name, heads in SECTION_HEADINGS.items() if label in heads), None)
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Cheap heading-based split: a line that is just a known heading starts a new section."""
+    sections, current = {"header": []}, "header"
+    for line in text.splitlines():
+        found = heading_kind(line)
+        if found:
+            current = found
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines) for name, lines in sections.items()}
+
+
+def _scores_from_counts(counts: np.ndarray, lengths: np.ndarray, query: np.ndarray) -> np.ndarray:
+    q_weight = np.where(query > 0, (1 + np.log(np.maximum(query, 1))) * WEIGHTS, 0.0)
+    norm = 1 - B + B * lengths / AVG_RESUME_WORDS
+    saturation = counts * (K1 + 1) / (counts + K1 * norm[:, None]) / (K1 + 1)
+    per_term = 0.6 * (counts > 0) + 0.4 * saturation
+    return np.round(100 * (per_term @ q_weight) / q_weight.sum()).astype(int)
+
+
+def score_many(resume_texts: List[str], job_description: str = "", target_role: str = "Software Engineer") -> np.ndarray:
+    """
+    Scores every resume against one JD in a single vectorized pass. Returns match scores (0-100).
+    Each JD skill is weighted by (1 + log tf_jd) x term weight; a resume earns 60% of that weight
+    for mentioning the skill and the remaining 40% on a BM25-saturated frequency curve.
+    """
+    query = build_query(job_description, target_role)
+    lengths = np.array([max(len(t.split()), 1) for t in resume_texts], dtype=np.float64)
+    return _scores_from_counts(term_counts(resume_texts), lengths, query)
+
+
+def rank_resumes(resume_texts: List[str], job_description: str = "", target_role: str = "Software Engineer") -> List[dict]:
+    """
+    Scores a whole applicant pool at once and returns one entry per input (same order):
+    {"index", "match_score", "matched_keywords", "missing_keywords"}, plus "rank" (1 = best).
+    """
+    if not resume_texts:
+        return []
+    query = build_query(job_description, target_role)
+    counts = term_counts(resume_texts)
+    lengths = np.array([max(len(t.split()), 1) for t in resume_texts], dtype=np.float64)
+    scores = _scores_from_counts(counts, lengths, query)
+
+    wanted = np.flatnonzero(query)
+    present = counts[:, wanted] > 0  # candidates x JD skills
+    order = np.argsort(-scores, kind="stable")
+    ranks = np.empty_like(order)
+    ranks[order] = np.arange(1, len(order) + 1)
+
+    return [{
+        "index": i,
+        "rank": int(ranks[i]),
+        "match_score": int(scores[i]),
+        "matched_keywords": [VOCAB[t] for t in wanted[present[i]]],
+        "missing_keywords": [VOCAB[t] for t in wanted[~present[i]]],
+    } for i in range(len(resume_texts))]
+
+
+def score_resume(resume_text: str, job_description: str = "", target_role: str = "Software Engineer") -> dict:
+    """
+    Deterministic ATS check in milliseconds: score, matched/missing keywords and section coverage.
+    No LLM involved.
+    """
+    query = build_query(job_description, target_role)
+    resume_vector = term_counts([resume_text])[0]
+
+    wanted = np.flatnonzero(query)
+    matched = [VOCAB[i] for i in wanted if resume_vector[i] > 0]
+    missing = [VOCAB[i] for i in wanted[np.argsort(-query[wanted] * WEIGHTS[wanted], kind="stable")] if resume_vector[i] == 0]
+
+    sections = split_sections(resume_text)
+    coverage = {}
+    for name in SECTION_HEADINGS:
+        if name in sections:
+            hits = term_counts([sections[name]])[0]
+            coverage[name] = {"present": True, "keywords": [VOCAB[i] for i in wanted if hits[i] > 0]}
+        else:
+            coverage[name] = {"present": False, "keywords": []}
+
+    score = int(score_many([resume_text], job_description, target_role)[0])
+    return {
+        "match_score": score,
+        "matched_keywords": matched,
+        "missing_keywords": missing,
+        "section_coverage": coverage,
+        "verdict": "Pass" if score >= PASS_THRESHOLD else "Fail",
+        "engine": "local",
+    }
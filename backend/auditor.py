@@ -1,26 +1,98 @@
 import requests
-import base64
+import codecs
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 import os
+from typing import Optional
+
+from requests.adapters import HTTPAdapter
+
+from github_cache import ConditionalCache, github_cache
+
+# --- CONFIGURATION ---
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("GITHUB_MAX_CONNECTIONS", "4"))
+AUDIT_LATENCY_BUDGET = float(os.getenv("AUDIT_LATENCY_BUDGET", "8"))  # Seconds for a full deep-context audit
+REQUEST_TIMEOUT = 5
+CODE_FILE_CHAR_LIMIT = 2000
+RAW_MEDIA_TYPE = "application/vnd.github.raw+json"  # Contents API returns the file bytes instead of base64 JSON
 
 class GitHubAuditor:
-    def __init__(self):
+    def __init__(self, cache: Optional[ConditionalCache] = None):
         self.base_url = "https://api.github.com"
         # Optional: Use token if available to avoid rate limits
         self.token = os.getenv("GITHUB_TOKEN")
         self.headers = {"Authorization": f"token {self.token}"} if self.token else {}
+        # Conditional-request cache (ETag / Last-Modified). 304s don't count against the rate limit.
+        self.cache = cache or github_cache
 
-    def _safe_get(self, url: str):
-        """Helper to handle network errors gracefully."""
+        # One keep-alive session for every call, capped at MAX_CONNECTIONS_PER_HOST sockets to api.github.com
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONNECTIONS_PER_HOST, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=MAX_CONNECTIONS_PER_HOST, thread_name_prefix="gh-fetch")
+
+    def _cached_fetch(self, cache_key: str, url: str, read_body, headers: Optional[dict] = None, timeout: float = REQUEST_TIMEOUT):
+        """
+        Conditional GET through the shared session.
+        read_body(response) turns a 200 into the value we cache (parsed JSON, truncated text...).
+        """
+        entry = self.cache.lookup(cache_key)
+        if entry and entry["fresh"]:
+            self.cache.record_hit()
+            return entry["body"]
+
+        request_headers = {**self.headers, **(headers or {}), **self.cache.conditional_headers(entry)}
         try:
-            response = requests.get(url, headers=self.headers, timeout=5)
-            if response.status_code == 200:
-                return response.json()
-            return None
+            response = self.session.get(url, headers=request_headers, timeout=timeout, stream=True)
+            try:
+                self.cache.record_rate_limit(response.headers)
+
+                if response.status_code == 304 and entry:
+                    self.cache.mark_revalidated(cache_key, entry)
+                    return entry["body"]
+                if response.status_code == 200:
+                    self.cache.record_miss()
+                    body = read_body(response)
+                    self.cache.store(cache_key, body, response.headers)
+                    return body
+                return None
+            finally:
+                response.close()
         except Exception as e:
             print(f"GitHub API Error ({url}): {e}")
             return None
 
+    def _safe_get(self, url: str, timeout: float = REQUEST_TIMEOUT):
+        """Helper to handle network errors gracefully. Serves from the conditional cache when possible."""
+        return self._cached_fetch(url, url, lambda response: response.json(), timeout=timeout)
+
+    @staticmethod
+    def _read_truncated(response, max_chars: Optional[int]):
+        """
+        Decodes the body chunk by chunk and stops reading once max_chars is exceeded,
+        so a 2 MB file costs a few KB of transfer instead of a full download + base64 decode.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        parts, size = [], 0
+        for chunk in response.iter_content(chunk_size=4096):
+            text = decoder.decode(chunk)
+            parts.append(text)
+            size += len(text)
+            if max_chars is not None and size > max_chars:
+                break
+        else:
+            parts.append(decoder.decode(b"", final=True))
+
+        content = "".join(parts)
+        if max_chars is not None and len(content) > max_chars:
+            return content[:max_chars] + "..."
+        return content
+
+    def cache_stats(self):
+        """Cache hits and the remaining GitHub rate-limit budget."""
+        return self.cache.stats()
+
     def get_user_data(self, username: str):
         return self._safe_get(f"{self.base_url}/users/{username}")
 
@@ -28,24 +100,29 @@ class GitHubAuditor:
         data = self._safe_get(f"{self.base_url}/users/{username}/events/public")
         return data if data else []
 
-    def get_file_content(self, url: str):
-        """Fetches and decodes Base64 file content from GitHub."""
-        data = self._safe_get(url)
-        if data and "content" in data and data.get("encoding") == "base64":
-            try:
-                return base64.b64decode(data["content"]).decode("utf-8", errors="ignore")
-            except Exception:
-                return "[Error decoding file content]"
-        return "[No content or not base64 encoded]"
+    def get_file_content(self, url: str, max_chars: Optional[int] = None, timeout: float = REQUEST_TIMEOUT):
+        """Streams raw file content from GitHub, truncated to max_chars (with a '...' marker)."""
+        content = self._cached_fetch(
+            f"{url}#raw:{max_chars}", url,
+            lambda response: self._read_truncated(response, max_chars),
+            headers={"Accept": RAW_MEDIA_TYPE},
+            timeout=timeout,
+        )
+        return content if content is not None else "[No content or fetch failed]"
 
-    def fetch_top_repo_context(self, username: str):
+    def fetch_top_repo_context(self, username: str, budget_seconds: float = AUDIT_LATENCY_BUDGET):
         """
         New Feature: Deep Context Audit
         1. Finds the user's most popular repository (by stars).
-        2. Fetches the README and up to 2 code files.
+        2. Fetches the README and up to 2 code files concurrently, within a latency budget.
         """
         print(f"Fetching Deep Context for {username}...")
-        repos = self._safe_get(f"{self.base_url}/users/{username}/repos?sort=updated&per_page=5")
+        deadline = time.monotonic() + budget_seconds
+
+        def remaining():
+            return max(0.5, min(REQUEST_TIMEOUT, deadline - time.monotonic()))
+
+        repos = self._safe_get(f"{self.base_url}/users/{username}/repos?sort=updated&per_page=5", timeout=remaining())
         
         if not repos:
             return {"error": "No public repositories found."}
@@ -56,7 +133,7 @@ class GitHubAuditor:
         
         # Get file list (root directory)
         contents_url = top_repo['contents_url'].replace("{+path}", "")
-        files = self._safe_get(contents_url)
+        files = self._safe_get(contents_url, timeout=remaining())
         
         context_data = {
             "repo_name": repo_name,
@@ -70,18 +147,35 @@ class GitHubAuditor:
 
         # Strategy: Get README + First 2 Code Files (py, js, ts, go, rs)
         target_extensions = ('.py', '.js', '.ts', '.go', '.rs', '.java', '.cpp')
+        selected = []
         code_file_count = 0
         
         for file in files:
             if file['name'].lower() == "readme.md":
-                context_data["files"]["README.md"] = self.get_file_content(file['url'])
+                selected.append(("README.md", file['url'], None))
             
             elif file['name'].endswith(target_extensions) and code_file_count < 2:
-                content = self.get_file_content(file['url'])
                 # Truncate large files to save tokens
-                context_data["files"][file['name']] = content[:2000] + ("..." if len(content)>2000 else "")
+                selected.append((file['name'], file['url'], CODE_FILE_CHAR_LIMIT))
                 code_file_count += 1
 
+        # Fan out over the pooled session; whatever misses the deadline is reported, not awaited
+        futures = [
+            (name, self.pool.submit(self.get_file_content, url, limit, remaining()))
+            for name, url, limit in selected
+        ]
+        done, pending = wait([f for _, f in futures], timeout=max(0, deadline - time.monotonic()))
+
+        for name, future in futures:
+            if future in done:
+                context_data["files"][name] = future.result()
+
+        if pending:
+            for future in pending:
+                future.cancel()
+            context_data["skipped_files"] = [name for name, future in futures if future in pending]
+            print(f"Deep Context: latency budget hit, skipped {context_data['skipped_files']}")
+
         return context_data
 
     def calculate_trust_score(self, username: str):
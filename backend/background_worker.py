@@ -1,45 +1,82 @@
-import time
 import os
+import signal
+import threading
 from dotenv import load_dotenv
 from typing import List
 
 # Import Engines
 from database import db_manager
-from job_fetcher import hunt_opportunities
+from job_fetcher import match_shared_postings
 from networking_agent import generate_cold_outreach
 from kanban import add_application, Application
+from hunt_scheduler import HuntScheduler
+from hunt_jobs import get_job_store, SupabaseJobStore
+from posting_fingerprints import fingerprint_index, normalize_key, SupabaseFingerprintIndex
 
 load_dotenv()
 
 # --- CONFIGURATION ---
-SLEEP_INTERVAL = 3600  # Run every hour (simulated)
-# In production, this would be 24h or triggered by cron
+# Per-user hunt interval, jitter, pool size and timeouts live in hunt_scheduler (HUNT_* env vars)
+USER_REFRESH_INTERVAL = int(os.getenv("HUNT_USER_REFRESH", "300"))  # Re-read the active user list / log stats
+
+def cards_on_board(user_id: str, urls: List[str]) -> set:
+    """Source URLs among `urls` that already have a card on the user's Kanban board."""
+    if not urls or not db_manager.enabled:
+        return set()
+    rows = db_manager.supabase.table("applications").select("source_url").eq("user_id", user_id).in_("source_url", urls).execute()
+    return {row["source_url"] for row in rows.data or []}
 
 def process_user_hunt(user_id: str, target_role: str, location: str, skill_gaps: List[str]):
     """
     The autonomous loop for a single user.
-    1. Finds jobs.
-    2. Filters for high matches (>80%).
+    1. Finds jobs, keeping only postings not yet evaluated for this user.
+    2. Filters for high matches (>80%) the user hasn't been shown yet.
     3. Drafts a cold email.
-    4. Adds to Kanban.
+    4. Adds every new card to Kanban in one batched insert, then marks the evaluated postings as processed.
     """
     print(f"--- [Shadow Hunter] Stalking jobs for User {user_id} ({target_role}) ---")
     
     # 1. Hunt
-    # Note: hunt_opportunities returns a dict with 'opportunities' list
-    hunt_result = hunt_opportunities(target_role, skill_gaps, location)
+    # Search + extraction are shared by everyone hunting the same (role, location);
+    # only the match_score against this user's gaps is computed per user (locally).
+    hunt_result = match_shared_postings(target_role, skill_gaps, location)
     
     if "error" in hunt_result:
         print(f"Error hunting for {user_id}: {hunt_result['error']}")
         return
 
     opportunities = hunt_result.get("opportunities", [])
-    print(f"Found {len(opportunities)} raw results.")
+    # Incremental: postings already evaluated for this user (in any run, on any node) are skipped outright.
+    # Only URLs the shared extraction actually looked at get marked, so postings cut before it stay eligible.
+    evaluated = hunt_result.get("evaluated", [])
+    done = fingerprint_index.processed(user_id, evaluated)
+    pending = [url for url in evaluated if url not in done]
+    fresh = [job for job in opportunities if job["apply_link_guess"] not in done]
+    print(f"Found {len(opportunities)} raw results, {len(fresh)} not yet evaluated for this user.")
+    if not pending:
+        return
+    # A run that inserted its cards but died before recording them leaves them on the board
+    on_board = cards_on_board(user_id, [job["apply_link_guess"] for job in fresh if job["match_score"] >= 80])
 
     # 2. Analyze & Act
-    for job in opportunities:
+    cards, carded_jobs, recovered, batch_keys = [], [], [], set()
+    known = fingerprint_index.fingerprints(user_id)  # One read of the user's board for the whole run
+    for job in fresh:
         # Only act on high-quality matches
         if job["match_score"] >= 80:
+            if job["apply_link_guess"] in on_board:
+                print(f"  -> ON BOARD: {job['role_title']} at {job['company']}")
+                recovered.append(job)
+                continue
+            # Skip postings already on the board (same company+title, or a reposted/reworded ad)
+            # before paying for an outreach draft
+            duplicate_of = fingerprint_index.find_duplicate(user_id, job['company'], job['role_title'], job.get('description', ''), known)
+            job_key = normalize_key(job['company'], job['role_title'])
+            if duplicate_of or job_key in batch_keys:
+                print(f"  -> SEEN: {job['role_title']} at {job['company']} (matches '{duplicate_of or job_key}')")
+                continue
+            batch_keys.add(job_key)
+
             print(f"  -> HIT: {job['role_title']} at {job['company']} (Score: {job['match_score']})")
             
             # 3. Auto-Networking (Draft the email)
@@ -51,8 +88,8 @@ def process_user_hunt(user_id: str, target_role: str, location: str, skill_gaps:
                 job_context=job['why_good_fit']
             )
             
-            # 4. Add to Kanban (The "Proactive" Step)
-            # We use the existing 'add_application' function but with a special status
+            # 4. Build the Kanban card (The "Proactive" Step)
+            # Same shape as 'add_application' but with a special status
             new_app = Application(
                 role_title=job['role_title'],
                 company_name=job['company'],
@@ -65,53 +102,88 @@ def process_user_hunt(user_id: str, target_role: str, location: str, skill_gaps:
                     f"--- DRAFT EMAIL ---\nSubject: {email_draft.get('subject_line')}\n\n{email_draft.get('email_body')}"
                 )
             )
-            
-            # Verify DB connection before write
-            if db_manager.enabled:
-                # We manually inject user_id since add_application expects it from Depends() usually
-                # Here we are the backend system, so we bypass Depends
-                app_dict = new_app.dict()
-                app_dict["user_id"] = user_id
-                
-                try:
-                    db_manager.supabase.table("applications").insert(app_dict).execute()
-                    print(f"     [+] Added to Kanban Board.")
-                except Exception as e:
-                    print(f"     [-] DB Error: {e}")
-            else:
-                print("     [!] DB Offline. Skipping save.")
+            # We manually inject user_id since add_application expects it from Depends() usually
+            # Here we are the backend system, so we bypass Depends
+            app_dict = new_app.dict()
+            app_dict["user_id"] = user_id
+            app_dict["source_url"] = job["apply_link_guess"]
+            cards.append(app_dict)
+            carded_jobs.append(job)
+
+    # 5. One write for the whole run. Postings are marked processed only once their cards have landed;
+    # every step is safe to repeat (the board is checked by source_url, fingerprints and marks ignore repeats)
+    if cards:
+        if not db_manager.enabled:
+            print("     [!] DB Offline. Skipping save.")
+            return
+        try:
+            db_manager.supabase.table("applications").insert(cards).execute()
+            print(f"     [+] Added {len(cards)} cards to Kanban Board.")
+        except Exception as e:
+            print(f"     [-] DB Error: {e}")
+            return
+    fingerprint_index.add_many(user_id, carded_jobs + recovered)
+    fingerprint_index.mark_processed(user_id, pending)
+
+def load_active_users() -> List[dict]:
+    """
+    Users the Shadow Hunter works for.
+    In a real app, select distinct users from 'preferences' table.
+    Here, we simulate 1 active user for demonstration.
+    """
+    return [
+        {
+            "id": "dev-user-id",
+            "role": "Full Stack Engineer",
+            "location": "Remote",
+            "gaps": ["Kubernetes", "GraphQL"]
+        }
+    ]
+
+def run_user_hunt(user: dict):
+    process_user_hunt(
+        user_id=user['id'],
+        target_role=user['role'],
+        location=user['location'],
+        skill_gaps=user['gaps']
+    )
 
 def main_loop():
     """
-    Simulates the background worker process.
+    The background worker process.
+    Every user runs on their own schedule (hourly +/- jitter) on a bounded worker pool,
+    so one slow hunt never holds up the rest. Ctrl+C / SIGTERM drains in-flight hunts before exiting.
+    Users are claimed from the shared job store under leases, so several copies of this
+    worker (processes or machines) can run side by side without double-hunting anyone.
     """
     print("--- [System] Background Worker Started. Press Ctrl+C to stop. ---")
-    
-    while True:
-        # 1. Fetch Active Users
-        # In a real app, select distinct users from 'preferences' table.
-        # Here, we simulate 1 active user for demonstration.
-        active_users = [
-            {
-                "id": "dev-user-id",
-                "role": "Full Stack Engineer",
-                "location": "Remote",
-                "gaps": ["Kubernetes", "GraphQL"]
-            }
-        ]
-        
-        # 2. Process Batch
-        for user in active_users:
-            process_user_hunt(
-                user_id=user['id'],
-                target_role=user['role'],
-                location=user['location'],
-                skill_gaps=user['gaps']
-            )
-            
-        # 3. Sleep
-        print(f"--- [System] Sleeping for {SLEEP_INTERVAL}s... ---")
-        time.sleep(SLEEP_INTERVAL)
+
+    job_store = get_job_store()
+    # Any node may claim any user from the shared queue, so their dedup state must be shared too
+    if isinstance(job_store, SupabaseJobStore) and not isinstance(fingerprint_index, SupabaseFingerprintIndex):
+        raise RuntimeError("HUNT_JOB_STORE=supabase requires FINGERPRINT_STORE=supabase.")
+    scheduler = HuntScheduler(run_user_hunt, job_store=job_store)
+    stop_event = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop_event.set())
+
+    dispatcher = threading.Thread(target=scheduler.run, args=(stop_event,), name="hunt-dispatcher")
+    dispatcher.start()
+
+    while not stop_event.is_set():
+        # 1. Keep the schedule in line with the active user list
+        try:
+            scheduler.sync_users(load_active_users())
+        except Exception as e:
+            print(f"User Refresh Error: {e}")
+
+        # 2. Report cycle health: estimated_cycle_seconds must stay under the interval
+        print(f"--- [System] Scheduler: {scheduler.stats()} ---")
+        stop_event.wait(USER_REFRESH_INTERVAL)
+
+    print("--- [System] Shutting down, waiting for in-flight hunts... ---")
+    dispatcher.join()
+    print("--- [System] Background Worker Stopped. ---")
 
 if __name__ == "__main__":
     main_loop()
\ No newline at end of file
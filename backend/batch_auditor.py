@@ -0,0 +1,127 @@
+# backend/batch_auditor.py
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Iterator, Dict, Any
+
+from auditor import GitHubAuditor
+
+# --- CONFIGURATION ---
+BATCH_CONCURRENCY = int(os.getenv("AUDIT_BATCH_CONCURRENCY", "4"))
+MAX_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_MAX", "100"))
+# GitHub's documented hourly limits, used until the first response tells us the real numbers
+DEFAULT_LIMIT_UNAUTHENTICATED = 60
+DEFAULT_LIMIT_AUTHENTICATED = 5000
+
+
+class RateLimitBucket:
+    """
+    Token bucket whose level follows GitHub's X-RateLimit-Remaining / X-RateLimit-Reset.
+    One token = one non-cached GitHub request. The bucket refills to the full limit at reset time.
+    """
+
+    def __init__(self, auditor: GitHubAuditor):
+        self.cache = auditor.cache
+        default_limit = DEFAULT_LIMIT_AUTHENTICATED if auditor.token else DEFAULT_LIMIT_UNAUTHENTICATED
+        self._lock = threading.Lock()
+        self.limit = self.cache.rate_limit.get("limit") or default_limit
+        self.reset = self.cache.rate_limit.get("reset") or 0
+        remaining = self.cache.rate_limit.get("remaining")
+        self.tokens = remaining if remaining is not None else self.limit
+        self.in_flight = 0
+
+    def sync(self) -> None:
+        """Re-reads the latest headers seen by the shared cache."""
+        with self._lock:
+            observed = self.cache.rate_limit
+            if observed.get("limit"):
+                self.limit = observed["limit"]
+            if observed.get("reset"):
+                self.reset = observed["reset"]
+            if observed.get("remaining") is not None:
+                self.tokens = observed["remaining"] - self.in_flight
+            if self.reset and time.time() >= self.reset:
+                self.tokens = self.limit - self.in_flight
+
+    def try_acquire(self, cost: int) -> bool:
+        self.sync()
+        with self._lock:
+            if cost > self.tokens:
+                return False
+            self.tokens -= cost
+            self.in_flight += cost
+            return True
+
+    def release(self, cost: int) -> None:
+        with self._lock:
+            self.in_flight -= cost
+        self.sync()
+
+
+def estimate_cost(auditor: GitHubAuditor, username: str) -> int:
+    """Requests a trust score will actually send: fresh cache entries are free."""
+    urls = [
+        f"{auditor.base_url}/users/{username}",
+        f"{auditor.base_url}/users/{username}/events/public",
+    ]
+    cost = 0
+    for url in urls:
+        entry = auditor.cache.lookup(url)
+        if not (entry and entry["fresh"]):
+            cost += 1
+    return cost
+
+
+def score_batch(usernames: List[str], auditor: GitHubAuditor) -> Iterator[Dict[str, Any]]:
+    """
+    Scores a shortlist of GitHub users, yielding each result as soon as it completes.
+    Users are admitted only while the rate-limit bucket can pay for them;
+    once it runs dry the rest are returned as 'deferred' with the reset time instead of failing.
+    """
+    queue = deque(dict.fromkeys(u.strip() for u in usernames if u and u.strip()))
+    overflow = list(queue)[MAX_BATCH_SIZE:]
+    queue = deque(list(queue)[:MAX_BATCH_SIZE])
+
+    bucket = RateLimitBucket(auditor)
+    print(f"--- [Batch Auditor] Scoring {len(queue)} users (budget: {bucket.tokens} requests) ---")
+
+    for username in overflow:
+        yield {"username": username, "status": "rejected", "reason": f"Batch limit is {MAX_BATCH_SIZE} users."}
+
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY, thread_name_prefix="gh-batch") as pool:
+        while queue or in_flight:
+            # Admit work while we have both worker slots and rate-limit budget
+            while queue and len(in_flight) < BATCH_CONCURRENCY:
+                username = queue.popleft()
+                cost = estimate_cost(auditor, username)
+                if not bucket.try_acquire(cost):
+                    yield {"username": username, "status": "deferred", "retry_after": bucket.reset}
+                    continue
+                in_flight[pool.submit(auditor.calculate_trust_score, username)] = (username, cost)
+
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                username, cost = in_flight.pop(future)
+                bucket.release(cost)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"error": str(e), "trust_score": 0}
+                status = "error" if "error" in result else "scored"
+                yield {"username": username, "status": status, **result}
+
+    yield {"status": "complete", "rate_limit": auditor.cache.stats()["rate_limit"]}
+
+
+def stream_batch_ndjson(usernames: List[str], auditor: GitHubAuditor) -> Iterator[str]:
+    """NDJSON framing for StreamingResponse: one JSON object per line."""
+    for item in score_batch(usernames, auditor):
+        yield json.dumps(item) + "\n"
@@ -0,0 +1,102 @@
+# backend/batch_ranker.py
+
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Iterator, Tuple
+
+from ats_scorer import rank_resumes
+from resume_parser import extract_resume_text, analyze_resume
+
+# --- CONFIGURATION ---
+MAX_BATCH_FILES = int(os.getenv("RANK_MAX_FILES", "300"))
+MAX_ARCHIVE_BYTES = int(os.getenv("RANK_MAX_ARCHIVE_BYTES", str(200 * 1024 * 1024)))  # Uncompressed, zip-bomb guard
+EXTRACTION_THREADS = int(os.getenv("RANK_EXTRACTION_THREADS", "8"))  # Text layers in threads, OCR pages go to the shared process pool
+MAX_DEEP_DIVES = 10
+
+
+def stage_archive(archive_path: str, workdir: str) -> List[Tuple[str, str]]:
+    """Unpacks the PDFs of a zip into workdir. Returns (display_name, path) pairs."""
+    staged = []
+    with zipfile.ZipFile(archive_path) as archive:
+        members = [m for m in archive.infolist() if not m.is_dir() and m.filename.lower().endswith(".pdf")]
+        if sum(m.file_size for m in members) > MAX_ARCHIVE_BYTES:
+            raise ValueError("Archive is too large once uncompressed.")
+        for i, member in enumerate(members[:MAX_BATCH_FILES]):
+            # Never trust member paths: flatten to a numbered file inside workdir
+            path = os.path.join(workdir, f"zip_{i}.pdf")
+            with archive.open(member) as src, open(path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            staged.append((os.path.basename(member.filename), path))
+    return staged
+
+
+def rank_applicants(staged: List[Tuple[str, str]], job_description: str, target_role: str = "Software Engineer",
+                    deep_dive_top_n: int = 0, workdir: str = None) -> Iterator[dict]:
+    """
+    The recruiter's 'Shortlist' pipeline.
+    1. Extracts every resume concurrently (cached by content hash, so re-uploads are free).
+    2. Scores the whole pool against the JD in one vectorized pass.
+    3. Streams the ranked list, then optional LLM deep-dives for the top N only.
+    Removes workdir when done.
+    """
+    try:
+        staged = staged[:MAX_BATCH_FILES]
+        print(f"--- [Ranker] Extracting {len(staged)} resumes ---")
+        texts = [""] * len(staged)
+        with ThreadPoolExecutor(max_workers=EXTRACTION_THREADS, thread_name_prefix="rank-extract") as pool:
+            futures = {pool.submit(extract_resume_text, path): i for i, (_, path) in enumerate(staged)}
+            for future in as_completed(futures):
+                try:
+                    texts[futures[future]] = future.result() or ""
+                except Exception as e:
+                    print(f"Ranker Extraction Error ({staged[futures[future]][0]}): {e}")
+
+        readable = [i for i, text in enumerate(texts) if len(text.strip()) >= 10]
+        unreadable = set(range(len(staged))) - set(readable)
+        for i in sorted(unreadable):
+            yield {"type": "skipped", "filename": staged[i][0], "reason": "Could not read resume."}
+
+        ranking = rank_resumes([texts[i] for i in readable], job_description, target_role)
+        ranking.sort(key=lambda entry: entry["rank"])
+        for entry in ranking:
+            original = readable[entry.pop("index")]
+            entry["filename"] = staged[original][0]
+            entry["_path"] = staged[original][1]
+
+        for entry in ranking:
+            yield {"type": "ranked", **{k: v for k, v in entry.items() if k != "_path"}}
+
+        # Deep-dives only for the shortlist; the extraction is already cached so this is LLM time only
+        top = ranking[:max(0, min(deep_dive_top_n, MAX_DEEP_DIVES))]
+        if top:
+            with ThreadPoolExecutor(max_workers=len(top), thread_name_prefix="rank-deep") as pool:
+                futures = {
+                    pool.submit(analyze_resume, entry["_path"], target_role, job_description, True): entry
+                    for entry in top
+                }
+                for future in as_completed(futures):
+                    entry = futures[future]
+                    try:
+                        review = future.result()
+                    except Exception as e:
+                        review = {"error": str(e)}
+                    yield {"type": "deep_dive", "rank": entry["rank"], "filename": entry["filename"],
+                           "narrative": review.get("narrative"), "error": review.get("error")}
+
+        yield {"type": "complete", "ranked": len(ranking), "skipped": len(staged) - len(ranking)}
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def stream_ranking_ndjson(*args, **kwargs) -> Iterator[str]:
+    for item in rank_applicants(*args, **kwargs):
+        yield json.dumps(item) + "\n"
+
+
+def new_workdir() -> str:
+    return tempfile.mkdtemp(prefix="rank_")
@@ -3,7 +3,9 @@ from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Iterator
+
+from structured_stream import stream_structured
 
 load_dotenv()
 
@@ -29,13 +31,17 @@ class CursedChallenge(BaseModel):
 
 # --- THE ENGINE ---
 
-def generate_challenge(topic: str, difficulty: int):
-    """
-    The 'Cursed' Content Engine.
-    Generates a broken code snippet that the user must fix.
-    """
-    print(f"--- [Challenge Generator] Crafting '{topic}' puzzle (Diff: {difficulty}) ---")
-    
+# Fallback for demo purposes if LLM fails
+FALLBACK_CHALLENGE = {
+    "title": "The Recursive Trap (Fallback)",
+    "scenario": "Fix the infinite recursion.",
+    "broken_code": "def factorial(n):\n    return n * factorial(n-1)",
+    "constraint": "Handle base cases.",
+    "test_cases": [],
+    "solution_summary": "Add if n == 0 return 1"
+}
+
+def challenge_messages(topic: str, difficulty: int) -> list:
     system_prompt = (
         f"You are a Senior Principal Engineer conducting a technical screen. "
         f"Topic: {topic}. Difficulty: {difficulty}/100. "
@@ -44,27 +50,48 @@ def generate_challenge(topic: str, difficulty: int):
         f"2. The bug must be subtle (not a syntax error). "
         f"3. Provide strict constraints."
     )
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content="Generate the challenge now.")
+    ]
+
+def generate_challenge(topic: str, difficulty: int):
+    """
+    The 'Cursed' Content Engine.
+    Generates a broken code snippet that the user must fix.
+    """
+    print(f"--- [Challenge Generator] Crafting '{topic}' puzzle (Diff: {difficulty}) ---")
 
     structured_llm = llm.with_structured_output(CursedChallenge)
 
     try:
-        challenge = structured_llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content="Generate the challenge now.")
-        ])
+        challenge = structured_llm.invoke(challenge_messages(topic, difficulty))
         return challenge.dict()
         
     except Exception as e:
         print(f"Challenge Gen Failed: {e}")
-        # Fallback for demo purposes if LLM fails
-        return {
-            "title": "The Recursive Trap (Fallback)",
-            "scenario": "Fix the infinite recursion.",
-            "broken_code": "def factorial(n):\n    return n * factorial(n-1)",
-            "constraint": "Handle base cases.",
-            "test_cases": [],
-            "solution_summary": "Add if n == 0 return 1"
-        }
+        return dict(FALLBACK_CHALLENGE)
+
+def stream_challenge(topic: str, difficulty: int) -> Iterator[dict]:
+    """
+    NDJSON mode of generate_challenge: {"type": "field", "name": ..., "value": ...} per finished field
+    (title and scenario arrive first), {"type": "test_case"} per test, then {"type": "complete", ...challenge}.
+    On failure the complete event carries the fallback challenge.
+    """
+    print(f"--- [Challenge Generator] Streaming '{topic}' puzzle (Diff: {difficulty}) ---")
+    try:
+        for kind, key, value in stream_structured(llm, CursedChallenge, challenge_messages(topic, difficulty),
+                                                  items={"test_cases": TestCase}):
+            if kind == "item":
+                yield {"type": "test_case", **value.dict()}
+            elif kind == "field":
+                yield {"type": "field", "name": key, "value": value}
+            else:
+                yield {"type": "complete", **value.dict()}
+    except Exception as e:
+        print(f"Challenge Gen Failed: {e}")
+        yield {"type": "error", "error": str(e)}
+        yield {"type": "complete", **FALLBACK_CHALLENGE}
 
 # --- TEST BLOCK ---
 if __name__ == "__main__":
@@ -1,10 +1,18 @@
 import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
-from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
+
+from job_search import web_search_text, normalize_text
+from market_trends import market_history
+from ttl_cache import TTLCache
 
 load_dotenv()
 
@@ -15,8 +23,17 @@ llm = ChatGroq(
     groq_api_key=os.getenv("GROQ_API_KEY")
 )
 
-# Initialize Search Tool (Zero-Cost Web Search)
-search_tool = DuckDuckGoSearchRun()
+# --- SNAPSHOT SETTINGS ---
+MARKET_PULSE_REFRESH_INTERVAL = int(os.getenv("MARKET_PULSE_REFRESH_INTERVAL", "3600"))
+MARKET_PULSE_POPULAR = int(os.getenv("MARKET_PULSE_POPULAR", "10"))  # Most requested (role, location) pairs kept warm
+MARKET_PULSE_DEMAND_KEYS = int(os.getenv("MARKET_PULSE_DEMAND_KEYS", "500"))  # Request counts tracked at most
+MARKET_PULSE_SEED_ROLES = [r.strip() for r in os.getenv(
+    "MARKET_PULSE_SEED_ROLES", "Software Engineer,Frontend Engineer,Backend Engineer,Data Scientist").split(",") if r.strip()]
+
+# Snapshots outlive two refresh rounds, so a warm key never goes cold between refreshes
+pulse_cache = TTLCache(ttl=MARKET_PULSE_REFRESH_INTERVAL * 2, max_entries=256, name="market_pulse")
+_demand = Counter()  # (role, location) -> recent dashboard requests, drives what the refresher keeps warm
+_demand_lock = threading.Lock()
 
 # --- STRUCTURED OUTPUT ---
 class SkillTrend(BaseModel):
@@ -49,14 +66,19 @@ def analyze_market_demand(target_role: str, location: str = "Remote"):
         f"{target_role} salary trends {location} recent"
     ]
     
-    search_context = ""
-    try:
-        for q in queries:
-            result = search_tool.invoke(q)
-            search_context += f"\nQuery: {q}\nResult: {result}\n"
-    except Exception as e:
-        print(f"Search Tool Error: {e}")
+    # All four searches at once (and through the shared search cache); a failed query is just skipped
+    def run_query(q):
+        try:
+            return q, web_search_text(q)
+        except Exception as e:
+            print(f"Search Tool Error ({q}): {e}")
+            return q, None
+
+    with ThreadPoolExecutor(max_workers=len(queries), thread_name_prefix="pulse-search") as pool:
+        results = list(pool.map(run_query, queries))
+    if all(result is None for _, result in results):
         return {"error": "Market data unavailable (Search rate limit)."}
+    search_context = "".join(f"\nQuery: {q}\nResult: {result}\n" for q, result in results if result is not None)
 
     # 2. Synthesize with LLM
     system_prompt = (
@@ -76,12 +98,110 @@ def analyze_market_demand(target_role: str, location: str = "Remote"):
             SystemMessage(content=system_prompt),
             HumanMessage(content=f"Analyze this market data:\n{search_context}")
         ])
-        return market_report.dict()
+        report = market_report.dict()
+        # Every fresh report becomes one point in the role's history (for /api/career/market-trends)
+        try:
+            market_history.append(target_role, location, report)
+        except Exception as e:
+            print(f"Market History Error: {e}")
+        return report
         
     except Exception as e:
         print(f"Market Analysis Failed: {e}")
         return {"error": str(e)}
 
+# --- SNAPSHOTS ---
+
+def pulse_key(target_role: str, location: str = "Remote"):
+    return normalize_text(target_role), normalize_text(location) or "remote"
+
+
+def prune_demand(keep: int = MARKET_PULSE_DEMAND_KEYS, decay: bool = False) -> None:
+    """Keeps the `keep` most requested keys; with decay, also halves every count so old demand fades."""
+    with _demand_lock:
+        top = [(key, count // 2 if decay else count) for key, count in _demand.most_common(keep)]
+        _demand.clear()
+        _demand.update({key: count for key, count in top if count > 0})
+
+
+def peek_market_pulse(target_role: str, location: str = "Remote") -> Optional[dict]:
+    """Anonymous read path: the existing snapshot or None. Never counts demand or triggers a computation."""
+    return pulse_cache.get(pulse_key(target_role, location))
+
+
+def get_market_pulse(target_role: str, location: str = "Remote"):
+    """
+    Signed-in dashboard read path: the precomputed MarketPulse for (role, location) if there is one,
+    otherwise computed once (concurrent requests for the same key share the computation).
+    Counts the request towards the demand that decides which snapshots the refresher keeps warm.
+    """
+    key = pulse_key(target_role, location)
+    with _demand_lock:
+        _demand[key] += 1
+        overflow = len(_demand) > 2 * MARKET_PULSE_DEMAND_KEYS
+    if overflow:
+        prune_demand(MARKET_PULSE_DEMAND_KEYS)
+
+    def compute():
+        report = analyze_market_demand(target_role, location)
+        if "error" in report:
+            return None  # Not cached; the next request tries again
+        return {**report, "generated_at": datetime.utcnow().isoformat()}
+
+    snapshot = pulse_cache.get_or_compute(key, compute)
+    return snapshot if snapshot is not None else {"error": "Market data unavailable (Search rate limit)."}
+
+
+class MarketPulseRefresher:
+    """Background thread that recomputes the most requested snapshots (plus the seed roles) every interval."""
+
+    def __init__(self, interval: int = MARKET_PULSE_REFRESH_INTERVAL, popular: int = MARKET_PULSE_POPULAR):
+        self.interval = interval
+        self.popular = popular
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def targets(self):
+        with _demand_lock:
+            ranked = [key for key, _ in _demand.most_common(self.popular)]
+        seeds = [pulse_key(role) for role in MARKET_PULSE_SEED_ROLES]
+        return list(dict.fromkeys(ranked + seeds))
+
+    def refresh_once(self) -> int:
+        refreshed = 0
+        targets = self.targets()
+        prune_demand(decay=True)  # Each pass halves the counts, so the ranking follows recent traffic
+        for role, location in targets:
+            if self._stop.is_set():
+                break
+            report = analyze_market_demand(role, location)
+            if "error" not in report:
+                pulse_cache.set((role, location), {**report, "generated_at": datetime.utcnow().isoformat()})
+                refreshed += 1
+        return refreshed
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.time()
+            try:
+                count = self.refresh_once()
+                print(f"--- [Sniper] Refreshed {count} market snapshots in {time.time() - started:.1f}s ---")
+            except Exception as e:
+                print(f"Market Refresh Error: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="market-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+market_refresher = MarketPulseRefresher()
+
 # --- TEST BLOCK ---
 if __name__ == "__main__":
     # Test: Is "Junior Frontend Developer" dead?
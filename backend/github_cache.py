@@ -0,0 +1,216 @@
+# backend/github_cache.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Optional, Dict, Any
+
+# --- CONFIGURATION ---
+CACHE_DIR = os.getenv("GITHUB_CACHE_DIR", os.path.join(".cache", "github"))
+CACHE_MAX_BYTES = int(os.getenv("GITHUB_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))  # 50 MB on disk
+
+# Freshness window per endpoint class (seconds).
+# Inside the window we answer from disk without any network call.
+# After it, we revalidate with If-None-Match / If-Modified-Since: a 304 is free on GitHub's rate limit.
+ENDPOINT_TTLS = [
+    ("events", re.compile(r"/users/[^/]+/events"), 300),       # Activity moves fast
+    ("repos", re.compile(r"/users/[^/]+/repos$"), 1800),
+    ("user", re.compile(r"/users/[^/]+$"), 3600),
+    ("contents", re.compile(r"/repos/[^/]+/[^/]+/contents"), 86400),  # File blobs rarely change
+]
+DEFAULT_TTL = 600
+
+
+class ConditionalCache:
+    """
+    Persistent ETag/Last-Modified cache for GitHub API responses.
+    One JSON file per URL; least-recently-used files are evicted once the directory exceeds max_bytes.
+    Also tracks GitHub's rate-limit headers so callers can see how much budget is left.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Dict[str, float]]] = None  # path -> {"size", "last_used"}, read on first use
+        self._listeners = []
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self.rate_limit = {"limit": None, "remaining": None, "reset": None, "used": None}
+
+    def _entries(self) -> Dict[str, Dict[str, float]]:
+        """The on-disk index, built (and the directory created) on first use. Call with the lock held."""
+        if self._index is None:
+            self._index = {}
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                for name in os.listdir(self.cache_dir):
+                    path = os.path.join(self.cache_dir, name)
+                    if name.endswith(".json"):
+                        st = os.stat(path)
+                        self._index[path] = {"size": st.st_size, "last_used": st.st_mtime}
+            except OSError as e:
+                print(f"GitHub Cache: Disk cache unavailable ({e}). Running uncached.")
+        return self._index
+
+    # --- KEYS & POLICY ---
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    @staticmethod
+    def endpoint_class(url: str):
+        path = url.split("?", 1)[0]
+        for name, pattern, ttl in ENDPOINT_TTLS:
+            if pattern.search(path):
+                return name, ttl
+        return "other", DEFAULT_TTL
+
+    # --- READ PATH ---
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored entry (fresh or stale) with an added 'fresh' flag, or None."""
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        _, ttl = self.endpoint_class(url)
+        entry["fresh"] = (time.time() - entry.get("stored_at", 0)) < ttl
+        self._touch(path)
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record_hit(self):
+        with self._lock:
+            self.counters["hits"] += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.counters["misses"] += 1
+
+    def record_rate_limit(self, headers):
+        """Reads X-RateLimit-* from any GitHub response (200, 304 or 403)."""
+        with self._lock:
+            for key in ("limit", "remaining", "reset", "used"):
+                value = headers.get(f"X-RateLimit-{key.capitalize()}")
+                if value is not None:
+                    try:
+                        self.rate_limit[key] = int(value)
+                    except ValueError:
+                        pass
+
+    # --- WRITE PATH ---
+
+    def store(self, url: str, body: Any, headers) -> None:
+        """Persists a 200 response. Notifies listeners when the body differs from what we had."""
+        path = self._path(url)
+        previous = self.lookup(url)
+        entry = {
+            "url": url,
+            "endpoint": self.endpoint_class(url)[0],
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "stored_at": time.time(),
+            "body": body,
+        }
+        self._write(path, entry)
+        with self._lock:
+            self.counters["stores"] += 1
+
+        if previous is not None and previous.get("body") != body:
+            self._notify(url)
+
+    def mark_revalidated(self, url: str, entry: Dict[str, Any]) -> None:
+        """A 304 came back: the stored body is still valid, restart its freshness window."""
+        entry = {k: v for k, v in entry.items() if k != "fresh"}
+        entry["stored_at"] = time.time()
+        self._write(self._path(url), entry)
+        with self._lock:
+            self.counters["revalidated"] += 1
+
+    def _write(self, path: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries()  # Creates the directory
+        try:
+            data = json.dumps(entry)
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except (OSError, TypeError) as e:
+            print(f"GitHub Cache Write Error: {e}")
+            return
+
+        with self._lock:
+            self._entries()[path] = {"size": len(data), "last_used": time.time()}
+        self._evict()
+
+    def _touch(self, path: str) -> None:
+        with self._lock:
+            entries = self._entries()
+            if path in entries:
+                entries[path]["last_used"] = time.time()
+
+    def _evict(self) -> None:
+        """Drops least-recently-used files until the cache fits in max_bytes."""
+        with self._lock:
+            entries = self._entries()
+            total = sum(meta["size"] for meta in entries.values())
+            if total <= self.max_bytes:
+                return
+            for path, meta in sorted(entries.items(), key=lambda item: item[1]["last_used"]):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= meta["size"]
+                del entries[path]
+                self.counters["evictions"] += 1
+
+    # --- CHANGE NOTIFICATIONS ---
+
+    def subscribe(self, callback) -> None:
+        """Registers callback(url) to be called when a cached response body changes."""
+        self._listeners.append(callback)
+
+    def _notify(self, url: str) -> None:
+        for callback in self._listeners:
+            try:
+                callback(url)
+            except Exception as e:
+                print(f"GitHub Cache Listener Error: {e}")
+
+    # --- REPORTING ---
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._entries()
+            lookups = self.counters["hits"] + self.counters["revalidated"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": round((self.counters["hits"] + self.counters["revalidated"]) / lookups, 3) if lookups else 0.0,
+                "entries": len(entries),
+                "disk_bytes": sum(meta["size"] for meta in entries.values()),
+                "rate_limit": dict(self.rate_limit),
+            }
+
+
+# Shared instance: every GitHubAuditor in the process reads and fills the same cache
+github_cache = ConditionalCache()
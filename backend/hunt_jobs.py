@@ -0,0 +1,178 @@
+# backend/hunt_jobs.py
+
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import List, Dict, Any, Optional
+
+from database import db_manager
+
+# --- CONFIGURATION ---
+HUNT_JOB_DB_PATH = os.getenv("HUNT_JOB_DB_PATH", os.path.join(".cache", "hunt_jobs.db"))
+HUNT_LEASE_SECONDS = float(os.getenv("HUNT_LEASE_SECONDS", "120"))  # Renewed by heartbeats while a hunt runs
+# 'supabase' shares the queue across nodes; 'local' shares it across processes on one machine;
+# 'memory' keeps the schedule inside a single worker process
+HUNT_JOB_STORE = os.getenv("HUNT_JOB_STORE", "supabase" if db_manager.enabled else "local")
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LocalJobStore:
+    """
+    Lease-based hunt queue in SQLite (one row per user).
+    - claim():     due rows with no live lease get this worker's lease and a fresh run_id.
+                   An expired lease (crashed or stuck worker) makes the row claimable again.
+    - heartbeat(): extends the lease, only while the caller still holds that run_id.
+    - complete():  releases the lease and sets the next run; a second call for the same run_id is a no-op.
+    BEGIN IMMEDIATE takes the write lock up front, so two processes can never claim the same row.
+    """
+
+    def __init__(self, path: str = HUNT_JOB_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS hunt_jobs (
+                    user_id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    next_run_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires_at REAL,
+                    run_id TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_completed_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_hunt_jobs_due ON hunt_jobs (next_run_at);
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def ensure(self, user: Dict[str, Any], run_at: Optional[float] = None) -> None:
+        """Registers a user (keeps the existing schedule if already known, but refreshes the payload)."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO hunt_jobs (user_id, payload, next_run_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET payload = excluded.payload",
+                (user["id"], json.dumps(user), run_at if run_at is not None else time.time()),
+            )
+
+    def remove(self, user_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM hunt_jobs WHERE user_id = ?", (user_id,))
+
+    def user_ids(self) -> List[str]:
+        with self._connect() as conn:
+            return [row["user_id"] for row in conn.execute("SELECT user_id FROM hunt_jobs")]
+
+    def claim(self, worker_id: str, limit: int, lease_seconds: float = HUNT_LEASE_SECONDS) -> List[Dict[str, Any]]:
+        if limit <= 0:
+            return []
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT user_id, payload, lease_owner FROM hunt_jobs "
+                "WHERE next_run_at <= ? AND (lease_owner IS NULL OR lease_expires_at < ?) "
+                "ORDER BY next_run_at LIMIT ?",
+                (now, now, limit),
+            ).fetchall()
+            claimed = []
+            for row in rows:
+                run_id = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE hunt_jobs SET lease_owner = ?, lease_expires_at = ?, run_id = ?, attempts = attempts + 1 "
+                    "WHERE user_id = ?",
+                    (worker_id, now + lease_seconds, run_id, row["user_id"]),
+                )
+                if row["lease_owner"]:
+                    print(f"--- [Jobs] Reclaimed expired lease of {row['lease_owner']} on {row['user_id']} ---")
+                claimed.append({"user_id": row["user_id"], "payload": json.loads(row["payload"]), "run_id": run_id})
+            conn.execute("COMMIT")
+            return claimed
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, user_id: str, run_id: str, lease_seconds: float = HUNT_LEASE_SECONDS) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE hunt_jobs SET lease_expires_at = ? WHERE user_id = ? AND run_id = ?",
+                                  (time.time() + lease_seconds, user_id, run_id))
+            return cursor.rowcount == 1
+
+    def complete(self, user_id: str, run_id: str, next_run_in: float) -> bool:
+        with self._connect() as conn:
+            now = time.time()
+            cursor = conn.execute(
+                "UPDATE hunt_jobs SET lease_owner = NULL, lease_expires_at = NULL, run_id = NULL, "
+                "next_run_at = ?, last_completed_at = ? WHERE user_id = ? AND run_id = ?",
+                (now + next_run_in, now, user_id, run_id),
+            )
+            return cursor.rowcount == 1
+
+    def due_count(self) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM hunt_jobs WHERE next_run_at <= ? AND (lease_owner IS NULL OR lease_expires_at < ?)",
+                (now, now),
+            ).fetchone()[0]
+
+
+class SupabaseJobStore:
+    """Same contract as LocalJobStore, backed by the hunt_jobs table and RPCs in supabase_schema.sql."""
+
+    def ensure(self, user: Dict[str, Any], run_at: Optional[float] = None) -> None:
+        # New rows start at run_at (default now()); existing rows keep their schedule
+        db_manager.supabase.rpc("ensure_hunt_job", {
+            "p_user_id": user["id"], "p_payload": user, "p_run_at": run_at,
+        }).execute()
+
+    def remove(self, user_id: str) -> None:
+        db_manager.supabase.table("hunt_jobs").delete().eq("user_id", user_id).execute()
+
+    def user_ids(self) -> List[str]:
+        rows = db_manager.supabase.table("hunt_jobs").select("user_id").execute()
+        return [row["user_id"] for row in rows.data or []]
+
+    def claim(self, worker_id: str, limit: int, lease_seconds: float = HUNT_LEASE_SECONDS) -> List[Dict[str, Any]]:
+        if limit <= 0:
+            return []
+        rows = db_manager.supabase.rpc("claim_hunt_jobs", {
+            "p_worker": worker_id, "p_limit": limit, "p_lease_seconds": int(lease_seconds),
+        }).execute()
+        return [{"user_id": r["user_id"], "payload": r["payload"], "run_id": r["run_id"]} for r in rows.data or []]
+
+    def heartbeat(self, user_id: str, run_id: str, lease_seconds: float = HUNT_LEASE_SECONDS) -> bool:
+        result = db_manager.supabase.rpc("heartbeat_hunt_job", {
+            "p_user_id": user_id, "p_run_id": run_id, "p_lease_seconds": int(lease_seconds),
+        }).execute()
+        return bool(result.data)
+
+    def complete(self, user_id: str, run_id: str, next_run_in: float) -> bool:
+        result = db_manager.supabase.rpc("complete_hunt_job", {
+            "p_user_id": user_id, "p_run_id": run_id, "p_next_run_in_seconds": int(next_run_in),
+        }).execute()
+        return bool(result.data)
+
+    def due_count(self) -> int:
+        result = db_manager.supabase.rpc("due_hunt_jobs", {}).execute()
+        return int(result.data or 0)
+
+
+def get_job_store():
+    if HUNT_JOB_STORE == "memory":
+        return None
+    if HUNT_JOB_STORE == "supabase" and db_manager.enabled:
+        return SupabaseJobStore()
+    return LocalJobStore()
@@ -0,0 +1,272 @@
+# backend/hunt_scheduler.py
+
+import heapq
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, Any, List, Optional
+
+from hunt_jobs import HUNT_LEASE_SECONDS, default_worker_id
+
+# --- CONFIGURATION ---
+HUNT_INTERVAL = float(os.getenv("HUNT_INTERVAL", "3600"))          # Target time between two hunts for one user
+HUNT_JITTER = float(os.getenv("HUNT_JITTER", "0.1"))               # +/- fraction of the interval, spreads load
+HUNT_WORKERS = int(os.getenv("HUNT_WORKERS", "8"))                 # Hunts running at once
+HUNT_USER_TIMEOUT = float(os.getenv("HUNT_USER_TIMEOUT", "300"))   # Seconds before a hunt is written off as stuck
+HUNT_MAX_STUCK = int(os.getenv("HUNT_MAX_STUCK", str(HUNT_WORKERS)))  # Stuck hunts tolerated before they block slots
+HUNT_RETRY_DELAY = float(os.getenv("HUNT_RETRY_DELAY", "600"))     # Failed hunts retry sooner than a full interval
+HUNT_INITIAL_SPREAD = float(os.getenv("HUNT_INITIAL_SPREAD", "300"))  # New users' first hunts are spread over this window
+
+
+class HuntScheduler:
+    """
+    Per-user scheduler for the Shadow Hunter.
+    - A min-heap of (next_run, user_id): the dispatcher only ever looks at the head.
+    - Due users go to a bounded thread pool, so one slow hunt delays nobody else.
+    - Each user gets a next run of interval +/- jitter after their own hunt finishes, so load spreads
+      across the hour instead of arriving in one burst.
+    - A user is never scheduled twice at once. A hunt past the timeout is written off as stuck: it stops
+      counting against `workers` (threads can't be killed, so it runs on in one of max_stuck spare pool
+      threads) and, with a job_store, its lease is no longer renewed so another worker can reclaim the user.
+    With a job_store (hunt_jobs), the schedule lives in the shared store instead of the local heap:
+    the dispatcher claims due users under leases, heartbeats them while they run and completes them
+    with the next run time, so any number of worker processes can share one user base.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Any], interval: float = HUNT_INTERVAL,
+                 jitter: float = HUNT_JITTER, workers: int = HUNT_WORKERS, user_timeout: float = HUNT_USER_TIMEOUT,
+                 retry_delay: float = HUNT_RETRY_DELAY, initial_spread: float = HUNT_INITIAL_SPREAD,
+                 job_store=None, worker_id: Optional[str] = None, lease_seconds: float = HUNT_LEASE_SECONDS,
+                 max_stuck: int = HUNT_MAX_STUCK):
+        self.handler = handler
+        self.interval = interval
+        self.jitter = jitter
+        self.workers = workers
+        self.user_timeout = user_timeout
+        self.retry_delay = retry_delay
+        self.initial_spread = initial_spread
+        self.job_store = job_store
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_stuck = max_stuck
+
+        self._heap: List[tuple] = []  # (next_run, seq, user_id); stale entries are skipped via _due_at
+        self._due_at: Dict[str, float] = {}
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._in_flight: Dict[str, tuple] = {}  # user_id -> (future, started_at)
+        self._stuck = set()  # In-flight users already reported as timed out
+        self._leases: Dict[str, list] = {}  # user_id -> [run_id, last_heartbeat] (job_store mode)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._pool = ThreadPoolExecutor(max_workers=workers + max_stuck, thread_name_prefix="hunt")
+        self.counters = {"completed": 0, "failed": 0, "timed_out": 0, "leases_lost": 0}
+        self._durations: List[float] = []  # Recent hunt durations, for the cycle estimate
+
+    # --- USERS ---
+
+    def _jittered(self, delay: float) -> float:
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def _push(self, user_id: str, run_at: float) -> None:
+        self._seq += 1
+        self._due_at[user_id] = run_at
+        heapq.heappush(self._heap, (run_at, self._seq, user_id))
+        self._cond.notify_all()
+
+    def upsert_user(self, user: Dict[str, Any], run_at: Optional[float] = None) -> None:
+        """Adds or updates a user. New users start at a random point of the initial spread unless run_at is given."""
+        if run_at is None:
+            run_at = time.time() + random.uniform(0, self.initial_spread)
+        if self.job_store is not None:
+            self.job_store.ensure(user, run_at)
+        with self._cond:
+            user_id = user["id"]
+            is_new = user_id not in self._users
+            self._users[user_id] = user
+            if is_new and user_id not in self._in_flight and self.job_store is None:
+                self._push(user_id, run_at)
+
+    def sync_users(self, users: List[Dict[str, Any]]) -> None:
+        """Makes the schedule match the active user list (adds, updates and removes)."""
+        active = {u["id"] for u in users}
+        for user in users:
+            self.upsert_user(user)
+        if self.job_store is not None:
+            for user_id in set(self.job_store.user_ids()) - active:
+                self.job_store.remove(user_id)
+        with self._cond:
+            for user_id in set(self._users) - active:
+                self._users.pop(user_id, None)
+                self._due_at.pop(user_id, None)
+
+    # --- DISPATCH ---
+
+    def _free_slots(self) -> int:
+        """Workers not taken by live hunts; stuck ones don't count, up to max_stuck spare threads. Caller holds the lock."""
+        live = len(self._in_flight) - len(self._stuck)
+        return max(0, min(self.workers - live, self.workers + self.max_stuck - len(self._in_flight)))
+
+    def _next_due(self, now: float) -> Optional[str]:
+        """Pops the next due user, skipping stale heap entries. Caller holds the lock."""
+        while self._heap and self._heap[0][0] <= now:
+            run_at, _, user_id = heapq.heappop(self._heap)
+            if self._due_at.get(user_id) == run_at and user_id not in self._in_flight:
+                del self._due_at[user_id]
+                return user_id
+        return None
+
+    def _start(self, user_id: str, user: Optional[Dict[str, Any]] = None, run_id: Optional[str] = None) -> None:
+        user = user or self._users[user_id]
+        if run_id is not None:
+            self._leases[user_id] = [run_id, time.time()]
+        future = self._pool.submit(self.handler, user)
+        self._in_flight[user_id] = (future, time.time())
+        future.add_done_callback(lambda f, uid=user_id: self._finish(uid, f))
+
+    def _finish(self, user_id: str, future: Future) -> None:
+        failed = future.exception() is not None
+        delay = self._jittered(self.retry_delay if failed else self.interval)
+        lease = self._leases.get(user_id)
+        # Shared store: hand the user back with its next run time (no-op if the lease was lost meanwhile).
+        # This runs in a done-callback, where an exception would be swallowed and the slot never freed.
+        if lease is not None:
+            try:
+                if not self.job_store.complete(user_id, lease[0], delay):
+                    print(f"--- [Scheduler] Lease on {user_id} was lost before completion ---")
+            except Exception as e:
+                print(f"Complete Error ({user_id}): {e}")  # The lease expires and the user is claimed again
+        with self._cond:
+            _, started = self._in_flight.pop(user_id, (None, time.time()))
+            self._leases.pop(user_id, None)
+            self._stuck.discard(user_id)
+            duration = time.time() - started
+            self._durations = (self._durations + [duration])[-200:]
+            if failed:
+                print(f"Hunt Error ({user_id}): {future.exception()}")
+                self.counters["failed"] += 1
+            else:
+                self.counters["completed"] += 1
+            if lease is None and user_id in self._users and not self._stopping:
+                self._push(user_id, time.time() + delay)
+            self._cond.notify_all()
+
+    def _renew_leases(self, now: float) -> None:
+        """
+        Heartbeats every in-flight lease a third of the way through it, well before it can expire.
+        Stuck hunts are not renewed: their lease lapses so another worker can reclaim the user.
+        """
+        with self._cond:
+            due = [(uid, lease[0]) for uid, lease in self._leases.items()
+                   if now - lease[1] > self.lease_seconds / 3 and uid not in self._stuck]
+        for user_id, run_id in due:
+            try:
+                alive = self.job_store.heartbeat(user_id, run_id, self.lease_seconds)
+            except Exception as e:
+                print(f"Heartbeat Error ({user_id}): {e}")
+                continue
+            with self._cond:
+                if user_id in self._leases:
+                    self._leases[user_id][1] = now
+                if not alive:
+                    self.counters["leases_lost"] += 1
+                    print(f"--- [Scheduler] Lost lease on {user_id}; another worker may pick it up ---")
+
+    def _claim(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            free = self._free_slots()
+        try:
+            return self.job_store.claim(self.worker_id, free, self.lease_seconds) if free > 0 else []
+        except Exception as e:
+            print(f"Claim Error: {e}")
+            return []
+
+    def _check_timeouts(self, now: float) -> None:
+        for user_id, (_, started) in self._in_flight.items():
+            if now - started > self.user_timeout and user_id not in self._stuck:
+                self._stuck.add(user_id)
+                self.counters["timed_out"] += 1
+                print(f"--- [Scheduler] Hunt for {user_id} exceeded {self.user_timeout:.0f}s ---")
+
+    def run(self, stop_event: Optional[threading.Event] = None, tick: float = 1.0) -> None:
+        """Dispatch loop. Returns after stop_event is set (or stop() is called) and in-flight hunts drained."""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set() and not self._stopping:
+            if self.job_store is not None:
+                self._renew_leases(time.time())
+                claimed = self._claim()
+                with self._cond:
+                    self._check_timeouts(time.time())
+                    for job in claimed:
+                        self._start(job["user_id"], job["payload"], job["run_id"])
+                    self._cond.wait(timeout=tick)
+                continue
+
+            with self._cond:
+                now = time.time()
+                self._check_timeouts(now)
+                while self._free_slots() > 0:
+                    user_id = self._next_due(now)
+                    if user_id is None:
+                        break
+                    self._start(user_id)
+                # Sleep until the next due user, a finished hunt, or the tick (for stop/timeout checks)
+                wait = tick
+                if self._heap and self._free_slots() > 0:
+                    wait = min(tick, max(0.0, self._heap[0][0] - now))
+                self._cond.wait(timeout=wait)
+        self.shutdown()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """Stops dispatching and waits for in-flight hunts. Returns True if everything drained."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            self._stopping = True
+            if self._in_flight:
+                print(f"--- [Scheduler] Draining {len(self._in_flight)} in-flight hunts ---")
+            while self._in_flight:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(timeout=remaining)
+            drained = not self._in_flight
+        self._pool.shutdown(wait=drained)
+        return drained
+
+    # --- METRICS ---
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            now = time.time()
+            due = [run_at for user_id, run_at in self._due_at.items() if run_at <= now]
+            avg = sum(self._durations) / len(self._durations) if self._durations else 0.0
+            stats = {
+                "users": len(self._users),
+                "in_flight": len(self._in_flight),
+                "backlog": len(due),  # Due but waiting for a worker
+                "max_lag_seconds": round(now - min(due), 1) if due else 0.0,
+                "avg_hunt_seconds": round(avg, 2),
+                # Time to hunt every user once at the current pace; must stay under the interval
+                "estimated_cycle_seconds": round(len(self._users) * avg / max(self.workers, 1), 1),
+                "interval_seconds": self.interval,
+                "workers": self.workers,
+                **self.counters,
+            }
+        if self.job_store is not None:
+            # Shared queue: the backlog is whatever no worker in the fleet has claimed yet
+            stats.update({"worker_id": self.worker_id, "backlog": self._safe_due_count(), "max_lag_seconds": None})
+        return stats
+
+    def _safe_due_count(self) -> Optional[int]:
+        try:
+            return self.job_store.due_count()
+        except Exception as e:
+            print(f"Job Store Error: {e}")
+            return None
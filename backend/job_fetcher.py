@@ -1,10 +1,14 @@
 import os
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
-from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Iterator
+
+from ats_scorer import term_indices, VOCAB
+from job_search import find_postings, query_key, normalize_text, SEARCH_CACHE_TTL
+from structured_stream import stream_structured
+from ttl_cache import TTLCache
 
 load_dotenv()
 
@@ -15,7 +19,11 @@ llm = ChatGroq(
     groq_api_key=os.getenv("GROQ_API_KEY")
 )
 
-search_tool = DuckDuckGoSearchRun()
+MAX_POSTINGS_FOR_LLM = int(os.getenv("HUNT_MAX_POSTINGS", "15"))
+NO_POSTINGS_ADVICE = "No fresh postings found for this search. Try a broader role or location."
+
+# One extraction per normalized (role, location), shared by every user who hunts for it
+extraction_cache = TTLCache(ttl=SEARCH_CACHE_TTL, max_entries=256, name="posting_extraction")
 
 # --- DATA MODELS ---
 
@@ -31,8 +39,41 @@ class JobHuntReport(BaseModel):
     opportunities: List[JobOpportunity]
     strategic_advice: str = Field(..., description="Overall strategy, e.g., 'Target mid-size startups until you fix your SQL gap.'")
 
+# User-independent view of a posting, extracted once per query and scored locally per user
+class ExtractedPosting(BaseModel):
+    posting_number: int = Field(..., description="The [n] number of the posting in the list.")
+    role_title: str
+    company: str
+    required_skills: List[str] = Field(..., description="Hard skills the posting asks for, most emphasized first.")
+    summary: str = Field(..., description="One sentence on the team / product.")
+
+class PostingExtraction(BaseModel):
+    postings: List[ExtractedPosting]
+
 # --- THE ENGINE ---
 
+def format_postings(postings: List[dict]) -> str:
+    """One compact line per posting instead of the raw search blob."""
+    return "\n".join(f"- {p['title']} | {p['company']} | {p['url']} | {p['snippet'][:200]}" for p in postings)
+
+def hunt_messages(target_role: str, skill_gaps: List[str], postings: List[dict]) -> list:
+    # The "Reality Check" Prompt
+    # This makes your app UNIQUE. It doesn't just list jobs; it protects the user from rejection.
+    system_prompt = (
+        f"You are a Career Agent acting as a 'Bodyguard' for a candidate. "
+        f"Target Role: {target_role}. "
+        f"Candidate's KNOWN WEAKNESSES (Skill Gaps): {', '.join(skill_gaps)}. "
+        f"Task: "
+        f"1. Analyze the job postings below (title | company | url | snippet); use the url as apply_link_guess. "
+        f"2. If a job emphasizes a skill the user is BAD at (e.g., 'Must be expert in {skill_gaps[0] if skill_gaps else 'None'}'), "
+        f"give it a low match score and a WARNING. "
+        f"3. Prioritize jobs that fit their profile."
+    )
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=f"Job Postings:\n{format_postings(postings)}")
+    ]
+
 def hunt_opportunities(target_role: str, skill_gaps: List[str], location: str = "Remote"):
     """
     The 'Opportunity Hunter' Agent.
@@ -41,41 +82,151 @@ def hunt_opportunities(target_role: str, skill_gaps: List[str], location: str =
     """
     print(f"--- [Hunter] Stalking jobs for {target_role} in {location} ---")
     
-    # 1. Search Logic (Simulated "Live" listing fetch via Search Engine)
-    # In production, you would swap this for a LinkedIn/Indeed Scraper or API.
-    query = f"hiring {target_role} {location} \"apply\" -intitle:senior -intitle:lead site:greenhouse.io OR site:lever.co"
-    
+    # 1. Search Logic: structured postings from the shared search cache / local posting store.
+    # Repeat hunts for the same (role, location) within the cache window make no search call.
     try:
-        raw_results = search_tool.invoke(query)
+        postings = find_postings(target_role, location)[:MAX_POSTINGS_FOR_LLM]
     except Exception as e:
         return {"error": f"Search failed: {str(e)}"}
 
-    # 2. The "Reality Check" Prompt
-    # This makes your app UNIQUE. It doesn't just list jobs; it protects the user from rejection.
-    system_prompt = (
-        f"You are a Career Agent acting as a 'Bodyguard' for a candidate. "
-        f"Target Role: {target_role}. "
-        f"Candidate's KNOWN WEAKNESSES (Skill Gaps): {', '.join(skill_gaps)}. "
-        f"Task: "
-        f"1. Analyze the raw search results below to extract job openings. "
-        f"2. If a job emphasizes a skill the user is BAD at (e.g., 'Must be expert in {skill_gaps[0] if skill_gaps else 'None'}'), "
-        f"give it a low match score and a WARNING. "
-        f"3. Prioritize jobs that fit their profile."
-    )
+    if not postings:
+        return {"opportunities": [], "strategic_advice": NO_POSTINGS_ADVICE}
 
+    # 2. The "Reality Check"
     structured_llm = llm.with_structured_output(JobHuntReport)
 
     try:
-        report = structured_llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Raw Search Results:\n{raw_results}")
-        ])
+        report = structured_llm.invoke(hunt_messages(target_role, skill_gaps, postings))
         return report.dict()
     except Exception as e:
         print(f"Job Hunt Error: {e}")
         return {"error": str(e)}
 
+def stream_opportunities(target_role: str, skill_gaps: List[str], location: str = "Remote") -> Iterator[dict]:
+    """
+    NDJSON mode of hunt_opportunities: one {"type": "opportunity"} per job as soon as the model
+    finishes it, then {"type": "complete", "strategic_advice": ...}.
+    """
+    print(f"--- [Hunter] Streaming jobs for {target_role} in {location} ---")
+    try:
+        postings = find_postings(target_role, location)[:MAX_POSTINGS_FOR_LLM]
+    except Exception as e:
+        yield {"type": "error", "error": f"Search failed: {str(e)}"}
+        return
+
+    if not postings:
+        yield {"type": "complete", "opportunities": 0, "strategic_advice": NO_POSTINGS_ADVICE}
+        return
+
+    try:
+        count = 0
+        for kind, key, value in stream_structured(llm, JobHuntReport, hunt_messages(target_role, skill_gaps, postings),
+                                                  items={"opportunities": JobOpportunity}):
+            if kind == "item":
+                count += 1
+                yield {"type": "opportunity", **value.dict()}
+            elif kind == "done":
+                yield {"type": "complete", "opportunities": count, "strategic_advice": value.strategic_advice}
+    except Exception as e:
+        print(f"Job Hunt Error: {e}")
+        yield {"type": "error", "error": str(e)}
+
+# --- SHARED HUNT (Background worker fan-in) ---
+
+def extract_shared_postings(target_role: str, location: str = "Remote") -> Optional[dict]:
+    """
+    One search + one extraction per normalized (role, location), cached and single-flight:
+    users hunting for the same thing at the same time wait for one call instead of making their own.
+    Contains nothing user-specific, so it is safe to share. Returns None on failure (not cached).
+    Shape: {"evaluated": URLs shown to the model, "postings": the real openings it extracted from them}.
+    """
+    def compute():
+        postings = find_postings(target_role, location)[:MAX_POSTINGS_FOR_LLM]
+        if not postings:
+            return {"evaluated": [], "postings": []}
+        print(f"--- [Hunter] Extracting {len(postings)} postings for '{query_key(target_role, location)}' ---")
+        numbered = "\n".join(f"[{i}] {p['title']} | {p['company']} | {p['snippet'][:200]}" for i, p in enumerate(postings))
+        try:
+            extraction = llm.with_structured_output(PostingExtraction).invoke([
+                SystemMessage(content=(
+                    f"You extract job openings for the role '{target_role}' from a list of postings. "
+                    f"Skip anything that is not a real opening. For each opening list the hard skills it asks for."
+                )),
+                HumanMessage(content=f"Job Postings:\n{numbered}")
+            ])
+        except Exception as e:
+            print(f"Posting Extraction Error: {e}")
+            return None
+        extracted = []
+        for item in extraction.postings:
+            if 0 <= item.posting_number < len(postings):
+                source = postings[item.posting_number]
+                extracted.append({**item.dict(), "url": source["url"], "snippet": source.get("snippet", "")})
+        return {"evaluated": [p["url"] for p in postings], "postings": extracted}
+
+    return extraction_cache.get_or_compute(query_key(target_role, location), compute)
+
+
+def canonical_skills(skills: List[str]) -> List[str]:
+    """Maps 'k8s', 'Kubernetes (EKS)' and 'kubernetes' to one name via the ATS vocabulary."""
+    names = []
+    for skill in skills:
+        hits = term_indices(skill)
+        for name in ([VOCAB[i] for i in hits] if hits.size else [normalize_text(skill)]):
+            if name and name not in names:
+                names.append(name)
+    return names
+
+
+def score_posting_for_user(posting: dict, skill_gaps: List[str]) -> dict:
+    """
+    Local, per-user match: the share of the posting's required skills that are NOT known gaps,
+    with the first (most emphasized) requirement counting double. No LLM call.
+    """
+    required = canonical_skills(posting.get("required_skills", []))
+    gaps = set(canonical_skills(skill_gaps))
+    if required:
+        weights = [2.0] + [1.0] * (len(required) - 1)
+        blocked = sum(w for w, skill in zip(weights, required) if skill in gaps)
+        score = round(100 * (1 - blocked / sum(weights)))
+    else:
+        score = 70  # Nothing to check against
+    clashes = [skill for skill in required if skill in gaps]
+    strengths = [skill for skill in required if skill not in gaps][:3]
+
+    return JobOpportunity(
+        role_title=posting["role_title"],
+        company=posting["company"],
+        match_score=score,
+        why_good_fit=(f"Asks for {', '.join(strengths)}, which you cover. " if strengths else "") + posting.get("summary", ""),
+        cautionary_warning=(f"Requires {', '.join(clashes)}, which is currently a skill gap for you." if clashes else None),
+        apply_link_guess=posting["url"],
+    ).dict()
+
+
+def match_shared_postings(target_role: str, skill_gaps: List[str], location: str = "Remote"):
+    """
+    Same shape as hunt_opportunities' opportunities, built from the shared extraction, plus
+    "evaluated": every posting URL the extraction looked at (including ones it rejected).
+    """
+    try:
+        extraction = extract_shared_postings(target_role, location)
+    except Exception as e:
+        return {"error": f"Search failed: {str(e)}"}
+    if extraction is None:
+        return {"error": "Posting extraction failed."}
+    opportunities = []
+    for posting in extraction["postings"]:
+        opportunity = score_posting_for_user(posting, skill_gaps)
+        # Posting-level context for dedup downstream (not part of JobOpportunity)
+        opportunity["description"] = " ".join([posting.get("summary", ""), posting.get("snippet", ""),
+                                               ", ".join(posting.get("required_skills", []))])
+        opportunities.append(opportunity)
+    opportunities.sort(key=lambda o: -o["match_score"])
+    return {"opportunities": opportunities, "evaluated": extraction["evaluated"]}
+
+
 # --- TEST BLOCK ---
 if __name__ == "__main__":
     # Test: User wants 'Frontend Dev' but sucks at 'Redux'
-    print(hunt_opportunities("Frontend Engineer", ["Redux", "Unit Testing"], "Remote"))
\ No newline at end of file
+    print(hunt_opportunities("Frontend Engineer", ["Redux", "Unit Testing"], "Remote"))
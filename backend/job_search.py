@@ -0,0 +1,209 @@
+# backend/job_search.py
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Optional
+from urllib.parse import urlparse
+
+from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+
+from ttl_cache import TTLCache
+
+# --- CONFIGURATION ---
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "1800"))         # A query is searched at most once per window
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "20"))
+POSTING_MAX_AGE = int(os.getenv("POSTING_MAX_AGE", str(7 * 86400)))  # Postings not seen again for a week are stale
+POSTING_DB_PATH = os.getenv("POSTING_DB_PATH", os.path.join(".cache", "postings.db"))
+
+search_api = DuckDuckGoSearchAPIWrapper()
+search_cache = TTLCache(ttl=SEARCH_CACHE_TTL, max_entries=512, name="search")
+
+
+# --- QUERIES ---
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+def query_key(target_role: str, location: str) -> str:
+    """'  Full Stack  Engineer', 'remote' and 'full stack engineer', 'Remote' share one key."""
+    return f"{normalize_text(target_role)}|{normalize_text(location) or 'remote'}"
+
+def posting_query(target_role: str, location: str) -> str:
+    return f"hiring {target_role} {location} \"apply\" -intitle:senior -intitle:lead site:greenhouse.io OR site:lever.co"
+
+
+def web_search(query: str, max_results: int = SEARCH_MAX_RESULTS) -> List[Dict[str, str]]:
+    """Structured DuckDuckGo results ({title, link, snippet}), cached per normalized query."""
+    def fetch():
+        print(f"--- [Search] Live query: {query[:80]} ---")
+        return search_api.results(query, max_results)
+    return search_cache.get_or_compute((normalize_text(query), max_results), fetch)
+
+def web_search_text(query: str, max_results: int = 5) -> str:
+    """Snippet blob in the same spirit as DuckDuckGoSearchRun, but served from the shared cache."""
+    return " ".join(r.get("snippet", "") for r in web_search(query, max_results))
+
+
+# --- PARSING ---
+
+# boards.greenhouse.io/<company>/jobs/123, jobs.lever.co/<company>/<uuid>: the company slug is the first path segment
+BOARD_HOSTS = ("greenhouse.io", "lever.co")
+_TITLE_PREFIX = re.compile(r"^(?:job application for|apply for|careers at)\s+", re.IGNORECASE)
+
+
+def company_from_url(url: str) -> Optional[str]:
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    parts = [p for p in parsed.path.split("/") if p]
+    if host.endswith(BOARD_HOSTS) and parts and parts[0] not in ("embed", "jobs"):
+        return parts[0].replace("-", " ").title()
+    return None
+
+
+def parse_posting(result: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """
+    Turns one search hit into {title, company, url, snippet}.
+    Greenhouse titles read 'Job Application for <Role> at <Company>', Lever titles '<Company> - <Role>'.
+    """
+    url = (result.get("link") or "").split("?")[0].rstrip("/")
+    raw_title = re.sub(r"\s+", " ", result.get("title") or "").strip()
+    if not url or not raw_title:
+        return None
+
+    company = company_from_url(url)
+    title = _TITLE_PREFIX.sub("", raw_title)
+    if " at " in title:
+        title, _, named = title.rpartition(" at ")
+        company = company or named.strip()
+    elif " - " in title:
+        named, _, title = title.partition(" - ")
+        company = company or named.strip()
+    return {
+        "title": title.strip(" -|"),
+        "company": company or urlparse(url).netloc,
+        "url": url,
+        "snippet": re.sub(r"\s+", " ", result.get("snippet") or "").strip()[:300],
+    }
+
+
+# --- POSTING STORE ---
+
+class PostingStore:
+    """
+    Deduplicated local store of job postings (SQLite, one row per URL).
+    first_seen never moves; last_seen is bumped every time a search returns the posting again.
+    posting_queries links each URL to every query that returned it, so queries sharing a posting all see it.
+    Also remembers when each normalized query was last searched, so hunts in other processes
+    (background_worker) reuse a fresh search instead of repeating it.
+    """
+
+    def __init__(self, path: str = POSTING_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._ready = False  # Directory and tables are created on first use, not at import
+
+    def _create(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS postings (
+                    url TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    company TEXT NOT NULL,
+                    snippet TEXT,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS posting_queries (
+                    url TEXT NOT NULL,
+                    query_key TEXT NOT NULL,
+                    last_seen REAL NOT NULL,
+                    PRIMARY KEY (url, query_key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_posting_queries_key ON posting_queries (query_key, last_seen);
+                CREATE TABLE IF NOT EXISTS searches (
+                    query_key TEXT PRIMARY KEY,
+                    searched_at REAL NOT NULL
+                );
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            with self._schema_lock:
+                if not self._ready:
+                    self._create()
+                    self._ready = True
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def upsert(self, key: str, postings: List[Dict[str, str]], now: Optional[float] = None) -> int:
+        """Stores postings for a query. Returns how many URLs were new."""
+        now = now or time.time()
+        with self._lock, self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO postings (url, title, company, snippet, first_seen, last_seen) "
+                "VALUES (:url, :title, :company, :snippet, :now, :now)",
+                [{**p, "now": now} for p in postings],
+            )
+            added = conn.total_changes - before
+            conn.executemany("UPDATE postings SET last_seen = ?, snippet = ? WHERE url = ?",
+                             [(now, p["snippet"], p["url"]) for p in postings])
+            conn.executemany(
+                "INSERT INTO posting_queries (url, query_key, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT(url, query_key) DO UPDATE SET last_seen = excluded.last_seen",
+                [(p["url"], key, now) for p in postings],
+            )
+            conn.execute("INSERT OR REPLACE INTO searches (query_key, searched_at) VALUES (?, ?)", (key, now))
+        return added
+
+    def last_searched(self, key: str) -> Optional[float]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT searched_at FROM searches WHERE query_key = ?", (key,)).fetchone()
+        return row["searched_at"] if row else None
+
+    def recent(self, key: str, max_age: float = POSTING_MAX_AGE, limit: int = 50) -> List[Dict]:
+        """Postings for a query seen within max_age, most recently seen first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT p.url, p.title, p.company, p.snippet, p.first_seen, q.last_seen "
+                "FROM posting_queries q JOIN postings p ON p.url = q.url "
+                "WHERE q.query_key = ? AND q.last_seen >= ? ORDER BY q.last_seen DESC, p.first_seen DESC LIMIT ?",
+                (key, time.time() - max_age, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+posting_store = PostingStore()
+
+
+def find_postings(target_role: str, location: str = "Remote", limit: int = 50) -> List[Dict]:
+    """
+    Structured postings for (role, location).
+    Searches at most once per SEARCH_CACHE_TTL per normalized query (across processes, via the store);
+    otherwise reads straight from the local store. Raises if a needed live search fails and nothing is stored.
+    """
+    key = query_key(target_role, location)
+    searched_at = posting_store.last_searched(key)
+    if searched_at is None or time.time() - searched_at > SEARCH_CACHE_TTL:
+        try:
+            results = web_search(posting_query(target_role, location))
+            postings = [p for p in map(parse_posting, results) if p]
+            added = posting_store.upsert(key, postings)
+            print(f"--- [Search] {key}: {len(postings)} postings, {added} new ---")
+        except Exception as e:
+            print(f"Search Error ({key}): {e}")
+            stored = posting_store.recent(key, limit=limit)
+            if not stored:
+                raise
+            return stored
+    return posting_store.recent(key, limit=limit)
+
+
+def search_stats() -> dict:
+    return search_cache.stats()
@@ -1,6 +1,8 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
 import os
@@ -17,18 +19,25 @@ from presidio_anonymizer import AnonymizerEngine
 
 # --- IMPORT ALL ENGINES ---
 from auditor import GitHubAuditor
+from batch_auditor import stream_batch_ndjson
+from batch_ranker import stream_ranking_ndjson, stage_archive, new_workdir, MAX_BATCH_FILES, MAX_DEEP_DIVES
 from graph import app_graph
-from resume_parser import analyze_resume
+from resume_parser import analyze_resume, get_extraction_metrics
+from resume_cache import cache_stats as resume_cache_stats
+from ocr_service import ocr_service
 from database import db_manager
 from voice_processor import VoiceProcessor
-from roadmap_generator import generate_learning_roadmap
-# from demand_analyzer import analyze_market_demand 
-from challenge_generator import generate_challenge
+from roadmap_generator import generate_learning_roadmap, stream_learning_roadmap
+from demand_analyzer import get_market_pulse, peek_market_pulse, market_refresher
+from market_trends import get_market_trends
+from challenge_generator import generate_challenge, stream_challenge
 from code_sandbox import execute_code 
 from recruiter_proxy import query_digital_twin
-from job_fetcher import hunt_opportunities
-from resume_tailor import tailor_resume
-from skill_passport import get_skill_passport
+from job_fetcher import hunt_opportunities, stream_opportunities
+from resume_tailor import tailor_resume, stream_tailored_resume
+from structured_stream import ndjson
+from skill_passport import get_skill_passport, on_challenge_passed, handles_of
+from merkle_ledger import passport_ledger
 
 # --- NEW IMPORTS (The "Agentic" Suite) ---
 from networking_agent import generate_cold_outreach
@@ -36,6 +45,7 @@ from negotiator import start_negotiation_scenario, run_negotiation_turn
 from ab_tester import run_ab_test
 from kanban import add_application, get_applications, update_status, Application
 from public_routes import router as public_router
+from profile_snapshots import materialize_snapshot
 
 load_dotenv()
 
@@ -92,6 +102,13 @@ def sanitize_input(text: str) -> str:
     clean = text.replace("\0", "")
     return clean[:5000]
 
+def remove_after(events, path: str):
+    """Yields a streaming generator's events, then deletes the temp file it was reading."""
+    try:
+        yield from events
+    finally:
+        if os.path.exists(path): os.remove(path)
+
 # --- DATA MODELS ---
 class ChatRequest(BaseModel):
     message: str
@@ -140,8 +157,27 @@ class KanbanUpdate(BaseModel):
     id: str
     status: str
 
+class BatchAuditRequest(BaseModel):
+    usernames: List[str]
+
+class MarketDemandRequest(BaseModel):
+    role: str
+    location: str = "Remote"
+
 # --- ROUTES ---
 
+@app.on_event("startup")
+async def start_background_jobs():
+    # Keeps the dashboard's popular market snapshots warm
+    if os.getenv("MARKET_PULSE_BACKGROUND", "true").lower() == "true":
+        market_refresher.start()
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    market_refresher.stop()
+    # Spawned OCR workers would otherwise outlive the API process (e.g. across --reload restarts)
+    ocr_service.shutdown()
+
 @app.get("/")
 async def health_check():
     return {"status": "active", "mode": "stateful_agent"}
@@ -190,16 +226,45 @@ async def chat_endpoint(request: ChatRequest, user_id: str = Depends(get_current
 
 # 2. ROADMAP & MARKET
 @app.post("/api/career/roadmap")
-async def generate_roadmap(request: RoadmapRequest, user_id: str = Depends(get_current_user)):
+async def generate_roadmap(request: RoadmapRequest, stream: bool = False, user_id: str = Depends(get_current_user)):
+    # ?stream=true: NDJSON, one event per week as soon as it is packed
+    if stream:
+        return StreamingResponse(ndjson(stream_learning_roadmap(request.skill_gaps, request.target_role)),
+                                 media_type="application/x-ndjson")
     return generate_learning_roadmap(request.skill_gaps, request.target_role)
 
+@app.get("/api/career/market-pulse")
+async def market_pulse(role: str, location: str = "Remote"):
+    # Aggregate market data, nothing user-specific. Public, so snapshots only: a miss never costs
+    # searches or an LLM call and isn't counted as demand (that's /api/career/demand, signed in).
+    result = peek_market_pulse(role, location)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No market snapshot for this role yet. Sign in to request one.")
+    return result
+
+@app.get("/api/career/market-trends")
+async def market_trends(role: str, location: str = "Remote", window: int = 7):
+    result = await run_in_threadpool(get_market_trends, role, location, window)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
+@app.post("/api/career/demand")
+async def market_demand(request: MarketDemandRequest, user_id: str = Depends(get_current_user)):
+    return await run_in_threadpool(get_market_pulse, request.role, request.location)
+
 @app.post("/api/career/hunt")
-async def find_jobs(request: JobHuntRequest, user_id: str = Depends(get_current_user)):
+async def find_jobs(request: JobHuntRequest, stream: bool = False, user_id: str = Depends(get_current_user)):
+    if stream:
+        return StreamingResponse(ndjson(stream_opportunities(request.target_role, request.current_skill_gaps, request.location)),
+                                 media_type="application/x-ndjson")
     return hunt_opportunities(request.target_role, request.current_skill_gaps, request.location)
 
 # 3. CHALLENGES
 @app.post("/api/challenge/new")
-async def create_challenge(request: ChallengeRequest, user_id: str = Depends(get_current_user)):
+async def create_challenge(request: ChallengeRequest, stream: bool = False, user_id: str = Depends(get_current_user)):
+    if stream:
+        return StreamingResponse(ndjson(stream_challenge(request.topic, request.difficulty)), media_type="application/x-ndjson")
     return generate_challenge(request.topic, request.difficulty)
 
 @app.post("/api/challenge/verify")
@@ -222,7 +287,7 @@ async def verify_challenge(request: VerifySolutionRequest, user_id: str = Depend
         status = "PASS" if passed else "FAIL"
         
         if db_manager.enabled:
-            db_manager.supabase.table("challenge_attempts").insert({
+            inserted = db_manager.supabase.table("challenge_attempts").insert({
                 "user_id": user_id,
                 "challenge_title": "Generated Challenge",
                 "user_code": request.user_code,
@@ -230,6 +295,13 @@ async def verify_challenge(request: VerifySolutionRequest, user_id: str = Depend
                 "output_log": output
             }).execute()
 
+            # Commit the pass to the Merkle ledger: O(log n), no passport re-signing
+            if passed and inserted.data:
+                passport_ledger.append(inserted.data[0]["id"], inserted.data[0]["created_at"])
+
+        if passed:
+            on_challenge_passed(user_id)
+
         return {"status": status, "output": output}
     except Exception as e:
         return {"status": "ERROR", "output": str(e)}
@@ -239,6 +311,42 @@ async def verify_challenge(request: VerifySolutionRequest, user_id: str = Depend
 async def ask_digital_twin(request: RecruiterQuery, user_id: str = Depends(get_current_user)):
     return query_digital_twin(request.username, request.question)
 
+@app.post("/api/recruiter/rank")
+async def rank_applicants_endpoint(
+    job_description: str = Form(...),
+    files: List[UploadFile] = File(None),
+    archive: UploadFile = File(None),
+    target_role: str = Form("Software Engineer"),
+    deep_dive_top_n: int = Form(0, ge=0, le=MAX_DEEP_DIVES),
+    user_id: str = Depends(get_current_user)
+):
+    # Stage uploads to disk before streaming: UploadFiles are closed once this handler returns
+    workdir = new_workdir()
+    try:
+        staged = []
+        for i, upload in enumerate((files or [])[:MAX_BATCH_FILES]):
+            path = os.path.join(workdir, f"upload_{i}.pdf")
+            with open(path, "wb") as out:
+                shutil.copyfileobj(upload.file, out)
+            staged.append((upload.filename, path))
+        if archive is not None:
+            archive_path = os.path.join(workdir, "archive.zip")
+            with open(archive_path, "wb") as out:
+                shutil.copyfileobj(archive.file, out)
+            staged += stage_archive(archive_path, workdir)
+    except Exception as e:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=f"Could not stage uploads: {e}")
+
+    if not staged:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail="Upload PDFs or a zip of PDFs.")
+
+    return StreamingResponse(
+        stream_ranking_ndjson(staged, job_description, target_role, deep_dive_top_n, workdir=workdir),
+        media_type="application/x-ndjson"
+    )
+
 # 5. NETWORKING AGENT
 @app.post("/api/network/generate")
 async def generate_outreach_endpoint(request: OutreachRequest, user_id: str = Depends(get_current_user)):
@@ -254,37 +362,56 @@ async def chat_negotiation(request: NegTurnRequest, user_id: str = Depends(get_c
     return run_negotiation_turn(request.history, request.current_offer)
 
 # 7. RESUME TOOLS
+# OCR runs in the shared process pool; the blocking parts run off the event loop so API workers stay responsive
 @app.post("/api/resume/upload")
-async def upload_resume(file: UploadFile = File(...)):
+async def upload_resume(
+    file: UploadFile = File(...),
+    target_role: str = Form("Software Engineer"),
+    job_description: str = Form(""),
+    deep_review: bool = Form(False)
+):
     try:
         file_location = f"temp_{file.filename}"
         with open(file_location, "wb+") as file_object:
             shutil.copyfileobj(file.file, file_object)
-        analysis = analyze_resume(file_location)
+        # Local keyword score by default; the LLM narrative only when deep_review is requested
+        analysis = await run_in_threadpool(analyze_resume, file_location, target_role, job_description, deep_review)
         if os.path.exists(file_location): os.remove(file_location)
         return {"filename": file.filename, "analysis": analysis}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/resume/extraction-metrics")
+async def resume_extraction_metrics():
+    # Pages read from the PDF text layer vs. pages that needed OCR, plus content-hash cache hits
+    return {**get_extraction_metrics(), "cache": resume_cache_stats()}
+
 @app.post("/api/resume/tailor")
-async def tailor_resume_endpoint(file: UploadFile = File(...), job_description: str = Form(...)):
+async def tailor_resume_endpoint(file: UploadFile = File(...), job_description: str = Form(...), stream: bool = Form(False)):
     try:
         file_location = f"temp_tailor_{file.filename}"
         with open(file_location, "wb+") as file_object:
             shutil.copyfileobj(file.file, file_object)
-        result = tailor_resume(file_location, job_description)
+        if stream:
+            # The staged file is removed once the stream finishes (or the client disconnects)
+            return StreamingResponse(ndjson(remove_after(stream_tailored_resume(file_location, job_description), file_location)),
+                                     media_type="application/x-ndjson")
+        result = await run_in_threadpool(tailor_resume, file_location, job_description)
         if os.path.exists(file_location): os.remove(file_location)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/experiments/run")
-async def run_resume_ab_test(file: UploadFile = File(...), job_description: str = Form(...)):
+async def run_resume_ab_test(file: UploadFile = File(...), job_description: str = Form(...),
+                             strategies: str = Form(""), target_role: str = Form("Software Engineer")):
     try:
         file_location = f"temp_ab_{file.filename}"
         with open(file_location, "wb+") as file_object:
             shutil.copyfileobj(file.file, file_object)
-        result = run_ab_test(file_location, job_description)
+        # Comma-separated strategy names, e.g. "specialist,generalist,impact"; empty = classic A/B
+        chosen = [s.strip().lower() for s in strategies.split(",") if s.strip()]
+        result = await run_in_threadpool(run_ab_test, file_location, job_description, chosen or None, target_role)
         if os.path.exists(file_location): os.remove(file_location)
         return result
     except Exception as e:
@@ -313,6 +440,26 @@ async def update_application_status(update: KanbanUpdate, user_id: str = Depends
 async def get_passport(username: str, user_id: str = Depends(get_current_user)):
     return get_skill_passport(username, session_id=None)
 
+@app.post("/api/passport/{username}/publish")
+async def publish_passport(username: str, user_id: str = Depends(get_current_user)):
+    # Only the owner of the handle may make it public (auth is bypassed entirely in stateless dev mode)
+    if db_manager.enabled and username.lower() not in {name.lower() for name in handles_of(user_id)}:
+        raise HTTPException(status_code=403, detail="You can only publish your own passport.")
+    # Materializes the public profile snapshot; it is then kept fresh by passport invalidation events
+    snapshot = materialize_snapshot(username)
+    if "error" in snapshot:
+        raise HTTPException(status_code=503, detail=snapshot["error"])
+    return {"username": username, "etag": snapshot["etag"], "updated_at": snapshot["updated_at"]}
+
+@app.get("/api/audit/cache/stats")
+async def audit_cache_stats():
+    return auditor_agent.cache_stats()
+
+@app.post("/api/audit/batch")
+async def audit_batch_endpoint(request: BatchAuditRequest, user_id: str = Depends(get_current_user)):
+    # NDJSON: one line per candidate as soon as it is scored, 'deferred' once the GitHub budget is spent
+    return StreamingResponse(stream_batch_ndjson(request.usernames, auditor_agent), media_type="application/x-ndjson")
+
 @app.get("/api/audit/{username}")
 async def audit_user_endpoint(username: str):
     return auditor_agent.calculate_trust_score(username)
@@ -368,5 +515,8 @@ async def run_interview_turn(user_id, message, history, topic, difficulty, sessi
         }
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Relaunch under uvicorn's own entry point: OCR pool workers re-run the parent's __main__,
+    # and with `python main.py` that would load Presidio and every agent into each worker.
+    import sys
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    os.execv(sys.executable, [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", app_dir, "--host", "0.0.0.0", "--port", "8000"])
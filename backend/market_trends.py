@@ -0,0 +1,216 @@
+# backend/market_trends.py
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from job_search import query_key
+
+# --- CONFIGURATION ---
+MARKET_HISTORY_DIR = os.getenv("MARKET_HISTORY_DIR", os.path.join(".cache", "market_history"))
+TREND_WINDOW = int(os.getenv("MARKET_TREND_WINDOW", "7"))  # Reports per rolling window
+MARKET_HISTORY_COMPACT_EVERY = int(os.getenv("MARKET_HISTORY_COMPACT_EVERY", "32"))  # Logged reports per .npz rewrite
+MARKET_HISTORY_MAX_REPORTS = int(os.getenv("MARKET_HISTORY_MAX_REPORTS", "5000"))  # Newest reports kept per role
+
+# SkillTrend.sentiment -> numeric signal for momentum
+SENTIMENT_SCORES = {"rising": 1, "stable": 0, "declining": -1, "saturated": -1}
+
+
+class MarketHistoryStore:
+    """
+    Columnar history of MarketPulse reports, one compressed .npz per (role, location).
+    Report columns:  ts (float64), demand_score (int16), saturated (bool)
+    Skill columns:   report (int32, row in the report columns), skill (int32, into the skill names), sentiment (int8)
+    A role's whole history loads as a handful of arrays, ready for one vectorized pass.
+    New reports go to a small per-key .log (one JSON line each) and are folded into the .npz every
+    MARKET_HISTORY_COMPACT_EVERY appends, keeping the newest MARKET_HISTORY_MAX_REPORTS.
+    """
+
+    def __init__(self, directory: str = MARKET_HISTORY_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _path(self, role: str, location: str, ext: str = ".npz") -> str:
+        return os.path.join(self.directory, hashlib.sha256(query_key(role, location).encode()).hexdigest()[:32] + ext)
+
+    def _load_npz(self, path: str) -> Dict[str, np.ndarray]:
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            return {
+                "ts": np.empty(0, np.float64), "demand_score": np.empty(0, np.int16), "saturated": np.empty(0, bool),
+                "report": np.empty(0, np.int32), "skill": np.empty(0, np.int32), "sentiment": np.empty(0, np.int8),
+                "skill_names": np.empty(0, "<U64"),
+            }
+
+    def _read_log(self, path: str) -> List[Dict[str, Any]]:
+        try:
+            with open(path) as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                pass  # A line cut short by a crash mid-write
+        return entries
+
+    def load(self, role: str, location: str = "Remote") -> Optional[Dict[str, np.ndarray]]:
+        with self._lock:
+            columns = extend_columns(self._load_npz(self._path(role, location)),
+                                     self._read_log(self._path(role, location, ".log")))
+        return columns if len(columns["ts"]) else None
+
+    def append(self, role: str, location: str, pulse: Dict[str, Any], ts: Optional[float] = None) -> None:
+        """Adds one report: a single appended line, plus a compaction every MARKET_HISTORY_COMPACT_EVERY reports."""
+        entry = {
+            "ts": ts or time.time(),
+            "demand_score": int(pulse.get("demand_score", 0)),
+            "saturated": bool(pulse.get("saturation_warning", False)),
+            "trends": [[str(t.get("skill_name", "")), str(t.get("sentiment", ""))] for t in pulse.get("key_trends", [])],
+        }
+        log_path = self._path(role, location, ".log")
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(log_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            if len(self._read_log(log_path)) >= MARKET_HISTORY_COMPACT_EVERY:
+                self._compact(role, location)
+
+    def _compact(self, role: str, location: str) -> None:
+        path, log_path = self._path(role, location), self._path(role, location, ".log")
+        # Moved aside first, so appends from other processes start a fresh log instead of being lost
+        pending = log_path + ".compacting"
+        os.replace(log_path, pending)
+        columns = trim_columns(extend_columns(self._load_npz(path), self._read_log(pending)), MARKET_HISTORY_MAX_REPORTS)
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **columns)
+        with open(path + ".tmp", "wb") as f:
+            f.write(buffer.getvalue())
+        os.replace(path + ".tmp", path)
+        os.remove(pending)
+
+
+def extend_columns(columns: Dict[str, np.ndarray], entries: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Appends logged reports to the report and skill columns."""
+    if not entries:
+        return columns
+    names = list(columns["skill_names"])
+    rows, skill_ids, sentiments = [], [], []
+    for offset, entry in enumerate(entries):
+        for skill_name, sentiment in entry.get("trends", []):
+            name = skill_name.strip().lower()[:64]
+            if not name:
+                continue
+            if name not in names:
+                names.append(name)
+            rows.append(len(columns["ts"]) + offset)
+            skill_ids.append(names.index(name))
+            sentiments.append(SENTIMENT_SCORES.get(sentiment.strip().lower(), 0))
+    return {
+        "ts": np.append(columns["ts"], np.array([e["ts"] for e in entries], np.float64)),
+        "demand_score": np.append(columns["demand_score"], np.array([e["demand_score"] for e in entries], np.int16)),
+        "saturated": np.append(columns["saturated"], np.array([e["saturated"] for e in entries], bool)),
+        "report": np.append(columns["report"], np.array(rows, np.int32)),
+        "skill": np.append(columns["skill"], np.array(skill_ids, np.int32)),
+        "sentiment": np.append(columns["sentiment"], np.array(sentiments, np.int8)),
+        "skill_names": np.array(names, "<U64"),
+    }
+
+
+def trim_columns(columns: Dict[str, np.ndarray], max_reports: int) -> Dict[str, np.ndarray]:
+    """Keeps the newest max_reports reports (and their skill rows)."""
+    drop = len(columns["ts"]) - max_reports
+    if drop <= 0:
+        return columns
+    keep = np.sort(np.argsort(columns["ts"], kind="stable")[drop:])
+    position = np.full(len(columns["ts"]), -1, np.int32)
+    position[keep] = np.arange(len(keep), dtype=np.int32)
+    kept_rows = position[columns["report"]] >= 0
+    return {
+        **{name: columns[name][keep] for name in ("ts", "demand_score", "saturated")},
+        "report": position[columns["report"]][kept_rows],
+        "skill": columns["skill"][kept_rows],
+        "sentiment": columns["sentiment"][kept_rows],
+        "skill_names": columns["skill_names"],
+    }
+
+
+market_history = MarketHistoryStore()
+
+
+def compute_trends(columns: Dict[str, np.ndarray], window: int = TREND_WINDOW) -> Dict[str, Any]:
+    """Rolling demand statistics and per-skill momentum over the full history, in one pass."""
+    order = np.argsort(columns["ts"], kind="stable")
+    reports = pd.DataFrame({
+        "ts": columns["ts"][order],
+        "demand_score": columns["demand_score"][order].astype(float),
+        "saturated": columns["saturated"][order],
+    })
+    reports["demand_ma"] = reports["demand_score"].rolling(window, min_periods=1).mean()
+    reports["demand_delta"] = reports["demand_score"].diff().fillna(0.0)
+    reports["demand_ma_delta"] = reports["demand_ma"].diff().fillna(0.0)
+    reports["saturation_rate"] = reports["saturated"].astype(float).rolling(window, min_periods=1).mean()
+
+    # Report x skill sentiment matrix (NaN where a report didn't mention the skill), rows in time order
+    position = np.empty_like(order)
+    position[order] = np.arange(len(order))
+    mentions = pd.DataFrame({
+        "report": position[columns["report"]] if len(columns["report"]) else np.empty(0, np.int64),
+        "skill": columns["skill_names"][columns["skill"]] if len(columns["skill"]) else np.empty(0, "<U64"),
+        "sentiment": columns["sentiment"].astype(float),
+    })
+    skills = []
+    if not mentions.empty:
+        matrix = mentions.pivot_table(index="report", columns="skill", values="sentiment", aggfunc="mean")
+        matrix = matrix.reindex(range(len(reports)))
+        rolled = matrix.rolling(window, min_periods=1).mean()
+        latest = rolled.ffill().iloc[-1]
+        # Momentum: rolling sentiment now vs. one window ago (or the earliest reading in shorter histories)
+        earlier = rolled.ffill().iloc[max(len(rolled) - 1 - window, 0)]
+        earliest = rolled.bfill().iloc[0]
+        momentum = (latest - earlier.fillna(earliest)).fillna(0.0)
+        counts = matrix.notna().sum()
+        for name in matrix.columns:
+            skills.append({
+                "skill": name,
+                "mentions": int(counts[name]),
+                "sentiment_ma": round(float(latest[name]), 3),
+                "momentum": round(float(momentum[name]), 3),
+            })
+        skills.sort(key=lambda s: (-s["momentum"], -s["mentions"]))
+
+    series = [{
+        "ts": float(r.ts),
+        "demand_score": int(r.demand_score),
+        "demand_ma": round(float(r.demand_ma), 2),
+        "demand_delta": float(r.demand_delta),
+        "saturated": bool(r.saturated),
+        "saturation_rate": round(float(r.saturation_rate), 3),
+    } for r in reports.itertuples()]
+
+    return {
+        "points": len(series),
+        "window": window,
+        "latest": series[-1] if series else None,
+        "demand_trend": round(float(reports["demand_ma_delta"].tail(window).sum()), 2) if series else 0.0,
+        "series": series,
+        "skills": skills,
+    }
+
+
+def get_market_trends(role: str, location: str = "Remote", window: int = TREND_WINDOW) -> Dict[str, Any]:
+    columns = market_history.load(role, location)
+    if columns is None or not len(columns["ts"]):
+        return {"error": "No market history for this role yet."}
+    return {"role": role, "location": location, **compute_trends(columns, max(1, window))}
@@ -0,0 +1,222 @@
+# backend/merkle_ledger.py
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Any
+
+# --- CONFIGURATION ---
+LEDGER_PATH = os.getenv("PASSPORT_LEDGER_PATH", os.path.join(".cache", "passport_ledger.jsonl"))
+
+
+# --- HASHING (RFC 6962 style domain separation) ---
+
+def leaf_hash(record_id: str, created_at: str) -> str:
+    """Hash of one PASS record in challenge_attempts."""
+    return hashlib.sha256(b"\x00" + f"{record_id}-{created_at}-PASS".encode()).hexdigest()
+
+def node_hash(left: str, right: str) -> str:
+    return hashlib.sha256(b"\x01" + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+class MerkleLedger:
+    """
+    Append-only Merkle tree over verified challenge passes.
+    - append():  O(log n), only the new right-edge nodes are hashed.
+    - root():    cached until the next append (peaks are folded right-to-left, same result as RFC 6962).
+    - prove():   O(log n) audit path so a single achievement can be checked without the rest of the passport,
+                 against the current tree or any earlier size (a passport stores the root and size it was signed at).
+    Leaves are persisted to an append-only JSONL file and the tree is rebuilt on start-up.
+    Leaf order is canonical, (created_at, id), not arrival order: every process holding the same set of
+    PASSes computes the same root. A record older than the newest leaf (written by another process)
+    triggers an O(n) rebuild; in-order appends stay O(log n). Such a rebuild shifts later leaves, so roots
+    signed before it can no longer be reproduced for sizes past the inserted record.
+    """
+
+    def __init__(self, path: Optional[str] = LEDGER_PATH):
+        self.path = path
+        self.levels: List[List[str]] = [[]]  # levels[0] = leaves, levels[h] = roots of complete 2^h subtrees
+        self.positions: Dict[str, int] = {}  # record_id -> leaf index
+        self.keys: List[tuple] = []  # (created_at, record_id) per leaf, ascending
+        self._root: Optional[str] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self.levels[0])
+
+    # --- PERSISTENCE ---
+
+    def _ensure_loaded(self) -> None:
+        """The ledger file is read on first use, not at import."""
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self._load()
+                    self._loaded = True
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        records = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        # Several processes append to the same file: keep one leaf per id
+                        records.setdefault(str(record["id"]), (record["created_at"], record["leaf"]))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ledger Load Error: {e}")
+        self._rebuild([(created_at, record_id, leaf) for record_id, (created_at, leaf) in records.items()])
+
+    def _rebuild(self, leaves: List[tuple]) -> None:
+        """Rebuilds the tree from (created_at, record_id, leaf) triples in canonical order."""
+        self.levels, self.positions, self.keys = [[]], {}, []
+        for created_at, record_id, leaf in sorted(leaves):
+            self._append_leaf(record_id, created_at, leaf)
+        self._root = None
+
+    def _persist(self, record_id: str, created_at: str, leaf: str) -> None:
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"id": record_id, "created_at": created_at, "leaf": leaf}) + "\n")
+        except OSError as e:
+            print(f"Ledger Write Error: {e}")
+
+    # --- WRITES ---
+
+    def _append_leaf(self, record_id: str, created_at: str, leaf: str) -> int:
+        position = len(self.levels[0])
+        self.levels[0].append(leaf)
+        self.positions[record_id] = position
+        self.keys.append((created_at, record_id))
+
+        # Climb while we just completed a right child
+        height, index = 0, position
+        while index % 2 == 1:
+            parent = node_hash(self.levels[height][index - 1], self.levels[height][index])
+            height += 1
+            if len(self.levels) == height:
+                self.levels.append([])
+            self.levels[height].append(parent)
+            index //= 2
+
+        self._root = None
+        return position
+
+    def append(self, record_id: str, created_at: str) -> int:
+        """Adds a PASS record. Idempotent: re-appending a known record returns its (current) position."""
+        record_id = str(record_id)
+        self._ensure_loaded()
+        with self._lock:
+            if record_id in self.positions:
+                return self.positions[record_id]
+            leaf = leaf_hash(record_id, created_at)
+            if self.keys and (created_at, record_id) < self.keys[-1]:
+                # Out of order: slot it into its canonical place
+                existing = [(c, r, self.levels[0][i]) for i, (c, r) in enumerate(self.keys)]
+                self._rebuild(existing + [(created_at, record_id, leaf)])
+            else:
+                self._append_leaf(record_id, created_at, leaf)
+            self._persist(record_id, created_at, leaf)
+            return self.positions[record_id]
+
+    def sync(self, records: List[Dict[str, Any]]) -> int:
+        """Appends any PASS rows (with 'id' and 'created_at') not yet in the ledger, oldest first."""
+        added = 0
+        self._ensure_loaded()
+        for record in sorted(records, key=lambda r: (r["created_at"], str(r["id"]))):
+            if str(record["id"]) not in self.positions:
+                self.append(record["id"], record["created_at"])
+                added += 1
+        return added
+
+    # --- READS ---
+
+    def _peaks(self, size: int) -> List[Dict[str, Any]]:
+        """Complete subtrees covering the first `size` leaves, left to right."""
+        offset, peaks = 0, []
+        for height in reversed(range(size.bit_length())):
+            if size & (1 << height):
+                peaks.append({"height": height, "start": offset, "hash": self.levels[height][offset >> height]})
+                offset += 1 << height
+        return peaks
+
+    @staticmethod
+    def _fold(hashes: List[str]) -> str:
+        acc = hashes[-1]
+        for h in reversed(hashes[:-1]):
+            acc = node_hash(h, acc)
+        return acc
+
+    def root(self) -> Optional[str]:
+        return self.head()["root"]
+
+    def head(self) -> Dict[str, Any]:
+        """Current root and tree size, read together (what a passport signs)."""
+        self._ensure_loaded()
+        with self._lock:
+            size = len(self.levels[0])
+            if self._root is None and size:
+                self._root = self._fold([p["hash"] for p in self._peaks(size)])
+            return {"root": self._root, "size": size}
+
+    def leaf(self, record_id: str) -> Optional[str]:
+        self._ensure_loaded()
+        position = self.positions.get(str(record_id))
+        return None if position is None else self.levels[0][position]
+
+    def prove(self, record_id: str, tree_size: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Inclusion proof: sibling hashes from the leaf up to the root, each tagged with its side.
+        With tree_size, the proof is for the tree of the first tree_size leaves (RFC 6962 style), so it
+        checks against a root signed back then; None if the record wasn't in that tree.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            position = self.positions.get(str(record_id))
+            size = len(self.levels[0]) if tree_size is None else tree_size
+            if position is None or not position < size <= len(self.levels[0]):
+                return None
+
+            peaks = self._peaks(size)
+            k = next(i for i, p in enumerate(peaks) if p["start"] <= position < p["start"] + (1 << p["height"]))
+            path = []
+
+            # 1. Inside the complete subtree that holds the leaf
+            index = position - peaks[k]["start"]
+            base = peaks[k]["start"]
+            for height in range(peaks[k]["height"]):
+                sibling = ((base >> height) + index) ^ 1
+                path.append({"side": "L" if index % 2 else "R", "hash": self.levels[height][sibling]})
+                index //= 2
+
+            # 2. Bag the peaks: everything to the right folds into one sibling, then each left peak
+            if k + 1 < len(peaks):
+                path.append({"side": "R", "hash": self._fold([p["hash"] for p in peaks[k + 1:]])})
+            for p in reversed(peaks[:k]):
+                path.append({"side": "L", "hash": p["hash"]})
+
+            root = self._fold([p["hash"] for p in peaks])
+            if size == len(self.levels[0]):
+                self._root = root
+            return {"record_id": str(record_id), "leaf_index": position, "leaf": self.levels[0][position],
+                    "path": path, "root": root, "size": size}
+
+    @staticmethod
+    def verify(leaf: str, path: List[Dict[str, str]], root: str) -> bool:
+        acc = leaf
+        for step in path:
+            acc = node_hash(step["hash"], acc) if step["side"] == "L" else node_hash(acc, step["hash"])
+        return acc == root
+
+
+# Shared ledger for the process (passport minting + challenge verification)
+passport_ledger = MerkleLedger()
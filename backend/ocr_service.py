@@ -0,0 +1,127 @@
+# backend/ocr_service.py
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import List, Optional
+
+import pytesseract
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+# --- OCR SETTINGS ---
+# Each worker rasterizes one page at a time, so peak memory is (workers x one page bitmap).
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_GRAYSCALE = os.getenv("OCR_GRAYSCALE", "true").lower() == "true"  # 1 byte/pixel instead of 3
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "10"))
+
+# --- POOL SETTINGS ---
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 2)))
+OCR_QUEUE_LIMIT = int(os.getenv("OCR_QUEUE_LIMIT", str(OCR_WORKERS * 4)))  # Pages queued or running, across all uploads
+OCR_DOCUMENT_DEADLINE = float(os.getenv("OCR_DOCUMENT_DEADLINE", "60"))  # Seconds per document
+
+
+def count_pages(file_path: str) -> int:
+    return pdfinfo_from_path(file_path)["Pages"]
+
+def ocr_page(file_path: str, page_number: int, dpi: int = OCR_DPI, grayscale: bool = OCR_GRAYSCALE) -> str:
+    """Rasterizes and OCRs a single page (1-based). The bitmap is released before returning."""
+    images = convert_from_path(file_path, dpi=dpi, grayscale=grayscale, first_page=page_number, last_page=page_number)
+    try:
+        return pytesseract.image_to_string(images[0]) if images else ""
+    finally:
+        for image in images:
+            image.close()
+        del images
+
+
+def _pool_context():
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["ocr_service"])
+    return context
+
+
+class OCRService:
+    """
+    Shared process pool for Tesseract.
+    - Pages of one document are sharded across cores and reassembled in page order.
+    - A bounded number of pages may be queued at once; further submissions wait (backpressure)
+      instead of piling work onto the pool, so one 40-page upload can't starve everyone else.
+    - Every document gets a deadline; pages that miss it, or whose OCR fails, are dropped from the
+      result without taking the rest of the document down with them.
+    """
+
+    def __init__(self, workers: int = OCR_WORKERS, queue_limit: int = OCR_QUEUE_LIMIT):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # Created lazily. Workers never fork the threaded server: they fork from a forkserver that has
+        # preloaded only this module ('spawn' where forkserver is unavailable). Every start method still
+        # re-runs the parent's __main__ in each worker, so serve via `uvicorn main:app` (main.py's
+        # __main__ block relaunches itself that way) rather than importing the whole app per worker.
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+            return self._pool
+
+    def _submit(self, file_path: str, page_number: int, dpi: int, grayscale: bool, deadline: float):
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise FutureTimeout("OCR queue is full")
+        try:
+            future = self._executor().submit(ocr_page, file_path, page_number, dpi, grayscale)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def ocr_pages(self, file_path: str, page_numbers: List[int], dpi: int = OCR_DPI, grayscale: bool = OCR_GRAYSCALE,
+                  deadline_seconds: float = OCR_DOCUMENT_DEADLINE) -> dict:
+        """OCRs the given pages in parallel. Returns {page_number: text} for the pages that met the deadline."""
+        deadline = time.monotonic() + deadline_seconds
+        futures, results = [], {}
+        for page_number in page_numbers:
+            try:
+                futures.append((page_number, self._submit(file_path, page_number, dpi, grayscale, deadline)))
+            except FutureTimeout:
+                print(f"--- [OCR] Queue saturated, submitted {len(futures)}/{len(page_numbers)} pages before the deadline. ---")
+                break
+            except Exception as e:
+                print(f"OCR Submit Error (page {page_number}): {e}")
+
+        for page_number, future in futures:
+            try:
+                results[page_number] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                future.cancel()
+                print(f"--- [OCR] Page {page_number} missed the document deadline. ---")
+            except Exception as e:
+                print(f"OCR Page Error (page {page_number}): {e}")
+        return results
+
+    def extract(self, file_path: str, dpi: int = OCR_DPI, grayscale: bool = OCR_GRAYSCALE, max_pages: int = OCR_MAX_PAGES,
+                deadline_seconds: float = OCR_DOCUMENT_DEADLINE) -> str:
+        """Full-document OCR with the same '--- Page N ---' layout as the sequential airlock."""
+        total_pages = count_pages(file_path)
+        if total_pages > max_pages:
+            print(f"--- [OCR] {total_pages} pages, capped at {max_pages}. ---")
+        pages = list(range(1, min(total_pages, max_pages) + 1))
+
+        results = self.ocr_pages(file_path, pages, dpi, grayscale, deadline_seconds)
+        return "".join(f"\n--- Page {n} ---\n{results[n]}" for n in pages if n in results)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+
+# Shared instance: every upload in this API process uses the same pool
+ocr_service = OCRService()
@@ -0,0 +1,185 @@
+# backend/posting_fingerprints.py
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Set, Tuple
+
+from database import db_manager
+
+# --- CONFIGURATION ---
+FINGERPRINT_DB_PATH = os.getenv("FINGERPRINT_DB_PATH", os.path.join(".cache", "posting_fingerprints.db"))
+# 'supabase' shares each user's board memory across worker nodes (required with the Supabase hunt queue,
+# since any node may claim any user); 'local' keeps it in SQLite on this machine
+FINGERPRINT_STORE = os.getenv("FINGERPRINT_STORE", "supabase" if db_manager.enabled else "local")
+# Bits out of 64. Job blurbs are short, so a reworded repost moves far more bits than the usual
+# web-page threshold of 3; unrelated postings sit around 32.
+SIMHASH_MAX_DISTANCE = int(os.getenv("SIMHASH_MAX_DISTANCE", "12"))
+
+_SENIORITY = re.compile(r"\b(senior|sr|junior|jr|lead|staff|principal|mid|level|i{1,3}|[1-3])\b")
+
+
+# --- FINGERPRINTS ---
+
+def normalize_key(company: str, title: str) -> str:
+    """'Acme, Inc.' + 'Sr. Backend Engineer (Remote)' and 'acme inc' + 'Backend Engineer' share a key."""
+    def clean(text: str) -> str:
+        text = re.sub(r"\(.*?\)", " ", (text or "").lower())
+        text = re.sub(r"[^a-z0-9+#]+", " ", text)
+        return " ".join(text.split())
+    company = re.sub(r"\b(inc|llc|ltd|gmbh|corp|co)\b", " ", clean(company))
+    return f"{' '.join(company.split())}|{' '.join(_SENIORITY.sub(' ', clean(title)).split())}"
+
+
+def simhash(text: str, shingle: int = 2) -> int:
+    """64-bit SimHash over word shingles: similar texts differ in few bits."""
+    words = re.findall(r"[a-z0-9+#]+", (text or "").lower())
+    grams = [" ".join(words[i:i + shingle]) for i in range(max(len(words) - shingle + 1, 1))] if words else []
+    weights = [0] * 64
+    for gram in grams:
+        h = int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class FingerprintIndex:
+    """
+    Per-user memory of postings already put on the Kanban board (SQLite; see SupabaseFingerprintIndex).
+    A posting is a duplicate if its normalized company+title was seen before, or if its description
+    SimHash is within SIMHASH_MAX_DISTANCE bits of one already seen. Only the user's own rows are
+    compared, as one XOR + popcount per posting on their board.
+    Also keeps the set of posting URLs already evaluated for each user, so a hunt skips them outright.
+    """
+
+    def __init__(self, path: str = FINGERPRINT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._ready = False  # Directory and tables are created on first use, not at import
+
+    def _create(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    user_id TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    simhash TEXT NOT NULL,
+                    url TEXT,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (user_id, key)
+                );
+                CREATE TABLE IF NOT EXISTS processed_postings (
+                    user_id TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    processed_at REAL NOT NULL,
+                    PRIMARY KEY (user_id, url)
+                );
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            with self._schema_lock:
+                if not self._ready:
+                    self._create()
+                    self._ready = True
+        return sqlite3.connect(self.path, timeout=10)
+
+    def fingerprints(self, user_id: str) -> List[Tuple[str, str]]:
+        """(key, hex simhash) of every posting on the user's board."""
+        with self._connect() as conn:
+            return conn.execute("SELECT key, simhash FROM fingerprints WHERE user_id = ?", (user_id,)).fetchall()
+
+    def _insert(self, rows: List[dict]) -> None:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO fingerprints (user_id, key, simhash, url, created_at) "
+                "VALUES (:user_id, :key, :simhash, :url, :now)", [{**row, "now": now} for row in rows])
+
+    def processed(self, user_id: str, urls: List[str]) -> Set[str]:
+        """The subset of urls already evaluated for this user."""
+        if not urls:
+            return set()
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT url FROM processed_postings WHERE user_id = ? AND url IN ({','.join('?' * len(urls))})",
+                                (user_id, *urls)).fetchall()
+        return {row[0] for row in rows}
+
+    def mark_processed(self, user_id: str, urls: List[str]) -> None:
+        """Idempotent: marking a URL twice keeps its first processed_at."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT OR IGNORE INTO processed_postings (user_id, url, processed_at) VALUES (?, ?, ?)",
+                             [(user_id, url, now) for url in urls])
+
+    def find_duplicate(self, user_id: str, company: str, title: str, description: str = "",
+                       known: Optional[List[Tuple[str, str]]] = None) -> Optional[str]:
+        """
+        Returns the key of the matching posting already on the user's board, or None.
+        Pass `known` (from fingerprints()) to check a batch against one read of the board.
+        """
+        key = normalize_key(company, title)
+        known = self.fingerprints(user_id) if known is None else known
+        if any(other_key == key for other_key, _ in known):
+            return key
+        if not description.strip():
+            return None
+        value = simhash(description)
+        for other_key, other_hash in known:
+            if int(other_hash, 16) and hamming(value, int(other_hash, 16)) <= SIMHASH_MAX_DISTANCE:
+                return other_key
+        return None
+
+    def add(self, user_id: str, company: str, title: str, description: str = "", url: str = "") -> None:
+        self.add_many(user_id, [{"company": company, "role_title": title, "description": description, "apply_link_guess": url}])
+
+    def add_many(self, user_id: str, jobs: List[dict]) -> None:
+        """Records a batch of postings (opportunity dicts) in one write. Re-adding a posting is a no-op."""
+        if jobs:
+            self._insert([{"user_id": user_id, "key": normalize_key(job["company"], job["role_title"]),
+                           "simhash": f"{simhash(job.get('description', '')):016x}", "url": job.get("apply_link_guess", "")}
+                          for job in jobs])
+
+
+class SupabaseFingerprintIndex(FingerprintIndex):
+    """Same contract as FingerprintIndex, backed by the posting_fingerprints / processed_postings tables in supabase_schema.sql."""
+
+    def __init__(self):
+        pass
+
+    def fingerprints(self, user_id: str) -> List[Tuple[str, str]]:
+        rows = db_manager.supabase.table("posting_fingerprints").select("key, simhash").eq("user_id", user_id).execute()
+        return [(row["key"], row["simhash"]) for row in rows.data or []]
+
+    def processed(self, user_id: str, urls: List[str]) -> Set[str]:
+        if not urls:
+            return set()
+        rows = db_manager.supabase.table("processed_postings").select("url").eq("user_id", user_id).in_("url", urls).execute()
+        return {row["url"] for row in rows.data or []}
+
+    def mark_processed(self, user_id: str, urls: List[str]) -> None:
+        if urls:
+            db_manager.supabase.table("processed_postings").upsert(
+                [{"user_id": user_id, "url": url} for url in urls], on_conflict="user_id,url", ignore_duplicates=True).execute()
+
+    def _insert(self, rows: List[dict]) -> None:
+        db_manager.supabase.table("posting_fingerprints").upsert(
+            rows, on_conflict="user_id,key", ignore_duplicates=True).execute()
+
+
+def get_fingerprint_index() -> FingerprintIndex:
+    if FINGERPRINT_STORE == "supabase" and db_manager.enabled:
+        return SupabaseFingerprintIndex()
+    return FingerprintIndex()
+
+
+fingerprint_index = get_fingerprint_index()
@@ -0,0 +1,175 @@
+# backend/profile_snapshots.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+from database import db_manager
+from skill_passport import get_skill_passport, subscribe_passport_events, _mint_skill_passport
+
+# --- CONFIGURATION ---
+SNAPSHOT_DIR = os.getenv("PROFILE_SNAPSHOT_DIR", os.path.join(".cache", "profiles"))
+SNAPSHOT_TABLE = "public_profile_snapshots"
+SNAPSHOT_MISS_TTL = float(os.getenv("PROFILE_SNAPSHOT_MISS_TTL", "60"))  # Unpublished users aren't re-queried for this long
+# In-memory copies are re-read after this long, so rewrites by other API workers show up
+SNAPSHOT_MEMORY_TTL = float(os.getenv("PROFILE_SNAPSHOT_MEMORY_TTL", "30"))
+
+# Fields a recruiter may see. Everything else in the passport stays private.
+PUBLIC_FIELDS = ("candidate_id", "generated_at", "github_trust_score", "interview_readiness_score", "verified_skills", "ledger_root", "ledger_size", "passport_signature")
+PUBLIC_ACHIEVEMENT_FIELDS = ("challenge_title", "status", "timestamp", "verification_hash", "record_id")
+
+
+def build_public_profile(passport: Dict[str, Any]) -> Dict[str, Any]:
+    """Compacts a signed passport into the public document served at /api/public/profile."""
+    achievements = []
+    for item in passport.get("recent_achievements", []):
+        data = item.dict() if hasattr(item, "dict") else dict(item)
+        achievements.append({k: data.get(k) for k in PUBLIC_ACHIEVEMENT_FIELDS})
+
+    profile = {k: passport.get(k) for k in PUBLIC_FIELDS}
+    profile["recent_achievements"] = achievements
+    return profile
+
+
+class SnapshotStore:
+    """
+    Materialized public profiles.
+    Reads hit memory, then the local snapshot directory, then the Supabase snapshot table;
+    never GitHub and never the live passport tables.
+    """
+
+    def __init__(self, snapshot_dir: str = SNAPSHOT_DIR):
+        self.snapshot_dir = snapshot_dir
+        self._memory: Dict[str, tuple] = {}  # name -> (expires_at, snapshot)
+        self._lock = threading.Lock()
+        # One writer thread: rebuilds are serialized and never block a request
+        self._rebuilds = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot")
+        self._pending = set()
+        self._missing: Dict[str, float] = {}  # name -> time until which "not published" is trusted
+
+    def _path(self, username: str) -> str:
+        return os.path.join(self.snapshot_dir, hashlib.sha256(username.encode()).hexdigest()[:32] + ".json")
+
+    # --- READ PATH ---
+
+    def get(self, username: str) -> Optional[Dict[str, Any]]:
+        name = username.lower()
+        with self._lock:
+            expires_at, cached = self._memory.get(name, (0, None))
+            if expires_at > time.time():
+                return cached
+            if self._missing.get(name, 0) > time.time():
+                return None
+
+        snapshot = None
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            if db_manager.enabled:
+                try:
+                    rows = db_manager.supabase.table(SNAPSHOT_TABLE).select("document, etag, updated_at").eq("username", name).limit(1).execute()
+                    if rows.data:
+                        snapshot = rows.data[0]
+                except Exception as e:
+                    print(f"Snapshot Read Error: {e}")
+
+        with self._lock:
+            if snapshot:
+                self._memory[name] = (time.time() + SNAPSHOT_MEMORY_TTL, snapshot)
+                self._missing.pop(name, None)
+            else:
+                self._missing[name] = time.time() + SNAPSHOT_MISS_TTL
+        return snapshot
+
+    # --- WRITE PATH ---
+
+    def write(self, username: str, passport: Dict[str, Any]) -> Dict[str, Any]:
+        name = username.lower()
+        document = build_public_profile(passport)
+        # generated_at changes on every mint; leave it out so unchanged data keeps its ETag
+        body = json.dumps({k: v for k, v in document.items() if k != "generated_at"}, sort_keys=True, separators=(",", ":"))
+        snapshot = {
+            "document": document,
+            "etag": '"' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"',
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+
+        with self._lock:
+            expires_at, previous = self._memory.get(name, (0, None))
+            if expires_at <= time.time():
+                previous = None  # Another worker may have rewritten it since
+            self._memory[name] = (time.time() + SNAPSHOT_MEMORY_TTL, snapshot)
+            self._missing.pop(name, None)
+        if previous and previous["etag"] == snapshot["etag"]:
+            return previous  # Nothing changed, keep the old validators
+
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            tmp = self._path(name) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self._path(name))
+        except OSError as e:
+            print(f"Snapshot Write Error: {e}")
+
+        if db_manager.enabled:
+            try:
+                db_manager.supabase.table(SNAPSHOT_TABLE).upsert({"username": name, **snapshot}).execute()
+            except Exception as e:
+                print(f"Snapshot Upsert Error: {e}")
+        return snapshot
+
+    def schedule_rebuild(self, username: str) -> None:
+        """Queues a background re-materialization. Repeated requests for the same user collapse into one."""
+        name = username.lower()
+        with self._lock:
+            if name in self._pending:
+                return
+            self._pending.add(name)
+        self._rebuilds.submit(self._rebuild, name)
+
+    def _rebuild(self, name: str) -> None:
+        with self._lock:
+            self._pending.discard(name)
+        try:
+            # Minting announces "minted", which lands back in write()
+            get_skill_passport(name)
+        except Exception as e:
+            print(f"Snapshot Rebuild Error ({name}): {e}")
+
+
+snapshot_store = SnapshotStore()
+
+
+def materialize_snapshot(username: str) -> Dict[str, Any]:
+    """
+    Builds (or refreshes) a candidate's public profile right now.
+    Minted fresh, and refused when the mint is degraded (GitHub or the DB unavailable): a zeroed
+    trust score must never go public under a new ETag.
+    """
+    passport, complete = _mint_skill_passport(username)
+    if not complete:
+        return {"error": "Passport data is temporarily unavailable. Try publishing again shortly."}
+    return snapshot_store.write(username, passport)
+
+
+def _on_passport_event(event: str, username: Optional[str], passport: Optional[dict]) -> None:
+    if event == "minted":
+        # Refresh pages that exist; publishing a new one is an explicit opt-in (materialize_snapshot)
+        if snapshot_store.get(username):
+            snapshot_store.write(username, passport)
+    elif event == "invalidated":
+        # Only candidates who already have a public page are worth rebuilding. A global flush
+        # (username None) doesn't fan out into one mint + GitHub audit per published page;
+        # those pages refresh on their owner's next event.
+        if username is not None and snapshot_store.get(username):
+            snapshot_store.schedule_rebuild(username)
+
+
+subscribe_passport_events(_on_passport_event)
@@ -1,8 +1,15 @@
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
-import random
+import os
+
+from profile_snapshots import snapshot_store
+from merkle_ledger import passport_ledger
+
+# Browsers/CDNs may reuse a profile for this long before revalidating with If-None-Match
+PROFILE_MAX_AGE = int(os.getenv("PUBLIC_PROFILE_MAX_AGE", "60"))
 
 # Initialize Router
 router = APIRouter(
@@ -21,40 +28,40 @@ class TwinChatResponse(BaseModel):
 # --- ROUTES ---
 
 @router.get("/profile/{username}")
-async def get_public_profile(username: str):
+async def get_public_profile(username: str, request: Request):
     """
     Fetches the public 'Skill Passport' for a candidate.
     Used by the /candidate/[username] frontend page.
+    Served from the precomputed snapshot: anonymous traffic never triggers a GitHub audit or DB fan-out.
     """
-    # SIMULATION: In production, fetch this from supabase via db_manager
-    # For now, we return mock data so your frontend works immediately.
-    
-    # Randomize score slightly to make it feel dynamic
-    base_score = 85
-    
-    return {
-        "candidate_id": username,
-        "interview_readiness_score": base_score + random.randint(0, 10),
-        "github_trust_score": 92,
-        "verified_skills": ["React", "Next.js", "Python", "LangChain", "System Design"],
-        "recent_achievements": [
-            {
-                "challenge_title": "Distributed Systems Challenge", 
-                "status": "Verified", 
-                "timestamp": "2023-12-01T10:00:00Z"
-            },
-            {
-                "challenge_title": "Advanced React Hooks", 
-                "status": "Verified", 
-                "timestamp": "2023-11-28T14:30:00Z"
-            },
-             {
-                "challenge_title": "Cybersecurity Basics", 
-                "status": "Verified", 
-                "timestamp": "2023-11-15T09:15:00Z"
-            }
-        ]
+    snapshot = snapshot_store.get(username)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="This candidate has not published a Skill Passport yet.")
+
+    headers = {
+        "ETag": snapshot["etag"],
+        "Cache-Control": f"public, max-age={PROFILE_MAX_AGE}, stale-while-revalidate={PROFILE_MAX_AGE * 5}",
     }
+    if request.headers.get("if-none-match") == snapshot["etag"]:
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(content=snapshot["document"], headers=headers)
+
+@router.get("/ledger/root")
+async def get_ledger_root():
+    """Current Merkle root over every verified challenge pass."""
+    return passport_ledger.head()
+
+@router.get("/ledger/proof/{record_id}")
+async def get_achievement_proof(record_id: str, tree_size: Optional[int] = None):
+    """
+    Inclusion proof for one achievement (the record_id shown on a public profile).
+    Pass the profile's ledger_size as tree_size, fold the path onto the leaf and compare with its ledger_root.
+    """
+    proof = passport_ledger.prove(record_id, tree_size)
+    if not proof:
+        raise HTTPException(status_code=404, detail="No verified pass with this id in the ledger.")
+    return proof
 
 @router.post("/twin/{username}/ask", response_model=TwinChatResponse)
 async def ask_digital_twin(username: str, req: TwinChatRequest):
@@ -0,0 +1,34 @@
+# backend/resume_cache.py
+
+import hashlib
+import os
+
+from ttl_cache import TTLCache
+
+# --- CONFIGURATION ---
+RESUME_CACHE_TTL = int(os.getenv("RESUME_CACHE_TTL", str(24 * 3600)))
+RESUME_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "256"))
+
+# Keyed by the PDF's SHA-256, so the same upload to /resume/upload, /resume/tailor and
+# /experiments/run is extracted once, no matter what the temp file was called.
+text_cache = TTLCache(ttl=RESUME_CACHE_TTL, max_entries=RESUME_CACHE_MAX_ENTRIES, name="resume_text")
+# Keyed by (sha256, normalized target_role, JD hash)
+analysis_cache = TTLCache(ttl=RESUME_CACHE_TTL, max_entries=RESUME_CACHE_MAX_ENTRIES * 4, name="resume_analysis")
+
+
+def file_digest(file_path: str) -> str:
+    """SHA-256 of the file contents, read in 64 KB chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def analysis_key(digest: str, target_role: str, job_description: str = "") -> tuple:
+    jd_digest = hashlib.sha256(job_description.strip().encode()).hexdigest()[:16] if job_description.strip() else ""
+    return (digest, " ".join(target_role.lower().split()), jd_digest)
+
+
+def cache_stats() -> dict:
+    return {"text": text_cache.stats(), "analysis": analysis_cache.stats()}
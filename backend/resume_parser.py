@@ -1,11 +1,15 @@
 import os
-import pytesseract
-from pdf2image import convert_from_path
+import threading
+import pymupdf
 from pypdf import PdfReader
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 
+from ocr_service import ocr_service, OCR_DPI, OCR_GRAYSCALE, OCR_MAX_PAGES
+from resume_cache import text_cache, analysis_cache, file_digest, analysis_key
+from ats_scorer import score_resume
+
 load_dotenv()
 
 # Initialize Groq (Llama 3.3 70B)
@@ -15,6 +19,15 @@ llm = ChatGroq(
     groq_api_key=os.getenv("GROQ_API_KEY")
 )
 
+# --- HYBRID EXTRACTION SETTINGS ---
+# A page's embedded text layer is trusted only if it looks like real prose; anything else is rasterized + OCR'd.
+MIN_PAGE_CHARS = int(os.getenv("TEXT_LAYER_MIN_CHARS", "80"))
+MAX_GARBAGE_RATIO = 0.05   # Replacement chars, control chars, private-use glyphs, (cid:NN) artifacts
+MIN_ALNUM_RATIO = 0.5      # Share of letters/digits among non-space characters
+
+EXTRACTION_METRICS = {"documents": 0, "pages_total": 0, "pages_text_layer": 0, "pages_ocr": 0}
+_metrics_lock = threading.Lock()
+
 def extract_text_with_pypdf(file_path):
     """
     FALLBACK LAYER: Pure Python Extraction
@@ -22,49 +35,131 @@ def extract_text_with_pypdf(file_path):
     """
     try:
         reader = PdfReader(file_path)
-        text = ""
+        parts = []
         for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+            parts.append((page.extract_text() or "") + "\n")
+        return "".join(parts)
     except Exception as e:
         print(f"PyPDF Error: {e}")
         return ""
 
-def extract_text_with_ocr(file_path):
+def extract_text_with_ocr(file_path, dpi: int = OCR_DPI, grayscale: bool = OCR_GRAYSCALE, max_pages: int = OCR_MAX_PAGES):
     """
     SECURITY LAYER: The 'Airlock'
-    1. Converts PDF pages to high-res images (Rasterization).
-    2. Uses OCR (Tesseract) to read the text from the pixels.
+    1. Converts PDF pages to images (Rasterization), one page per worker at a time.
+    2. Uses OCR (Tesseract) to read the text from the pixels, pages sharded across the shared process pool.
     """
     try:
         # Check if we can even run this (avoids crashing if tools are missing)
-        images = convert_from_path(file_path)
-        
-        full_text = ""
-        for i, image in enumerate(images):
-            text = pytesseract.image_to_string(image)
-            full_text += f"\n--- Page {i+1} ---\n{text}"
-            
-        return full_text
+        return ocr_service.extract(file_path, dpi, grayscale, max_pages)
     except Exception as e:
         print(f"OCR Error (System tools likely missing): {e}")
         return ""
 
-def analyze_resume(file_path: str, target_role: str = "Software Engineer"):
+def page_text_is_usable(text: str) -> bool:
+    """Quality gate for a page's text layer: enough characters and sane glyphs."""
+    glyphs = [c for c in text if not c.isspace()]
+    if len(glyphs) < MIN_PAGE_CHARS:
+        return False
+    garbage = sum(1 for c in glyphs if c == "\ufffd" or ord(c) < 32 or 0xE000 <= ord(c) <= 0xF8FF)
+    garbage += text.count("(cid:") * 6
+    alnum = sum(1 for c in glyphs if c.isalnum())
+    return garbage / len(glyphs) <= MAX_GARBAGE_RATIO and alnum / len(glyphs) >= MIN_ALNUM_RATIO
+
+def extract_text_hybrid(file_path: str, max_pages: int = OCR_MAX_PAGES) -> dict:
     """
-    1. Tries Secure OCR first.
-    2. Falls back to standard PyPDF if OCR fails.
-    3. Sends to AI.
+    Per-page extraction: read the text layer first, OCR only pages that are scanned or suspicious.
+    Born-digital resumes never get rasterized; scanned ones still go through the OCR airlock.
+    Every text-layer page is kept; max_pages caps only how many pages get OCR'd (the rest are
+    reported in "pages_skipped"). "complete" is False when any page sent to OCR came back missing
+    (failed or timed out).
     """
-    print(f"--- [Resume Parser] Processing: {file_path} ---")
-    
-    # 1. Try OCR (Best for security/images)
-    resume_text = extract_text_with_ocr(file_path)
-    
-    # 2. Fallback to PyPDF (Best for compatibility)
+    texts, ocr_needed = {}, []
+    with pymupdf.open(file_path) as doc:
+        page_count = doc.page_count
+        for index in range(page_count):
+            text = doc.load_page(index).get_text("text")
+            if page_text_is_usable(text):
+                texts[index + 1] = text
+            else:
+                ocr_needed.append(index + 1)
+
+    ocr_pages, skipped = ocr_needed[:max_pages], ocr_needed[max_pages:]
+    if skipped:
+        print(f"--- [Resume Parser] {len(ocr_needed)} pages need OCR, capped at {max_pages}. ---")
+
+    ocr_done = 0
+    if ocr_pages:
+        try:
+            ocr_results = ocr_service.ocr_pages(file_path, ocr_pages)
+            texts.update(ocr_results)
+            ocr_done = len(ocr_results)
+        except Exception as e:
+            print(f"OCR Error (System tools likely missing): {e}")
+
+    with _metrics_lock:
+        EXTRACTION_METRICS["documents"] += 1
+        EXTRACTION_METRICS["pages_total"] += page_count
+        EXTRACTION_METRICS["pages_text_layer"] += page_count - len(ocr_needed)
+        EXTRACTION_METRICS["pages_ocr"] += ocr_done
+
+    return {
+        "text": "".join(f"\n--- Page {n} ---\n{texts[n]}" for n in range(1, page_count + 1) if n in texts),
+        "pages_total": page_count,
+        "pages_text_layer": page_count - len(ocr_needed),
+        "pages_ocr": ocr_done,
+        "pages_skipped": len(skipped),
+        "complete": ocr_done == len(ocr_pages),
+    }
+
+def get_extraction_metrics() -> dict:
+    with _metrics_lock:
+        return dict(EXTRACTION_METRICS)
+
+def extract_resume_text(file_path: str) -> str:
+    """
+    Cached by the PDF's SHA-256: every resume endpoint shares one extraction per file.
+    1. Hybrid text-layer / OCR extraction.
+    2. Full OCR if the PDF can't be opened by PyMuPDF.
+    3. Falls back to standard PyPDF if everything else came back empty.
+    """
+    digest = file_digest(file_path)
+    cached = text_cache.get(digest)
+    if cached is not None:
+        print("--- [Resume Parser] Cache hit: skipping extraction. ---")
+        return cached
+
+    resume_text, complete = _extract_uncached(file_path)
+    # A partial extraction (OCR pages lost) is served once but never cached under the digest
+    if complete and resume_text and len(resume_text.strip()) >= 10:
+        text_cache.set(digest, resume_text)
+    return resume_text
+
+def _extract_uncached(file_path: str):
+    """Returns (text, complete)."""
+    try:
+        result = extract_text_hybrid(file_path)
+        resume_text, complete = result["text"], result["complete"]
+    except Exception as e:
+        print(f"--- [Resume Parser] Text layer unreadable ({e}). Using full OCR. ---")
+        # The full-document path can't tell which pages were dropped, so it is never cached
+        resume_text, complete = extract_text_with_ocr(file_path), False
+
     if not resume_text or len(resume_text.strip()) < 50:
-        print("--- [Resume Parser] OCR failed or empty. Switching to PyPDF fallback. ---")
+        print("--- [Resume Parser] Extraction failed or empty. Switching to PyPDF fallback. ---")
         resume_text = extract_text_with_pypdf(file_path)
+    return resume_text, complete
+
+def analyze_resume(file_path: str, target_role: str = "Software Engineer", job_description: str = "", deep_review: bool = False):
+    """
+    1. Extracts text (text layer first, OCR only for scanned pages, PyPDF as last resort).
+    2. Scores it locally against the JD (or the role's default skill profile): milliseconds, no tokens.
+    3. Only on deep_review: asks the AI for the narrative verdict, grounded on the local numbers.
+    """
+    print(f"--- [Resume Parser] Processing: {file_path} ---")
+
+    digest = file_digest(file_path)
+    resume_text = extract_resume_text(file_path)
 
     if not resume_text or len(resume_text.strip()) < 10:
         return {
@@ -73,21 +168,31 @@ def analyze_resume(file_path: str, target_role: str = "Software Engineer"):
             "error": "Could not read resume. File might be empty or encrypted."
         }
 
-    # 3. Length Guard
+    local_report = score_resume(resume_text, job_description, target_role)
+    if not deep_review:
+        return local_report
+
+    # Same PDF + same role + same JD = same narrative; skip the LLM call entirely
+    key = analysis_key(digest, target_role, job_description)
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        print("--- [Resume Parser] Cache hit: reusing previous analysis. ---")
+        return cached
+
+    # Length Guard
     if len(resume_text) > 20000:
         resume_text = resume_text[:20000] + "\n...[TRUNCATED]..."
     
-    # 4. AI Analysis
+    # AI Analysis (narrative only: the score and keywords are already computed)
     system_prompt = (
         f"You are an expert ATS (Applicant Tracking System) Auditor. "
         f"Target Role: {target_role}.\n"
-        f"Analyze the following RESUME TEXT. "
-        f"Output a JSON-like summary with these exact keys: "
-        f"1. 'match_score' (0-100). "
-        f"2. 'missing_keywords' (list). "
-        f"3. 'verdict' (Pass/Fail). "
-        f"4. 'red_flags' (e.g., vague timelines, filler words). "
-        f"5. 'summary' (One sentence opinion). "
+        f"A keyword scan already produced: match_score={local_report['match_score']}, "
+        f"missing_keywords={local_report['missing_keywords']}. "
+        f"Analyze the following RESUME TEXT and write the narrative review: "
+        f"1. 'red_flags' (e.g., vague timelines, filler words). "
+        f"2. 'summary' (One sentence opinion). "
+        f"3. 'verdict' (Pass/Fail) with a one-line justification. "
         f"Keep it strict."
     )
     
@@ -96,6 +201,8 @@ def analyze_resume(file_path: str, target_role: str = "Software Engineer"):
             SystemMessage(content=system_prompt),
             HumanMessage(content=resume_text)
         ])
-        return response.content
+        report = {**local_report, "narrative": response.content, "engine": "local+llm"}
+        analysis_cache.set(key, report)
+        return report
     except Exception as e:
-        return {"error": f"AI Inference Failed: {str(e)}"}
\ No newline at end of file
+        return {**local_report, "error": f"AI Inference Failed: {str(e)}"}
@@ -0,0 +1,174 @@
+# backend/resume_sections.py
+
+import difflib
+import os
+import re
+from typing import List, Dict, Tuple
+
+from pydantic import BaseModel
+
+from ats_scorer import heading_kind, score_many
+
+# --- CONFIGURATION ---
+TAILOR_TOKEN_BUDGET = int(os.getenv("TAILOR_TOKEN_BUDGET", "1800"))  # Resume tokens sent to the tailoring prompt
+CHARS_PER_TOKEN = 4  # Rough llama-3 average for English resume text
+
+# Kinds the tailor always wants to see, and kinds that never need rewriting
+ALWAYS_INCLUDE = {"summary"}
+NEVER_INCLUDE = {"header", "education", "certifications"}
+# Relevance multiplier per kind: rewriting experience moves the needle more than a skills list
+KIND_PRIORITY = {"summary": 1.5, "experience": 1.3, "projects": 1.1, "skills": 1.0}
+
+_PAGE_MARKER = re.compile(r"^\s*--- Page \d+ ---\s*$")
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+# "Jan 2020 - Present", "2019 – 2021", "03/2018 - 06/2020"
+_DATE_RANGE = re.compile(
+    rf"(?:{_MONTH}\s+)?(?:\d{{1,2}}/)?(?:19|20)\d{{2}}\s*(?:-|–|—|to)\s*(?:(?:{_MONTH}\s+)?(?:\d{{1,2}}/)?(?:19|20)\d{{2}}|present|current|now)",
+    re.IGNORECASE,
+)
+_BULLET = re.compile(r"^\s*(?:[-•*▪●◦]|\d+\.)\s")
+
+
+class ResumeSection(BaseModel):
+    section_id: str  # Stable within one resume: "<kind>-<n>", e.g. "experience-2"
+    kind: str        # header | summary | experience | skills | education | projects | certifications
+    heading: str
+    content: str
+    relevance: float = 0.0
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.content)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_entries(lines: List[str]) -> List[List[str]]:
+    """
+    Splits an experience/projects block into one entry per role.
+    A non-bullet line carrying a date range starts a new entry; a title line right above it
+    (e.g. the company name) moves into the new entry with it.
+    """
+    entries: List[List[str]] = [[]]
+    for line in lines:
+        if line.strip() and not _BULLET.match(line) and _DATE_RANGE.search(line):
+            current = entries[-1]
+            carried = []
+            if current and current[-1].strip() and not _BULLET.match(current[-1]) and not _DATE_RANGE.search(current[-1]):
+                carried = [current.pop()]
+            if any(l.strip() for l in current):
+                entries.append([])
+            else:
+                carried = current + carried
+                entries[-1] = []
+            entries[-1].extend(carried)
+        entries[-1].append(line)
+    return [entry for entry in entries if any(l.strip() for l in entry)]
+
+
+def segment_resume(text: str) -> List[ResumeSection]:
+    """
+    Splits extracted resume text into typed sections, in document order.
+    Experience and projects are split further into one section per entry, so the tailor
+    can pick the two relevant jobs out of ten.
+    """
+    blocks: List[Dict] = [{"kind": "header", "heading": "", "lines": []}]
+    for line in text.splitlines():
+        if _PAGE_MARKER.match(line):
+            continue
+        kind = heading_kind(line)
+        if kind:
+            blocks.append({"kind": kind, "heading": line.strip().strip(":").strip(), "lines": []})
+        else:
+            blocks[-1]["lines"].append(line)
+
+    sections, counters = [], {}
+    for block in blocks:
+        parts = _split_entries(block["lines"]) if block["kind"] in ("experience", "projects") else [block["lines"]]
+        for part in parts:
+            content = "\n".join(part).strip()
+            if not content:
+                continue
+            counters[block["kind"]] = counters.get(block["kind"], 0) + 1
+            sections.append(ResumeSection(
+                section_id=f"{block['kind']}-{counters[block['kind']]}",
+                kind=block["kind"],
+                heading=block["heading"] or block["kind"].title(),
+                content=content,
+            ))
+    return sections
+
+
+def score_sections(sections: List[ResumeSection], job_description: str, target_role: str = "Software Engineer") -> List[ResumeSection]:
+    """Scores every section against the JD in one vectorized pass (same scorer as the ATS check)."""
+    if sections:
+        scores = score_many([s.content for s in sections], job_description, target_role)
+        for section, score in zip(sections, scores):
+            section.relevance = float(score) * KIND_PRIORITY.get(section.kind, 0.5)
+    return sections
+
+
+def select_sections(sections: List[ResumeSection], job_description: str, target_role: str = "Software Engineer",
+                    token_budget: int = TAILOR_TOKEN_BUDGET) -> List[ResumeSection]:
+    """
+    Picks the sections worth tailoring: the summary always, then the most JD-relevant
+    experience/projects/skills until the token budget is spent. Returned in document order.
+    """
+    score_sections(sections, job_description, target_role)
+    chosen, used = set(), 0
+    for section in sections:
+        if section.kind in ALWAYS_INCLUDE:
+            chosen.add(section.section_id)
+            used += section.tokens
+
+    candidates = [s for s in sections if s.kind not in ALWAYS_INCLUDE | NEVER_INCLUDE]
+    for section in sorted(candidates, key=lambda s: -s.relevance):
+        if section.relevance <= 0 and chosen:
+            break
+        if used + section.tokens > token_budget and chosen:
+            continue
+        chosen.add(section.section_id)
+        used += section.tokens
+    return [s for s in sections if s.section_id in chosen]
+
+
+def render_sections(sections: List[ResumeSection]) -> str:
+    """Prompt layout: each section tagged with its id so the model can refer back to it."""
+    return "\n\n".join(f"[{s.section_id}] {s.heading}\n{s.content}" for s in sections)
+
+
+# --- EDITS ---
+
+def _locate(content: str, snippet: str):
+    """Exact match first, then a whitespace-insensitive one (OCR line breaks vs. the model's spacing)."""
+    start = content.find(snippet)
+    if start >= 0:
+        return start, start + len(snippet)
+    words = snippet.split()
+    if not words:
+        return None
+    match = re.search(r"\s+".join(re.escape(w) for w in words), content)
+    return (match.start(), match.end()) if match else None
+
+
+def apply_edits(content: str, edits: List[Tuple[str, str]]) -> Tuple[str, int]:
+    """
+    Applies (original_snippet, replacement) pairs to a section, first occurrence each, in order.
+    Returns the new text and how many edits landed; snippets not found verbatim are skipped.
+    """
+    applied = 0
+    for original, replacement in edits:
+        span = _locate(content, original) if original.strip() else None
+        if span is None:
+            continue
+        content = content[:span[0]] + replacement + content[span[1]:]
+        applied += 1
+    return content, applied
+
+
+def section_diff(original: str, tailored: str, section_id: str = "section") -> str:
+    """Unified line diff between the original and tailored section, computed locally."""
+    return "\n".join(difflib.unified_diff(original.splitlines(), tailored.splitlines(),
+                                           fromfile=f"{section_id} (original)", tofile=f"{section_id} (tailored)", lineterm=""))
@@ -3,10 +3,15 @@ from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional, Iterator
 
-# Import existing OCR tool to reuse logic
-from resume_parser import extract_text_with_ocr
+# Reuse the parser's extraction pipeline (text layer + OCR airlock + PyPDF fallback)
+from resume_parser import extract_resume_text
+from resume_sections import (
+    ResumeSection, segment_resume, select_sections, render_sections, estimate_tokens,
+    apply_edits, section_diff, TAILOR_TOKEN_BUDGET, CHARS_PER_TOKEN,
+)
+from structured_stream import stream_structured
 
 load_dotenv()
 
@@ -23,30 +28,81 @@ class TailoredSection(BaseModel):
     original_content: str
     tailored_content: str = Field(..., description="The rewritten version optimized for the JD.")
     reasoning: str = Field(..., description="Why this change increases the chance of an interview.")
+    diff: str = Field("", description="Unified diff of original vs tailored content (built locally).")
 
 class TailoredResume(BaseModel):
     job_role_analysis: str = Field(..., description="Brief analysis of what the company *really* wants.")
     sections: List[TailoredSection]
     email_cover_letter_draft: str = Field(..., description="A short, punchy email to the recruiter.")
 
+# What the model actually writes: edits against section ids, never the unchanged text
+class TextEdit(BaseModel):
+    original: str = Field(..., description="A phrase or bullet copied VERBATIM from the section.")
+    replacement: str = Field(..., description="The rewritten phrase or bullet.")
+
+class SectionEdit(BaseModel):
+    section_id: str = Field(..., description="The [section-id] tag of the section being edited.")
+    edits: List[TextEdit]
+    reasoning: str = Field(..., description="Why these changes increase the chance of an interview.")
+
+class TailoringEdits(BaseModel):
+    job_role_analysis: str = Field(..., description="Brief analysis of what the company *really* wants.")
+    section_edits: List[SectionEdit]
+    email_cover_letter_draft: str = Field(..., description="A short, punchy email to the recruiter.")
+
+
+def build_tailored_section(section_edit: SectionEdit, sections: List[ResumeSection]) -> Optional[TailoredSection]:
+    """Applies one section's edits to its original text; None if the model named an unknown section."""
+    section = next((s for s in sections if s.section_id == section_edit.section_id.strip("[] ")), None)
+    if section is None:
+        print(f"--- [Tailor] Dropping edits for unknown section '{section_edit.section_id}' ---")
+        return None
+    tailored, applied = apply_edits(section.content, [(e.original, e.replacement) for e in section_edit.edits])
+    if applied < len(section_edit.edits):
+        print(f"--- [Tailor] {section.section_id}: {len(section_edit.edits) - applied} edit(s) did not match the original ---")
+    return TailoredSection(
+        section_name=section.heading,
+        original_content=section.content,
+        tailored_content=tailored,
+        reasoning=section_edit.reasoning,
+        diff=section_diff(section.content, tailored, section.section_id),
+    )
+
+
+def build_tailored_resume(edits: TailoringEdits, sections: List[ResumeSection]) -> TailoredResume:
+    """Rebuilds the original/tailored pairs (and a diff) from the model's edits and the parsed sections."""
+    tailored_sections = [build_tailored_section(section_edit, sections) for section_edit in edits.section_edits]
+    return TailoredResume(
+        job_role_analysis=edits.job_role_analysis,
+        sections=[section for section in tailored_sections if section is not None],
+        email_cover_letter_draft=edits.email_cover_letter_draft,
+    )
+
 # --- THE ENGINE ---
 
-def tailor_resume(resume_file_path: str, job_description: str):
+def prepare_tailoring(resume_file_path: str, job_description: str):
     """
-    The 'Chameleon' Engine.
-    1. Reads the candidate's static PDF.
-    2. Reads the Target Job Description.
-    3. Rewrites the candidate's story to fit the role.
+    Steps 1-2 of the 'Chameleon' Engine, shared by the blocking and streaming modes.
+    Returns (sections, messages), or an {"error": ...} dict.
     """
-    
-    # 1. Extract Text from PDF (Reusing your robust OCR airlock)
+    # 1. Extract Text from PDF (Reusing the parser's hybrid extractor)
     print(f"--- [Tailor] Reading Resume from {resume_file_path} ---")
-    current_resume_text = extract_text_with_ocr(resume_file_path)
+    current_resume_text = extract_resume_text(resume_file_path)
     
     if not current_resume_text:
         return {"error": "Failed to read resume file."}
 
-    # 2. The 'Ghostwriter' Prompt
+    # 2. Segment locally and send only the JD-relevant sections under the token budget
+    sections = select_sections(segment_resume(current_resume_text), job_description)
+    if not sections:
+        # No recognizable headings: treat the raw text, trimmed to the same budget, as one section
+        sections = [ResumeSection(section_id="resume-1", kind="resume", heading="Resume",
+                                  content=current_resume_text[:TAILOR_TOKEN_BUDGET * CHARS_PER_TOKEN].strip())]
+    resume_for_prompt = render_sections(sections)
+    print(f"--- [Tailor] Resume prompt: ~{estimate_tokens(resume_for_prompt)} tokens "
+          f"(full text ~{estimate_tokens(current_resume_text)}), sections: {[s.section_id for s in sections]} ---")
+
+    # 3. The 'Ghostwriter' Prompt
     system_prompt = (
         f"You are a Top-Tier Career Coach and Resume Writer. "
         f"Your Goal: Tailor a candidate's resume for a SPECIFIC Job Description (JD). "
@@ -54,23 +110,70 @@ def tailor_resume(resume_file_path: str, job_description: str):
         f"1. Do NOT invent skills the user doesn't have (Integrity First). "
         f"2. DO rephrase existing experience to match the JD's keywords and 'Vibe'. "
         f"3. If the JD mentions 'Scalability' and the user has 'Optimized DB', rewrite it to emphasize the scale. "
-        f"4. Generate a 'Cold Email' cover letter that is short and human (not robotic)."
+        f"4. Generate a 'Cold Email' cover letter that is short and human (not robotic). "
+        f"5. The resume is given as tagged sections ([section-id] Heading); only tailor the sections provided. "
+        f"6. Output EDITS only: for each section, copy the exact phrase or bullet you change into 'original' "
+        f"and put the rewrite in 'replacement'. Never repeat text you are not changing."
     )
+    print(f"--- [Tailor] rewriting for JD length: {len(job_description)} chars ---")
+    return sections, [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=f"TARGET JOB DESCRIPTION:\n{job_description}\n\nCURRENT RESUME (relevant sections):\n{resume_for_prompt}")
+    ]
+
+
+def tailor_resume(resume_file_path: str, job_description: str):
+    """
+    The 'Chameleon' Engine.
+    1. Reads the candidate's static PDF.
+    2. Keeps only the sections that matter for the Target Job Description (local, no LLM).
+    3. Asks the model for targeted edits per section id (it never re-types unchanged text).
+    4. Rebuilds original/tailored pairs and diffs locally.
+    """
+    prepared = prepare_tailoring(resume_file_path, job_description)
+    if isinstance(prepared, dict):
+        return prepared
+    sections, messages = prepared
 
-    structured_llm = llm.with_structured_output(TailoredResume)
+    structured_llm = llm.with_structured_output(TailoringEdits)
 
     try:
-        print(f"--- [Tailor] rewriting for JD length: {len(job_description)} chars ---")
-        tailored_data = structured_llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"TARGET JOB DESCRIPTION:\n{job_description}\n\nCURRENT RESUME:\n{current_resume_text}")
-        ])
-        return tailored_data.dict()
+        edits = structured_llm.invoke(messages)
+        return build_tailored_resume(edits, sections).dict()
 
     except Exception as e:
         print(f"Tailoring Error: {e}")
         return {"error": str(e)}
 
+
+def stream_tailored_resume(resume_file_path: str, job_description: str) -> Iterator[dict]:
+    """
+    NDJSON mode of tailor_resume: {"type": "analysis"}, one {"type": "section"} per tailored section
+    as soon as its edits are complete, {"type": "cover_letter"}, then {"type": "complete"}.
+    """
+    prepared = prepare_tailoring(resume_file_path, job_description)
+    if isinstance(prepared, dict):
+        yield {"type": "error", **prepared}
+        return
+    sections, messages = prepared
+
+    try:
+        count = 0
+        for kind, key, value in stream_structured(llm, TailoringEdits, messages, items={"section_edits": SectionEdit}):
+            if kind == "item":
+                section = build_tailored_section(value, sections)
+                if section is not None:
+                    count += 1
+                    yield {"type": "section", **section.dict()}
+            elif key == "job_role_analysis":
+                yield {"type": "analysis", "job_role_analysis": value}
+            elif key == "email_cover_letter_draft":
+                yield {"type": "cover_letter", "email_cover_letter_draft": value}
+        yield {"type": "complete", "sections": count}
+    except Exception as e:
+        print(f"Tailoring Error: {e}")
+        yield {"type": "error", "error": str(e)}
+
 # --- TEST BLOCK ---
 if __name__ == "__main__":
     # You need a dummy PDF named 'test_resume.pdf' to run this locally
@@ -1,9 +1,15 @@
 import os
+import re
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional, Iterator
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from structured_stream import stream_structured
+from ttl_cache import TTLCache
 
 load_dotenv()
 
@@ -35,43 +41,249 @@ class CareerRoadmap(BaseModel):
     total_weeks: int
     roadmap: List[WeeklyMilestone]
 
+# One module per skill gap, generated independently and merged into weeks locally
+class SkillModule(BaseModel):
+    theme: str = Field(..., description="Main focus, e.g., 'Advanced Concurrency'")
+    goal: str = Field(..., description="The 'Exam' they must pass once the module is done.")
+    tasks: List[DailyTask]
+
+# --- CONFIGURATION ---
+ROADMAP_HOURS_PER_WEEK = int(os.getenv("ROADMAP_HOURS_PER_WEEK", "15"))
+ROADMAP_WORKERS = int(os.getenv("ROADMAP_WORKERS", "6"))
+ROADMAP_MODULE_TTL = float(os.getenv("ROADMAP_MODULE_TTL", str(7 * 24 * 3600)))
+
+# (normalized skill, target level) -> module dict; shared by every user with that gap
+module_cache = TTLCache(ttl=ROADMAP_MODULE_TTL, max_entries=1024, name="roadmap_modules")
+
+_LEVELS = [("Senior", ("senior", "sr", "staff", "principal", "lead", "architect")),
+           ("Junior", ("junior", "jr", "intern", "graduate", "entry"))]
+
 # --- THE ENGINE ---
 
+def normalize_skill(skill: str) -> str:
+    return re.sub(r"\s+", " ", (skill or "").strip().lower())
+
+
+def target_level(target_role: str) -> str:
+    """'Senior Backend Engineer' -> 'Senior'; roles without a seniority word count as 'Mid'."""
+    words = set(re.findall(r"[a-z]+", (target_role or "").lower()))
+    for level, markers in _LEVELS:
+        if words & set(markers):
+            return level
+    return "Mid"
+
+
+def _module_messages(skill: str, level: str) -> list:
+    system_prompt = (
+        f"You are a Senior Engineering Manager writing one module of a Performance Improvement Plan (PIP). "
+        f"The candidate is aiming for a {level}-level role and FAILED an assessment on: {skill}. "
+        f"Your Goal: A brutal but effective set of study tasks that fixes this one gap. "
+        f"Rules: "
+        f"1. Be specific (Don't say 'Learn SQL', say 'Practice Recursive CTEs'). "
+        f"2. Include real resources (Official Docs, reputable blogs). "
+        f"3. Give every task an honest estimated_hours; order tasks from fundamentals to the exam."
+    )
+    return [SystemMessage(content=system_prompt), HumanMessage(content=f"Generate the module for: {skill}")]
+
+
+def generate_skill_module(skill: str, level: str) -> Optional[dict]:
+    """
+    One skill's study module for a given target level, cached and single-flight.
+    Nothing user-specific goes into the prompt, so the result is safe to share. Returns None on failure.
+    """
+    def compute():
+        try:
+            module = llm.with_structured_output(SkillModule).invoke(_module_messages(skill, level))
+        except Exception as e:
+            print(f"Roadmap Module Error ({skill}): {e}")
+            return None
+        if not module.tasks:
+            return None
+        return {"skill": skill, **module.dict()}
+
+    return module_cache.get_or_compute((normalize_skill(skill), level), compute)
+
+
+def stream_skill_module(skill: str, level: str) -> Iterator[tuple]:
+    """
+    Streaming generate_skill_module: yields ("field", name, value) and ("task", task dict) as the
+    module is written, then ("done", module dict or None). Cached modules replay instantly; a module
+    streamed to completion is cached for everyone else.
+    """
+    key = (normalize_skill(skill), level)
+    module = module_cache.get(key)
+    if module is None:
+        try:
+            for kind, name, value in stream_structured(llm, SkillModule, _module_messages(skill, level),
+                                                       items={"tasks": DailyTask}):
+                if kind == "item":
+                    yield "task", value.dict()
+                elif kind == "field":
+                    yield "field", name, value
+                elif value.tasks:
+                    module_cache.set(key, {"skill": skill, **value.dict()})
+                    yield "done", {"skill": skill, **value.dict()}
+                    return
+        except Exception as e:
+            print(f"Roadmap Module Error ({skill}): {e}")
+        yield "done", None
+        return
+    yield "field", "theme", module["theme"]
+    yield "field", "goal", module["goal"]
+    for task in module["tasks"]:
+        yield "task", task
+    yield "done", module
+
+
+class WeekPacker:
+    """
+    Merges skill modules into WeeklyMilestone dicts by estimated_hours, one task at a time.
+    Tasks keep their module order; a week closes when the next task would overflow it
+    (a single task longer than a week gets a week of its own). Closed weeks are returned right away,
+    so a streamed roadmap can send week 1 while later modules are still being written.
+    """
+
+    def __init__(self, hours_per_week: int = ROADMAP_HOURS_PER_WEEK):
+        self.hours_per_week = hours_per_week
+        self.weeks: List[dict] = []
+        self._current = []  # [(module, tasks)] in the open week
+        self._hours = 0
+        self._ended = set()  # id() of modules whose last task has been added
+
+    def add_task(self, module: dict, task: dict) -> List[dict]:
+        closed = []
+        task_hours = max(int(task.get("estimated_hours") or 0), 1)
+        if self._current and self._hours + task_hours > self.hours_per_week:
+            closed.append(self._close())
+        if not self._current or self._current[-1][0] is not module:
+            self._current.append((module, []))
+        self._current[-1][1].append(task)
+        self._hours += task_hours
+        return closed
+
+    def end_module(self, module: dict) -> None:
+        self._ended.add(id(module))
+
+    def finish(self) -> List[dict]:
+        return [self._close()] if self._current else []
+
+    def _close(self) -> dict:
+        themes = [module.get("theme") or module["skill"] for module, _ in self._current]
+        goals = [module["goal"] for module, _ in self._current if id(module) in self._ended and module.get("goal")]
+        week = WeeklyMilestone(
+            week_number=len(self.weeks) + 1,
+            theme=" + ".join(dict.fromkeys(themes)),
+            goal=" ".join(goals) or f"Continue: {themes[-1]}",
+            daily_plan=[task for _, tasks in self._current for task in tasks],
+        ).dict()
+        self.weeks.append(week)
+        self._current, self._hours = [], 0
+        return week
+
+
+def pack_weeks(modules: List[dict], hours_per_week: int = ROADMAP_HOURS_PER_WEEK) -> List[dict]:
+    packer = WeekPacker(hours_per_week)
+    for module in modules:
+        for task in module["tasks"]:
+            packer.add_task(module, task)
+        packer.end_module(module)
+    packer.finish()
+    return packer.weeks
+
+
+def unique_skills(skill_gaps: List[str]) -> List[str]:
+    """Same gap twice ('k8s ', 'K8s') is one module; first spelling and order win."""
+    unique = {}
+    for skill in skill_gaps:
+        if skill.strip():
+            unique.setdefault(normalize_skill(skill), skill.strip())
+    return list(unique.values())
+
+
 def generate_learning_roadmap(skill_gaps: List[str], target_role: str = "Full Stack Engineer"):
     """
     The 'Ghost Tech Lead' Engine.
     Takes a list of failures (e.g., ['SQL Injection', 'React Hooks'])
     and generates a strict recovery plan.
+    One module per skill runs concurrently (so wall time is one module's latency), modules for
+    common gaps come from the cache, and the weeks are packed locally.
     """
     
     if not skill_gaps:
         return {"message": "No significant skill gaps detected. You are ready for the interview!"}
 
-    system_prompt = (
-        f"You are a Senior Engineering Manager creating a Performance Improvement Plan (PIP). "
-        f"The candidate is aiming for: {target_role}. "
-        f"They FAILED assessments in the following areas: {', '.join(skill_gaps)}. "
-        f"Your Goal: Create a brutal but effective study schedule to fix these gaps. "
-        f"Rules: "
-        f"1. Be specific (Don't say 'Learn SQL', say 'Practice Recursive CTEs'). "
-        f"2. Include real resources (Official Docs, reputable blogs). "
-        f"3. Structure it by Week."
-    )
+    skills = unique_skills(skill_gaps)
+    level = target_level(target_role)
+    print(f"--- [Ghost Tech Lead] Generating Roadmap for: {skills} ({level}) ---")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(len(skills), ROADMAP_WORKERS))) as pool:
+        modules = list(pool.map(lambda skill: generate_skill_module(skill, level), skills))
+
+    failed = [skill for skill, module in zip(skills, modules) if module is None]
+    modules = [module for module in modules if module is not None]
+    if not modules:
+        return {"error": "Roadmap generation failed for every skill gap."}
+
+    weeks = pack_weeks(modules)
+    roadmap = CareerRoadmap(candidate_level=level, total_weeks=len(weeks), roadmap=weeks).dict()
+    if failed:
+        roadmap["failed_skills"] = failed
+    return roadmap
+
+
+def stream_learning_roadmap(skill_gaps: List[str], target_role: str = "Full Stack Engineer") -> Iterator[dict]:
+    """
+    NDJSON mode of generate_learning_roadmap: {"type": "week", ...} events as soon as each week is packed,
+    then {"type": "complete", ...}. Modules still generate concurrently and are packed in gap order,
+    each only once it has fully validated, so the weeks match the blocking endpoint (a module that
+    fails midway contributes nothing); week 1 waits for the first module to finish.
+    """
+    if not skill_gaps:
+        yield {"type": "complete", "message": "No significant skill gaps detected. You are ready for the interview!"}
+        return
+
+    skills = unique_skills(skill_gaps)
+    level = target_level(target_role)
+    print(f"--- [Ghost Tech Lead] Streaming Roadmap for: {skills} ({level}) ---")
+    events = queue.Queue()
+
+    def produce(index: int, skill: str):
+        try:
+            for event in stream_skill_module(skill, level):
+                events.put((index, event))
+        except Exception as e:
+            print(f"Roadmap Module Error ({skill}): {e}")
+            events.put((index, ("done", None)))
+
+    modules = [{"skill": skill, "theme": "", "goal": "", "tasks": []} for skill in skills]
+    pending = [[] for _ in skills]
+    packer, failed, current = WeekPacker(), [], 0
+    with ThreadPoolExecutor(max_workers=max(1, min(len(skills), ROADMAP_WORKERS))) as pool:
+        for index, skill in enumerate(skills):
+            pool.submit(produce, index, skill)
+        # Events buffer until their module is done and every module before it is packed
+        while current < len(skills):
+            index, event = events.get()
+            pending[index].append(event)
+            while current < len(skills) and pending[current] and pending[current][-1][0] == "done":
+                module, result = modules[current], pending[current][-1][1]
+                if result is None:
+                    failed.append(module["skill"])  # Dropped whole, like the blocking path
+                else:
+                    module.update(theme=result["theme"], goal=result["goal"], tasks=result["tasks"])
+                    for task in module["tasks"]:
+                        for week in packer.add_task(module, task):
+                            yield {"type": "week", **week}
+                    packer.end_module(module)
+                pending[current] = []
+                current += 1
 
-    # We use .with_structured_output to guarantee JSON for the frontend
-    structured_llm = llm.with_structured_output(CareerRoadmap)
-
-    try:
-        print(f"--- [Ghost Tech Lead] Generating Roadmap for: {skill_gaps} ---")
-        roadmap = structured_llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content="Generate my recovery plan.")
-        ])
-        return roadmap.dict()
-        
-    except Exception as e:
-        print(f"Roadmap Generation Error: {e}")
-        return {"error": str(e)}
+    for week in packer.finish():
+        yield {"type": "week", **week}
+    if not packer.weeks:
+        yield {"type": "error", "error": "Roadmap generation failed for every skill gap."}
+        return
+    yield {"type": "complete", "candidate_level": level, "total_weeks": len(packer.weeks), "failed_skills": failed}
 
 # --- TEST BLOCK ---
 if __name__ == "__main__":
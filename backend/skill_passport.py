@@ -1,5 +1,7 @@
 import hashlib
 import json
+import os
+import re
 from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import List, Optional
@@ -7,17 +9,28 @@ from typing import List, Optional
 # Import your existing engines
 from database import db_manager
 from auditor import GitHubAuditor
+from github_cache import github_cache
+from merkle_ledger import passport_ledger
+from ttl_cache import TTLCache
 
 # Initialize Auditor
 auditor = GitHubAuditor()
 
+# Minted passports, keyed by (username, session_id). Dropped on a new PASS or when GitHub data changes.
+PASSPORT_TTL = int(os.getenv("PASSPORT_CACHE_TTL", "900"))
+passport_cache = TTLCache(ttl=PASSPORT_TTL, max_entries=2048, name="passport")
+
+# callback(event, username, passport) for "minted" (session-less passports only) and "invalidated" (username None = all)
+_passport_listeners = []
+
 # --- DATA MODELS ---
 
 class VerifiedChallenge(BaseModel):
     challenge_title: str
     status: str
     timestamp: str
-    verification_hash: str = Field(..., description="Simulated blockchain-style hash of the success.")
+    verification_hash: str = Field(..., description="Merkle leaf hash of the success in the passport ledger.")
+    record_id: Optional[str] = Field(None, description="challenge_attempts id, used to fetch an inclusion proof.")
 
 class SkillPassport(BaseModel):
     candidate_id: str
@@ -26,6 +39,8 @@ class SkillPassport(BaseModel):
     interview_readiness_score: int
     verified_skills: List[str]
     recent_achievements: List[VerifiedChallenge]
+    ledger_root: Optional[str] = Field(None, description="Merkle root over every verified PASS at signing time.")
+    ledger_size: Optional[int] = Field(None, description="Ledger size at signing time; proofs are requested for this size.")
     passport_signature: str = Field(..., description="Unique ID proving this data wasn't tampered with.")
 
 # --- THE ENGINE ---
@@ -34,19 +49,116 @@ def generate_verification_hash(data_string: str) -> str:
     """Creates a SHA-256 signature to make the data look 'official'."""
     return hashlib.sha256(data_string.encode()).hexdigest()[:16]
 
-def get_skill_passport(username: str, session_id: Optional[str] = None):
+def get_skill_passport(username: str, session_id: Optional[str] = None, use_cache: bool = True):
+    """
+    Returns the signed passport, served from cache while it is valid.
+    Outreach, the Digital Twin and the passport route all share the same minted document.
+    A degraded mint (GitHub or the DB unavailable) is returned but never cached or announced.
+    """
+    key = (username.lower(), session_id or "")
+    degraded = {}
+
+    def compute():
+        passport, complete = _mint_and_announce(username, session_id)
+        if not complete:
+            degraded["passport"] = passport
+            return None  # TTLCache doesn't store None
+        return passport
+
+    if not use_cache:
+        passport = compute()
+        if passport is not None:
+            passport_cache.set(key, passport)
+    else:
+        passport = passport_cache.get_or_compute(key, compute)
+    return passport if passport is not None else degraded["passport"]
+
+def invalidate_passport(username: Optional[str] = None) -> int:
+    """Drops cached passports for one user (all sessions), or every passport when username is None."""
+    if username is None:
+        dropped = passport_cache.invalidate_where(lambda key: True)
+    else:
+        name = username.lower()
+        dropped = passport_cache.invalidate_where(lambda key: key[0] == name)
+    _emit("invalidated", username)
+    return dropped
+
+def subscribe_passport_events(callback) -> None:
+    """Registers callback(event, username, passport). Used by the public profile snapshot pipeline."""
+    _passport_listeners.append(callback)
+
+def _emit(event: str, username: Optional[str], passport: Optional[dict] = None) -> None:
+    for callback in _passport_listeners:
+        try:
+            callback(event, username, passport)
+        except Exception as e:
+            print(f"Passport Listener Error: {e}")
+
+def _mint_and_announce(username: str, session_id: Optional[str]):
+    passport, complete = _mint_skill_passport(username, session_id)
+    if session_id is None and complete:
+        _emit("minted", username, passport)
+    return passport, complete
+
+# --- OWNERSHIP (profiles table) ---
+
+_HANDLE = re.compile(r"^[A-Za-z0-9-]{1,39}$")  # GitHub's username rules
+
+def owner_of(username: str) -> Optional[str]:
+    """The user id whose profile carries this GitHub handle (or app username), or None."""
+    if not db_manager.enabled or not _HANDLE.match(username or ""):
+        return None
+    rows = db_manager.supabase.table("profiles").select("id")\
+        .or_(f"github_username.ilike.{username},username.ilike.{username}").limit(1).execute()
+    return rows.data[0]["id"] if rows.data else None
+
+def handles_of(user_id: str) -> List[str]:
+    """Every name a user's passport can be requested under (GitHub handle and app username)."""
+    if not db_manager.enabled:
+        return []
+    rows = db_manager.supabase.table("profiles").select("github_username, username").eq("id", user_id).limit(1).execute()
+    if not rows.data:
+        return []
+    return [name for name in (rows.data[0].get("github_username"), rows.data[0].get("username")) if name]
+
+def on_challenge_passed(user_id: str) -> None:
+    """
+    Event hook for /api/challenge/verify.
+    Achievements are scoped to their owner, so only the passer's passports go stale.
+    (Other passports keep the ledger root and size they were signed with; proofs requested with
+    ?tree_size=ledger_size still verify against that root.)
+    """
+    try:
+        handles = handles_of(user_id)
+    except Exception as e:
+        print(f"Passport DB Error: {e}")
+        return
+    dropped = sum(invalidate_passport(name) for name in handles)
+    print(f"--- [Passport] PASS recorded for {user_id}. Invalidated {dropped} cached passports. ---")
+
+def _on_github_change(url: str) -> None:
+    """github_cache listener: a changed /users/{name} or /users/{name}/events response stales that passport."""
+    match = re.search(r"/users/([^/?#]+)", url)
+    if match:
+        invalidate_passport(match.group(1))
+
+github_cache.subscribe(_on_github_change)
+
+def _mint_skill_passport(username: str, session_id: Optional[str] = None):
     """
     The 'Ledger' Engine.
     Aggregates:
     1. GitHub History (Real code pushed).
     2. Interview Performance (Voice confidence + logic).
     3. Challenge Results (Code Sandbox execution).
+    Returns (passport, complete); complete is False when GitHub or the DB could not be read.
     """
     print(f"--- [Passport] Minting identity for {username} ---")
 
     # 1. Get External Trust (GitHub)
     gh_stats = auditor.calculate_trust_score(username)
     gh_score = gh_stats.get("trust_score", 0)
+    complete = "error" not in gh_stats
 
     # 2. Get Internal Trust (Database Logs)
     # We fetch the last 5 passed challenges and interview interactions
@@ -55,19 +167,24 @@ def get_skill_passport(username: str, session_id: Optional[str] = None):
 
     if db_manager.enabled:
         try:
-            # Fetch passed challenges
-            # Note: Assuming 'challenge_attempts' table exists as per previous context
-            attempts = db_manager.supabase.table("challenge_attempts")\
-                .select("*").eq("status", "PASS").order("created_at", desc=True).limit(5).execute()
+            # Fetch this candidate's passed challenges (none if no profile claims the handle)
+            owner_id = owner_of(username)
+            attempts = []
+            if owner_id:
+                attempts = db_manager.supabase.table("challenge_attempts")\
+                    .select("*").eq("user_id", owner_id).eq("status", "PASS").order("created_at", desc=True).limit(5).execute().data
+
+            # Catch up on passes recorded by other processes; already-known ids are skipped in O(1)
+            passport_ledger.sync(attempts)
             
-            for att in attempts.data:
-                # Create a hash of the success record
-                v_hash = generate_verification_hash(f"{att['id']}-{att['created_at']}-PASS")
+            for att in attempts:
+                # The success record's leaf in the Merkle ledger
                 verified_challenges.append(VerifiedChallenge(
                     challenge_title=att['challenge_title'],
                     status="VERIFIED_PASS",
                     timestamp=att['created_at'],
-                    verification_hash=v_hash
+                    verification_hash=passport_ledger.leaf(att['id']),
+                    record_id=str(att['id'])
                 ))
             
             # Fetch generic interview logs to estimate "Readiness"
@@ -81,6 +198,7 @@ def get_skill_passport(username: str, session_id: Optional[str] = None):
 
         except Exception as e:
             print(f"Passport DB Error: {e}")
+            complete = False
 
     # 3. Synthesize the Passport
     # Combine GitHub score (0-100) and Internal Prep (0-80)
@@ -90,6 +208,7 @@ def get_skill_passport(username: str, session_id: Optional[str] = None):
     skills = list(set([c.challenge_title.split(" ")[0] for c in verified_challenges]))
     if not skills: skills = ["Pending Verification"]
 
+    head = passport_ledger.head()  # Root and size read together
     passport_data = {
         "candidate_id": username,
         "generated_at": datetime.utcnow().isoformat(),
@@ -97,14 +216,17 @@ def get_skill_passport(username: str, session_id: Optional[str] = None):
         "interview_readiness_score": final_score,
         "verified_skills": skills,
         "recent_achievements": verified_challenges,
+        "ledger_root": head["root"],
+        "ledger_size": head["size"],
         "passport_signature": ""
     }
     
-    # Sign the document
-    raw_json = json.dumps(passport_data, sort_keys=True)
-    passport_data["passport_signature"] = generate_verification_hash(raw_json)
+    # Sign the document: achievements are already committed to by the cached ledger root,
+    # so only the scalar claims need hashing alongside it
+    claims = f"{passport_data['ledger_root']}|{passport_data['ledger_size']}|{username}|{gh_score}|{final_score}|{','.join(sorted(skills))}"
+    passport_data["passport_signature"] = generate_verification_hash(claims)
 
-    return passport_data
+    return passport_data, complete
 
 # --- TEST BLOCK ---
 if __name__ == "__main__":
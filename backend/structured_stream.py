@@ -0,0 +1,156 @@
+# backend/structured_stream.py
+
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from langchain_core.messages import SystemMessage
+from pydantic import BaseModel, ValidationError
+
+_WHITESPACE = " \t\r\n"
+
+
+class JsonStreamParser:
+    """
+    Incremental parser for one JSON object arriving in chunks (an LLM's streamed answer).
+    feed() returns the events completed by that chunk:
+      ("item", key, value)   an element of a top-level array, as soon as its closing bracket arrives
+      ("field", key, value)  a top-level field, once its whole value has arrived
+    Only the span of the finished element is handed to json.loads, so each byte is scanned once.
+    Anything before the first '{' (prose, a ```json fence) and after the object closes is ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._start = None        # Index of the opening '{'
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._key = None          # Current top-level key
+        self._awaiting = "key"    # At depth 1: key -> colon -> value -> comma -> key ...
+        self._value_start = None  # Start of the current top-level value
+        self._item_start = None   # Start of the current element of a top-level array
+        self.closed = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, str, Any]]:
+        self.text += chunk
+        events = []
+        text = self.text
+        while self._pos < len(text) and not self.closed:
+            i, char = self._pos, text[self._pos]
+            self._pos += 1
+
+            if self._start is None:
+                if char == "{":
+                    self._start = i
+                    self._stack.append("{")
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._awaiting == "key":
+                        self._key = json.loads(text[self._string_start:i + 1])
+                        self._awaiting = "colon"
+                continue
+
+            if char in _WHITESPACE:
+                continue
+            depth = len(self._stack)
+            in_top_array = depth == 2 and self._stack[1] == "["
+
+            # Where values and array elements begin
+            if depth == 1 and self._awaiting == "value":
+                self._value_start = i
+                self._awaiting = "comma"
+            elif in_top_array and self._item_start is None and char not in ",]":
+                self._item_start = i
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in "{[":
+                self._stack.append(char)
+            elif char in "}]":
+                if in_top_array and self._item_start is not None:
+                    # ']' ends a scalar element, e.g. ["a", "b"]
+                    events.append(("item", self._key, json.loads(text[self._item_start:i])))
+                    self._item_start = None
+                if depth == 1:
+                    # The object itself closes; a pending scalar value ends here
+                    self._end_value(i, events)
+                    self.closed = True
+                self._stack.pop()
+                if len(self._stack) == 2 and self._stack[1] == "[" and self._item_start is not None:
+                    events.append(("item", self._key, json.loads(text[self._item_start:i + 1])))
+                    self._item_start = None
+                elif len(self._stack) == 1 and self._value_start is not None:
+                    events.append(("field", self._key, json.loads(text[self._value_start:i + 1])))
+                    self._value_start = None
+            elif char == ":" and depth == 1:
+                self._awaiting = "value"
+            elif char == ",":
+                if depth == 1:
+                    self._end_value(i, events)
+                    self._awaiting = "key"
+                elif in_top_array and self._item_start is not None:
+                    events.append(("item", self._key, json.loads(text[self._item_start:i])))
+                    self._item_start = None
+        return events
+
+    def _end_value(self, end: int, events: list) -> None:
+        if self._value_start is not None:
+            events.append(("field", self._key, json.loads(self.text[self._value_start:end])))
+            self._value_start = None
+
+    def document(self) -> Dict[str, Any]:
+        """The whole object, once closed."""
+        if not self.closed:
+            raise ValueError("The streamed JSON object is incomplete.")
+        return json.loads(self.text[self._start:self._pos])
+
+
+def format_instructions(schema: Type[BaseModel]) -> str:
+    return (
+        "Respond with ONLY one JSON object (no prose, no code fences) that matches this JSON schema:\n"
+        f"{json.dumps(schema.schema())}"
+    )
+
+
+def stream_structured(llm, schema: Type[BaseModel], messages: list,
+                      items: Optional[Dict[str, Type[BaseModel]]] = None) -> Iterator[Tuple[str, Optional[str], Any]]:
+    """
+    Streaming counterpart of llm.with_structured_output(schema).invoke(messages).
+    Yields, as the model writes:
+      ("item", key, model)     each element of a top-level array listed in `items`, once it validates
+      ("field", key, value)    each other top-level field, once complete
+      ("done", None, schema)   the validated document at the end
+    Tool-call arguments arrive in one piece when streamed, so the model writes the JSON as plain content.
+    Elements that fail validation are skipped here; the final document still has to validate.
+    """
+    items = items or {}
+    parser = JsonStreamParser()
+    for chunk in llm.stream([SystemMessage(content=format_instructions(schema)), *messages]):
+        content = chunk.content if isinstance(chunk.content, str) else ""
+        for kind, key, value in parser.feed(content):
+            if kind == "item" and key in items:
+                try:
+                    yield "item", key, items[key].parse_obj(value)
+                except ValidationError as e:
+                    print(f"--- [Stream] Skipping invalid '{key}' element: {e.errors()[:1]} ---")
+            elif kind == "field" and key not in items:
+                yield "field", key, value
+        if parser.closed:
+            break
+    yield "done", None, schema.parse_obj(parser.document())
+
+
+def ndjson(events: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """NDJSON framing for StreamingResponse: one JSON object per line."""
+    for event in events:
+        yield json.dumps(event) + "\n"
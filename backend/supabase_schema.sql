@@ -35,8 +35,10 @@ create table public.applications (
     status text default 'Wishlist',
     salary_range text,
     notes text,
+    source_url text, -- Posting a Shadow Hunter card was created from (null for manual cards)
     created_at timestamp with time zone default timezone('utc'::text, now()) not null
 );
+create unique index applications_source_url_idx on public.applications (user_id, source_url);
 alter table public.applications enable row level security;
 
 -- 5. CHALLENGE ATTEMPTS (Skill Passport Proof)
@@ -87,4 +89,111 @@ $$ language plpgsql security definer;
 
 create trigger on_auth_user_created
   after insert on auth.users
-  for each row execute procedure public.handle_new_user();
\ No newline at end of file
+  for each row execute procedure public.handle_new_user();
+
+-- 8. PUBLIC PROFILE SNAPSHOTS (Precomputed /api/public/profile documents)
+-- Materialized whenever a candidate's passport changes, so anonymous traffic never fans out to GitHub.
+create table public.public_profile_snapshots (
+    username text primary key,
+    document jsonb not null,
+    etag text not null,
+    updated_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+alter table public.public_profile_snapshots enable row level security;
+
+create policy "Public profile snapshots are viewable by everyone"
+on public.public_profile_snapshots for select using (true);
+
+-- 9. SHADOW HUNTER JOB QUEUE (Lease-based claiming for background workers)
+-- One row per user. Workers claim due rows under a time-limited lease and renew it with heartbeats;
+-- a crashed worker's lease simply expires and the row becomes claimable again.
+create table public.hunt_jobs (
+    user_id text primary key,
+    payload jsonb not null,
+    next_run_at timestamp with time zone default timezone('utc'::text, now()) not null,
+    lease_owner text,
+    lease_expires_at timestamp with time zone,
+    run_id uuid,
+    attempts integer default 0 not null,
+    last_completed_at timestamp with time zone
+);
+create index hunt_jobs_due_idx on public.hunt_jobs (next_run_at);
+alter table public.hunt_jobs enable row level security; -- Service role only, no public policies
+
+-- Registers a user: new rows start at p_run_at (epoch seconds, null = now) so a fleet's first runs are spread out;
+-- existing rows only get the fresh payload and keep their schedule
+create or replace function public.ensure_hunt_job(p_user_id text, p_payload jsonb, p_run_at double precision default null)
+returns void as $$
+  insert into public.hunt_jobs (user_id, payload, next_run_at)
+  values (p_user_id, p_payload, coalesce(to_timestamp(p_run_at), now()))
+  on conflict (user_id) do update set payload = excluded.payload;
+$$ language sql volatile;
+
+create or replace function public.claim_hunt_jobs(p_worker text, p_limit integer, p_lease_seconds integer)
+returns setof public.hunt_jobs as $$
+  update public.hunt_jobs
+  set lease_owner = p_worker,
+      lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+      run_id = gen_random_uuid(),
+      attempts = attempts + 1
+  where user_id in (
+      select user_id from public.hunt_jobs
+      where next_run_at <= now() and (lease_owner is null or lease_expires_at < now())
+      order by next_run_at
+      limit p_limit
+      for update skip locked
+  )
+  returning *;
+$$ language sql volatile;
+
+create or replace function public.heartbeat_hunt_job(p_user_id text, p_run_id uuid, p_lease_seconds integer)
+returns boolean as $$
+  with renewed as (
+      update public.hunt_jobs
+      set lease_expires_at = now() + make_interval(secs => p_lease_seconds)
+      where user_id = p_user_id and run_id = p_run_id
+      returning 1
+  )
+  select exists (select 1 from renewed);
+$$ language sql volatile;
+
+-- Idempotent: only the holder of the current run_id can complete, and completing clears it
+create or replace function public.complete_hunt_job(p_user_id text, p_run_id uuid, p_next_run_in_seconds integer)
+returns boolean as $$
+  with done as (
+      update public.hunt_jobs
+      set lease_owner = null, lease_expires_at = null, run_id = null,
+          next_run_at = now() + make_interval(secs => p_next_run_in_seconds),
+          last_completed_at = now()
+      where user_id = p_user_id and run_id = p_run_id
+      returning 1
+  )
+  select exists (select 1 from done);
+$$ language sql volatile;
+
+create or replace function public.due_hunt_jobs()
+returns integer as $$
+  select count(*)::integer from public.hunt_jobs
+  where next_run_at <= now() and (lease_owner is null or lease_expires_at < now());
+$$ language sql stable;
+
+-- 10. SHADOW HUNTER DEDUP STATE (Shared by every worker node, next to hunt_jobs)
+-- Fingerprints of postings already carded per user: normalized company|title key + 64-bit SimHash (hex)
+create table public.posting_fingerprints (
+    user_id text not null,
+    key text not null,
+    simhash text not null,
+    url text,
+    created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+    primary key (user_id, key)
+);
+alter table public.posting_fingerprints enable row level security; -- Service role only, no public policies
+
+-- Posting URLs already evaluated per user (carded, skipped as a duplicate, or below the match bar)
+create table public.processed_postings (
+    user_id text not null,
+    url text not null,
+    processed_at timestamp with time zone default timezone('utc'::text, now()) not null,
+    primary key (user_id, url)
+);
+alter table public.processed_postings enable row level security; -- Service role only, no public policies
@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+
+from ats_scorer import score_resume, score_many, term_counts, build_query, role_query, TERM_INDEX, ROLE_PROFILES
+
+
+RESUME = """Jane Doe
+Summary
+Backend engineer working in Python and JavaScript.
+Experience
+Built FastAPI services on PostgreSQL, deployed with Docker and k8s on AWS.
+Skills
+Python, SQL, Redis, Git
+"""
+
+JD = "Looking for a Python engineer with Kubernetes, Terraform, PostgreSQL and Kafka experience."
+
+
+class TestATSScorer(unittest.TestCase):
+
+    def test_aliases_map_to_canonical_terms(self):
+        counts = term_counts(["Java and JavaScript, k8s, Postgres"])[0]
+        self.assertEqual(counts[TERM_INDEX["java"]], 1)
+        self.assertEqual(counts[TERM_INDEX["javascript"]], 1)
+        self.assertEqual(counts[TERM_INDEX["kubernetes"]], 1)
+        self.assertEqual(counts[TERM_INDEX["postgresql"]], 1)
+
+    def test_ambiguous_words_need_a_qualifier_in_prose(self):
+        prose = "Work with the rest of the team, plan releases every spring and harden platform security."
+        self.assertEqual(term_counts([prose])[0].sum(), 0)
+        np.testing.assert_array_equal(build_query(prose, "Backend Engineer"), role_query("Backend Engineer"))
+        counts = term_counts(["Built REST APIs on Spring Boot.\nSkills: Java, Swift, Rust, Security"])[0]
+        for term in ["rest", "spring", "swift", "rust", "security"]:
+            self.assertEqual(counts[TERM_INDEX[term]], 1, term)
+
+    def test_matched_missing_and_sections(self):
+        report = score_resume(RESUME, JD)
+        self.assertEqual(set(report["matched_keywords"]), {"python", "kubernetes", "postgresql"})
+        self.assertEqual(set(report["missing_keywords"]), {"terraform", "kafka"})
+        self.assertTrue(report["section_coverage"]["experience"]["present"])
+        self.assertIn("kubernetes", report["section_coverage"]["experience"]["keywords"])
+        self.assertFalse(report["section_coverage"]["projects"]["present"])
+
+    def test_batch_scores_rank_better_matches_higher(self):
+        scores = score_many([RESUME, "Barista with latte art skills", JD], JD)
+        self.assertEqual(scores[1], 0)
+        self.assertGreater(scores[2], scores[0])
+        self.assertGreater(scores[0], scores[1])
+
+    def test_role_profile_used_without_jd(self):
+        report = score_resume(RESUME, "", "Backend Engineer")
+        self.assertIn("python", report["matched_keywords"])
+        self.assertTrue(0 <= report["match_score"] <= 100)
+
+    def test_role_profiles_match_whole_words(self):
+        default = role_query("Software Engineer")
+        for role in ["Maintenance Technician", "Retail Associate", "Chair Designer", "HTML Email Developer"]:
+            np.testing.assert_array_equal(role_query(role), default, err_msg=role)
+        ai = role_query("Senior AI Engineer")
+        self.assertEqual({i for i in np.flatnonzero(ai)}, {TERM_INDEX[t] for t in ROLE_PROFILES["ai"]})
+        ml = role_query("Machine Learning Engineer")
+        self.assertEqual({i for i in np.flatnonzero(ml)}, {TERM_INDEX[t] for t in ROLE_PROFILES["machine learning"]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+import background_worker
+from posting_fingerprints import FingerprintIndex
+
+
+ROLES = {"Acme": "Backend Engineer", "Beta": "Data Analyst", "Gamma": "iOS Developer"}
+
+
+def opportunity(url, company, score):
+    return {"role_title": ROLES[company], "company": company, "match_score": score, "why_good_fit": "",
+            "cautionary_warning": None, "apply_link_guess": url, "description": ""}
+
+
+class TestProcessUserHunt(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FingerprintIndex(os.path.join(tempfile.mkdtemp(), "fp.db"))
+        self.db = MagicMock(enabled=True)
+        self.board = []
+        self.db.supabase.table.return_value.insert.side_effect = lambda cards: self.board.extend(cards) or MagicMock()
+        self.db.supabase.table.return_value.select.return_value.eq.return_value.in_.return_value.execute.side_effect = \
+            lambda: MagicMock(data=[{"source_url": c["source_url"]} for c in self.board])
+
+    def hunt(self, result):
+        with patch.object(background_worker, "match_shared_postings", return_value=result), \
+             patch.object(background_worker, "fingerprint_index", self.index), \
+             patch.object(background_worker, "db_manager", self.db), \
+             patch.object(background_worker, "generate_cold_outreach", return_value={}) as outreach:
+            background_worker.process_user_hunt("u1", "Backend Engineer", "Remote", [])
+        return outreach.call_count
+
+    def test_only_evaluated_postings_are_marked(self):
+        # u3 was cut before the extraction, so it stays eligible for a later run
+        result = {"opportunities": [opportunity("u1", "Acme", 90), opportunity("u2", "Beta", 40)], "evaluated": ["u1", "u2"]}
+        self.assertEqual(self.hunt(result), 1)
+        self.assertEqual(self.index.processed("u1", ["u1", "u2", "u3"]), {"u1", "u2"})
+        later = {"opportunities": [opportunity("u1", "Acme", 90), opportunity("u3", "Gamma", 95)], "evaluated": ["u1", "u3"]}
+        self.assertEqual(self.hunt(later), 1)
+        self.assertEqual([c["source_url"] for c in self.board], ["u1", "u3"])
+
+    def test_cards_already_on_the_board_are_not_redrafted(self):
+        # The previous run inserted its card but failed before recording fingerprints and marks
+        self.board.append({"source_url": "u1"})
+        result = {"opportunities": [opportunity("u1", "Acme", 90)], "evaluated": ["u1"]}
+        self.assertEqual(self.hunt(result), 0)
+        self.assertEqual(len(self.board), 1)
+        self.assertEqual(self.index.processed("u1", ["u1"]), {"u1"})
+        self.assertIsNotNone(self.index.find_duplicate("u1", "Acme", "Backend Engineer"))
+
+
+if __name__ == "__main__":
+    unittest.main()
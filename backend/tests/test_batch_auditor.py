@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+import batch_auditor
+from batch_auditor import RateLimitBucket, score_batch
+
+BASE = "https://api.github.com"
+
+
+class FakeCache:
+    def __init__(self, remaining, reset, limit=60):
+        self.rate_limit = {"limit": limit, "remaining": remaining, "reset": reset}
+        self.fresh = set()
+
+    def lookup(self, url):
+        return {"fresh": True} if url in self.fresh else None
+
+    def stats(self):
+        return {"rate_limit": dict(self.rate_limit)}
+
+
+class FakeAuditor:
+    """Spends one request per uncached URL, like GitHub's X-RateLimit-Remaining would report."""
+
+    def __init__(self, remaining, reset, cached=()):
+        self.token = None
+        self.base_url = BASE
+        self.cache = FakeCache(remaining, reset)
+        self._lock = threading.Lock()
+        for username in cached:
+            self.cache.fresh.update(self.urls(username))
+
+    def urls(self, username):
+        return {f"{BASE}/users/{username}", f"{BASE}/users/{username}/events/public"}
+
+    def calculate_trust_score(self, username):
+        with self._lock:
+            spent = self.urls(username) - self.cache.fresh
+            self.cache.rate_limit["remaining"] -= len(spent)
+            self.cache.fresh.update(spent)
+        return {"trust_score": 80}
+
+
+def statuses(usernames, auditor):
+    return {e["username"]: e for e in score_batch(usernames, auditor) if "username" in e}
+
+
+class TestBatchAuditor(unittest.TestCase):
+
+    def test_users_beyond_the_budget_are_deferred(self):
+        reset = time.time() + 600
+        result = statuses(["a", "b", "c"], FakeAuditor(remaining=3, reset=reset))
+        self.assertEqual([result[u]["status"] for u in "abc"], ["scored", "deferred", "deferred"])
+        self.assertEqual(result["b"]["retry_after"], reset)
+
+    def test_cached_users_are_free_with_an_empty_budget(self):
+        result = statuses(["cold", "warm"], FakeAuditor(remaining=0, reset=time.time() + 600, cached=["warm"]))
+        self.assertEqual(result["cold"]["status"], "deferred")
+        self.assertEqual(result["warm"]["status"], "scored")
+
+    def test_bucket_refills_at_reset(self):
+        auditor = FakeAuditor(remaining=0, reset=time.time() + 600)
+        bucket = RateLimitBucket(auditor)
+        self.assertFalse(bucket.try_acquire(1))
+        auditor.cache.rate_limit["reset"] = time.time() - 1
+        self.assertTrue(bucket.try_acquire(2))
+        self.assertEqual((bucket.tokens, bucket.in_flight), (58, 2))
+
+    def test_overflow_is_rejected(self):
+        with patch.object(batch_auditor, "MAX_BATCH_SIZE", 2):
+            events = list(score_batch(["a", "b", "a", "c", " "], FakeAuditor(remaining=60, reset=time.time() + 600)))
+        result = {e["username"]: e["status"] for e in events if "username" in e}
+        self.assertEqual(result, {"a": "scored", "b": "scored", "c": "rejected"})
+        self.assertEqual(events[-1]["status"], "complete")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+import batch_ranker
+from batch_ranker import rank_applicants
+
+JD = "Python engineer with Kubernetes, PostgreSQL and Kafka."
+TEXTS = {
+    "strong.pdf": "Python services on PostgreSQL, Kafka streaming, deployed on Kubernetes. Python daily.",
+    "medium.pdf": "Python and PostgreSQL developer building REST APIs.",
+    "weak.pdf": "Barista with latte art skills and customer service.",
+    "long.pdf": "Python Kubernetes engineer. " + "Team player who ships features on time. " * 200,
+}
+
+
+def ranked(names):
+    with patch.object(batch_ranker, "extract_resume_text", side_effect=lambda path: TEXTS[path]):
+        events = list(rank_applicants([(name, name) for name in names], JD))
+    return {e["filename"]: e for e in events if e["type"] == "ranked"}
+
+
+class TestBatchRanker(unittest.TestCase):
+
+    def test_ranking_order(self):
+        result = ranked(["weak.pdf", "medium.pdf", "strong.pdf"])
+        order = sorted(result, key=lambda name: result[name]["rank"])
+        self.assertEqual(order, ["strong.pdf", "medium.pdf", "weak.pdf"])
+        self.assertEqual(result["strong.pdf"]["missing_keywords"], [])
+
+    def test_scores_do_not_depend_on_the_pool(self):
+        alone = ranked(["medium.pdf"])["medium.pdf"]["match_score"]
+        with_short = ranked(["medium.pdf", "weak.pdf"])["medium.pdf"]["match_score"]
+        with_long = ranked(["medium.pdf", "long.pdf", "strong.pdf"])["medium.pdf"]["match_score"]
+        self.assertEqual(alone, with_short)
+        self.assertEqual(alone, with_long)
+
+    def test_negative_deep_dive_count_runs_none(self):
+        with patch.object(batch_ranker, "extract_resume_text", side_effect=lambda path: TEXTS[path]), \
+             patch.object(batch_ranker, "analyze_resume") as analyze:
+            events = list(rank_applicants([(name, name) for name in TEXTS], JD, deep_dive_top_n=-1))
+        self.assertEqual(analyze.call_count, 0)
+        self.assertFalse([e for e in events if e["type"] == "deep_dive"])
+
+
+if __name__ == "__main__":
+    unittest.main()
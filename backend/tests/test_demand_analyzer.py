@@ -0,0 +1,43 @@
+import os
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+import demand_analyzer
+from demand_analyzer import get_market_pulse, peek_market_pulse, prune_demand, MarketPulseRefresher
+
+
+class TestDemandTracking(unittest.TestCase):
+
+    def setUp(self):
+        demand_analyzer._demand.clear()
+        demand_analyzer.pulse_cache.clear()
+
+    def test_demand_counts_stay_bounded(self):
+        with patch.object(demand_analyzer, "MARKET_PULSE_DEMAND_KEYS", 5), \
+             patch.object(demand_analyzer, "analyze_market_demand", return_value={"error": "offline"}):
+            for i in range(50):
+                get_market_pulse(f"role {i}")
+        self.assertLessEqual(len(demand_analyzer._demand), 10)
+
+    def test_peek_serves_snapshots_without_computing_or_counting(self):
+        report = {"role": "Backend Engineer", "demand_score": 70}
+        with patch.object(demand_analyzer, "analyze_market_demand", return_value=report) as analyze:
+            self.assertIsNone(peek_market_pulse("Backend Engineer"))
+            self.assertEqual(len(demand_analyzer._demand), 0)
+            get_market_pulse("Backend Engineer")
+            self.assertEqual(peek_market_pulse("backend engineer", "remote")["demand_score"], 70)
+        self.assertEqual(analyze.call_count, 1)
+        self.assertEqual(dict(demand_analyzer._demand), {("backend engineer", "remote"): 1})
+
+    def test_refresh_pass_decays_old_demand(self):
+        demand_analyzer._demand.update({("old", "remote"): 8, ("once", "remote"): 1})
+        with patch.object(demand_analyzer, "analyze_market_demand", return_value={"error": "offline"}):
+            MarketPulseRefresher(popular=2).refresh_once()
+        self.assertEqual(dict(demand_analyzer._demand), {("old", "remote"): 4})
+        prune_demand(keep=0)
+        self.assertEqual(len(demand_analyzer._demand), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import tempfile
+from unittest.mock import patch, MagicMock
+from auditor import GitHubAuditor
+from github_cache import ConditionalCache
+
+
+def fake_response(status, body=None, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.json.return_value = body
+    response.headers = headers or {}
+    return response
+
+
+class TestConditionalCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ConditionalCache(tempfile.mkdtemp())
+        self.auditor = GitHubAuditor(cache=self.cache)
+        self.url = f"{self.auditor.base_url}/users/torvalds"
+
+    @patch('requests.Session.get')
+    def test_fresh_entry_skips_network(self, mock_get):
+        mock_get.return_value = fake_response(200, {"login": "torvalds"}, {"ETag": '"abc"', "X-RateLimit-Remaining": "59"})
+
+        self.assertEqual(self.auditor._safe_get(self.url), {"login": "torvalds"})
+        self.assertEqual(self.auditor._safe_get(self.url), {"login": "torvalds"})
+
+        self.assertEqual(mock_get.call_count, 1)
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["rate_limit"]["remaining"], 59)
+
+    @patch('requests.Session.get')
+    def test_stale_entry_revalidates_with_etag(self, mock_get):
+        mock_get.return_value = fake_response(200, {"login": "torvalds"}, {"ETag": '"abc"'})
+        self.auditor._safe_get(self.url)
+
+        # Expire the entry, then answer the conditional request with 304
+        entry = self.cache.lookup(self.url)
+        entry["stored_at"] = 0
+        self.cache._write(self.cache._path(self.url), entry)
+        mock_get.return_value = fake_response(304)
+
+        self.assertEqual(self.auditor._safe_get(self.url), {"login": "torvalds"})
+        self.assertEqual(mock_get.call_args.kwargs["headers"]["If-None-Match"], '"abc"')
+        self.assertEqual(self.cache.stats()["revalidated"], 1)
+
+    def test_lru_eviction_respects_max_bytes(self):
+        cache = ConditionalCache(tempfile.mkdtemp(), max_bytes=400)
+        for i in range(5):
+            cache.store(f"https://api.github.com/users/u{i}", {"blob": "x" * 100}, {})
+
+        self.assertLessEqual(cache.stats()["disk_bytes"], 400)
+        self.assertIsNone(cache.lookup("https://api.github.com/users/u0"))
+        self.assertIsNotNone(cache.lookup("https://api.github.com/users/u4"))
+
+
+if __name__ == '__main__':
+    unittest.main()
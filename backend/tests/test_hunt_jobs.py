@@ -0,0 +1,61 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from hunt_jobs import LocalJobStore
+from hunt_scheduler import HuntScheduler
+
+
+class TestHuntJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.store = LocalJobStore(os.path.join(tempfile.mkdtemp(), "jobs.db"))
+
+    def test_lease_is_exclusive_until_it_expires(self):
+        self.store.ensure({"id": "u1"}, run_at=0)
+        first = self.store.claim("worker-a", 10, lease_seconds=0.2)
+        self.assertEqual([job["user_id"] for job in first], ["u1"])
+        self.assertEqual(self.store.claim("worker-b", 10, lease_seconds=0.2), [])
+
+        time.sleep(0.3)  # worker-a died without heartbeating
+        second = self.store.claim("worker-b", 10, lease_seconds=60)
+        self.assertEqual([job["user_id"] for job in second], ["u1"])
+        self.assertFalse(self.store.heartbeat("u1", first[0]["run_id"]))
+        self.assertFalse(self.store.complete("u1", first[0]["run_id"], 3600))  # Stale run can't complete
+
+    def test_complete_is_idempotent(self):
+        self.store.ensure({"id": "u1"}, run_at=0)
+        run_id = self.store.claim("worker-a", 10)[0]["run_id"]
+        self.assertTrue(self.store.complete("u1", run_id, 3600))
+        self.assertFalse(self.store.complete("u1", run_id, 0))
+        self.assertEqual(self.store.claim("worker-a", 10), [])  # Next run is an hour away
+        self.assertEqual(self.store.due_count(), 0)
+
+    def test_two_schedulers_share_users_without_double_runs(self):
+        runs, lock = [], threading.Lock()
+
+        def handler(user):
+            time.sleep(0.05)
+            with lock:
+                runs.append(user["id"])
+
+        schedulers = [HuntScheduler(handler, interval=3600, workers=2, initial_spread=0, job_store=self.store,
+                                    worker_id=f"w{i}") for i in range(2)]
+        schedulers[0].sync_users([{"id": f"u{i}"} for i in range(6)])
+        stop = threading.Event()
+        threads = [threading.Thread(target=s.run, args=(stop,), kwargs={"tick": 0.02}) for s in schedulers]
+        for thread in threads:
+            thread.start()
+        deadline = time.time() + 3
+        while len(runs) < 6 and time.time() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.1)
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=2)
+        self.assertEqual(sorted(runs), [f"u{i}" for i in range(6)])
+
+
+if __name__ == "__main__":
+    unittest.main()
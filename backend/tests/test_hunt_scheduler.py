@@ -0,0 +1,105 @@
+import threading
+import time
+import unittest
+from hunt_scheduler import HuntScheduler
+
+
+class TestHuntScheduler(unittest.TestCase):
+
+    def test_users_run_concurrently_and_reschedule(self):
+        runs, lock = [], threading.Lock()
+
+        def handler(user):
+            time.sleep(0.2)
+            with lock:
+                runs.append(user["id"])
+
+        scheduler = HuntScheduler(handler, interval=60, jitter=0, workers=4, initial_spread=0)
+        scheduler.sync_users([{"id": f"u{i}"} for i in range(4)])
+        stop = threading.Event()
+        thread = threading.Thread(target=scheduler.run, args=(stop,), kwargs={"tick": 0.05})
+        started = time.time()
+        thread.start()
+        while len(runs) < 4 and time.time() - started < 2:
+            time.sleep(0.02)
+        elapsed = time.time() - started
+        stop.set()
+        thread.join(timeout=2)
+
+        self.assertEqual(sorted(runs), ["u0", "u1", "u2", "u3"])
+        self.assertLess(elapsed, 0.6)  # Four 0.2s hunts side by side, not 0.8s in a row
+        stats = scheduler.stats()
+        self.assertEqual((stats["completed"], stats["in_flight"], stats["backlog"]), (4, 0, 0))
+
+    def test_shutdown_drains_in_flight_hunts(self):
+        done = threading.Event()
+        scheduler = HuntScheduler(lambda user: (time.sleep(0.3), done.set()), workers=1, initial_spread=0)
+        scheduler.upsert_user({"id": "slow"}, run_at=0)
+        thread = threading.Thread(target=scheduler.run, kwargs={"tick": 0.05})
+        thread.start()
+        time.sleep(0.1)
+        scheduler.stop()
+        thread.join(timeout=2)
+        self.assertTrue(done.is_set())
+        self.assertEqual(scheduler.stats()["in_flight"], 0)
+
+    def test_stuck_hunt_frees_its_worker_slot(self):
+        release, runs = threading.Event(), []
+
+        def handler(user):
+            runs.append(user["id"])
+            if user["id"] == "hung":
+                release.wait(5)
+
+        scheduler = HuntScheduler(handler, workers=1, user_timeout=0.1, initial_spread=0)
+        scheduler.upsert_user({"id": "hung"}, run_at=0)
+        scheduler.upsert_user({"id": "next"}, run_at=0.05)
+        stop = threading.Event()
+        thread = threading.Thread(target=scheduler.run, args=(stop,), kwargs={"tick": 0.05})
+        thread.start()
+        time.sleep(0.5)
+        self.assertEqual(runs, ["hung", "next"])  # "next" ran once "hung" was written off
+        self.assertEqual(scheduler.stats()["timed_out"], 1)
+        release.set()
+        stop.set()
+        thread.join(timeout=2)
+
+    def test_failing_complete_still_frees_the_slot(self):
+        class FlakyStore:
+            def __init__(self):
+                self.claimed = False
+
+            def claim(self, worker_id, limit, lease_seconds):
+                if self.claimed or limit <= 0:
+                    return []
+                self.claimed = True
+                return [{"user_id": "u1", "payload": {"id": "u1"}, "run_id": "r1"}]
+
+            def heartbeat(self, user_id, run_id, lease_seconds):
+                return True
+
+            def complete(self, user_id, run_id, next_run_in):
+                raise ConnectionError("network down")
+
+        scheduler = HuntScheduler(lambda user: None, workers=1, job_store=FlakyStore(), worker_id="w1")
+        stop = threading.Event()
+        thread = threading.Thread(target=scheduler.run, args=(stop,), kwargs={"tick": 0.05})
+        thread.start()
+        time.sleep(0.2)
+        stop.set()
+        thread.join(timeout=2)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(scheduler.stats()["in_flight"], 0)
+
+    def test_stuck_hunts_are_not_heartbeated(self):
+        store = type("Store", (), {"heartbeats": []})()
+        store.heartbeat = lambda user_id, run_id, lease_seconds: store.heartbeats.append(user_id) or True
+        scheduler = HuntScheduler(lambda user: None, job_store=store, lease_seconds=3, worker_id="w1")
+        scheduler._leases = {"stuck": ["r1", 0.0], "busy": ["r2", 0.0]}
+        scheduler._stuck = {"stuck"}
+        scheduler._renew_leases(time.time())
+        self.assertEqual(store.heartbeats, ["busy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
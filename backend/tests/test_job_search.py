@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from job_search import parse_posting, query_key, PostingStore
+
+
+class TestJobSearch(unittest.TestCase):
+
+    def test_parse_greenhouse_and_lever_hits(self):
+        gh = parse_posting({"title": "Job Application for Backend Engineer at Acme",
+                            "link": "https://boards.greenhouse.io/acme-corp/jobs/123?gh_src=x", "snippet": "Python  and AWS"})
+        self.assertEqual(gh, {"title": "Backend Engineer", "company": "Acme Corp",
+                              "url": "https://boards.greenhouse.io/acme-corp/jobs/123", "snippet": "Python and AWS"})
+        lever = parse_posting({"title": "Stripe - Full Stack Engineer", "link": "https://jobs.lever.co/stripe/abc", "snippet": ""})
+        self.assertEqual((lever["title"], lever["company"]), ("Full Stack Engineer", "Stripe"))
+        self.assertEqual(query_key("  Full Stack  Engineer", "Remote"), query_key("full stack engineer", "remote"))
+
+    def test_store_dedupes_by_url(self):
+        store = PostingStore(os.path.join(tempfile.mkdtemp(), "postings.db"))
+        posting = {"title": "Engineer", "company": "Acme", "url": "https://jobs.lever.co/acme/1", "snippet": "v1"}
+        self.assertEqual(store.upsert("k", [posting], now=100.0), 1)
+        self.assertEqual(store.upsert("k", [{**posting, "snippet": "v2"}], now=200.0), 0)
+        rows = store.recent("k", max_age=10 ** 12)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0]["first_seen"], rows[0]["last_seen"], rows[0]["snippet"]), (100.0, 200.0, "v2"))
+        self.assertEqual(store.last_searched("k"), 200.0)
+
+    def test_store_creates_nothing_until_used(self):
+        directory = os.path.join(tempfile.mkdtemp(), "cache")
+        store = PostingStore(os.path.join(directory, "postings.db"))
+        self.assertFalse(os.path.exists(directory))
+        self.assertIsNone(store.last_searched("k"))
+        self.assertTrue(os.path.exists(store.path))
+
+    def test_queries_sharing_a_url_both_see_it(self):
+        store = PostingStore(os.path.join(tempfile.mkdtemp(), "postings.db"))
+        posting = {"title": "Engineer", "company": "Acme", "url": "https://jobs.lever.co/acme/1", "snippet": ""}
+        self.assertEqual(store.upsert("backend|remote", [posting], now=100.0), 1)
+        self.assertEqual(store.upsert("python|remote", [posting], now=200.0), 0)
+        for key, last_seen in (("backend|remote", 100.0), ("python|remote", 200.0)):
+            rows = store.recent(key, max_age=10 ** 12)
+            self.assertEqual([(r["url"], r["first_seen"], r["last_seen"]) for r in rows],
+                             [(posting["url"], 100.0, last_seen)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import market_trends
+from market_trends import MarketHistoryStore, compute_trends
+
+
+def pulse(demand, saturated, trends):
+    return {"demand_score": demand, "saturation_warning": saturated,
+            "key_trends": [{"skill_name": name, "sentiment": sentiment, "evidence": ""} for name, sentiment in trends]}
+
+
+class TestMarketTrends(unittest.TestCase):
+
+    def setUp(self):
+        self.store = MarketHistoryStore(tempfile.mkdtemp())
+        reports = [
+            pulse(60, False, [("LLM Agents", "Stable"), ("jQuery", "Stable")]),
+            pulse(70, False, [("LLM agents", "Rising"), ("jQuery", "Declining")]),
+            pulse(80, True, [("LLM Agents", "Rising"), ("jQuery", "Saturated"), ("Rust", "Rising")]),
+        ]
+        for i, report in enumerate(reports):
+            self.store.append("Backend Engineer", "Remote", report, ts=1000.0 + i)
+
+    def test_rolling_demand(self):
+        trends = compute_trends(self.store.load("backend engineer", "remote"), window=2)
+        self.assertEqual(trends["points"], 3)
+        self.assertEqual([p["demand_ma"] for p in trends["series"]], [60.0, 65.0, 75.0])
+        self.assertEqual(trends["latest"]["demand_delta"], 10.0)
+        self.assertEqual(trends["latest"]["saturation_rate"], 0.5)
+
+    def test_skill_momentum(self):
+        skills = {s["skill"]: s for s in compute_trends(self.store.load("Backend Engineer", "Remote"), window=2)["skills"]}
+        self.assertEqual(skills["llm agents"]["mentions"], 3)
+        self.assertGreater(skills["llm agents"]["momentum"], 0)
+        self.assertLess(skills["jquery"]["momentum"], 0)
+        self.assertEqual(skills["rust"]["mentions"], 1)
+
+    def test_keys_collapse_whitespace(self):
+        self.assertEqual(len(self.store.load("  backend   engineer ", " Remote")["ts"]), 3)
+
+    def test_compaction_keeps_newest_reports(self):
+        with patch.object(market_trends, "MARKET_HISTORY_COMPACT_EVERY", 2), \
+             patch.object(market_trends, "MARKET_HISTORY_MAX_REPORTS", 2):
+            self.store.append("Backend Engineer", "Remote", pulse(90, False, [("Go", "Rising")]), ts=1003.0)
+        columns = self.store.load("Backend Engineer", "Remote")
+        self.assertEqual(columns["ts"].tolist(), [1002.0, 1003.0])
+        self.assertEqual(sorted(columns["skill_names"][columns["skill"][columns["report"] == 1]]), ["go"])
+        self.assertEqual(compute_trends(columns)["latest"]["demand_score"], 90)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from merkle_ledger import MerkleLedger, leaf_hash, node_hash
+
+
+def reference_root(leaves):
+    """RFC 6962 Merkle Tree Hash, computed the slow recursive way."""
+    if len(leaves) == 1:
+        return leaves[0]
+    k = 1
+    while k * 2 < len(leaves):
+        k *= 2
+    return node_hash(reference_root(leaves[:k]), reference_root(leaves[k:]))
+
+
+class TestMerkleLedger(unittest.TestCase):
+
+    def test_root_matches_reference_and_every_proof_verifies(self):
+        ledger = MerkleLedger(path=None)
+        leaves = []
+        for n in range(1, 20):
+            ledger.append(f"id-{n}", f"2025-01-{n:02d}T00:00:00")
+            leaves.append(leaf_hash(f"id-{n}", f"2025-01-{n:02d}T00:00:00"))
+
+            root = ledger.root()
+            self.assertEqual(root, reference_root(leaves))
+            for i in range(1, n + 1):
+                proof = ledger.prove(f"id-{i}")
+                self.assertTrue(MerkleLedger.verify(proof["leaf"], proof["path"], root))
+
+    def test_tampered_leaf_fails_verification(self):
+        ledger = MerkleLedger(path=None)
+        for n in range(5):
+            ledger.append(f"id-{n}", "2025-01-01")
+        proof = ledger.prove("id-2")
+        forged = leaf_hash("id-2", "2030-01-01")
+        self.assertFalse(MerkleLedger.verify(forged, proof["path"], proof["root"]))
+
+    def test_append_is_idempotent_and_persisted(self):
+        path = os.path.join(tempfile.mkdtemp(), "ledger.jsonl")
+        ledger = MerkleLedger(path=path)
+        ledger.sync([{"id": "b", "created_at": "2025-01-02"}, {"id": "a", "created_at": "2025-01-01"}])
+        ledger.append("a", "2025-01-01")
+
+        self.assertEqual(len(ledger), 2)
+        self.assertEqual(ledger.prove("a")["leaf_index"], 0)
+
+        reloaded = MerkleLedger(path=path)
+        self.assertEqual(reloaded.root(), ledger.root())
+
+    def test_reload_skips_duplicate_ids(self):
+        path = os.path.join(tempfile.mkdtemp(), "ledger.jsonl")
+        first, second = MerkleLedger(path=path), MerkleLedger(path=path)
+        first.append("a", "2025-01-01")
+        second.append("a", "2025-01-01")  # Another process, same record: the file now has it twice
+        first.append("b", "2025-01-02")
+
+        reloaded = MerkleLedger(path=path)
+        self.assertEqual(len(reloaded), 2)
+        self.assertEqual(reloaded.root(), first.root())
+        self.assertTrue(MerkleLedger.verify(reloaded.leaf("b"), reloaded.prove("b")["path"], first.root()))
+
+    def test_root_is_independent_of_arrival_order(self):
+        in_order, out_of_order = MerkleLedger(path=None), MerkleLedger(path=None)
+        records = [(f"id-{n}", f"2025-01-{n:02d}") for n in range(1, 8)]
+        for record_id, created_at in records:
+            in_order.append(record_id, created_at)
+        for record_id, created_at in reversed(records):
+            out_of_order.append(record_id, created_at)
+        self.assertEqual(out_of_order.root(), in_order.root())
+        self.assertEqual(out_of_order.prove("id-3")["leaf_index"], 2)
+
+    def test_proofs_verify_against_an_earlier_root(self):
+        ledger = MerkleLedger(path=None)
+        for n in range(1, 4):
+            ledger.append(f"id-{n}", f"2025-01-0{n}")
+        signed = ledger.head()
+        for n in range(4, 12):
+            ledger.append(f"id-{n}", f"2025-01-{n:02d}")
+
+        for n in range(1, 4):
+            proof = ledger.prove(f"id-{n}", signed["size"])
+            self.assertEqual(proof["root"], signed["root"])
+            self.assertTrue(MerkleLedger.verify(proof["leaf"], proof["path"], signed["root"]))
+        self.assertIsNone(ledger.prove("id-5", signed["size"]))  # Not in the tree that was signed
+        self.assertEqual(ledger.prove("id-5", 7)["root"], reference_root([leaf_hash(f"id-{n}", f"2025-01-{n:02d}") for n in range(1, 8)]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+from concurrent.futures import Future
+from unittest.mock import patch
+
+from ocr_service import OCRService
+
+
+def done(result=None, error=None):
+    future = Future()
+    future.set_exception(error) if error else future.set_result(result)
+    return future
+
+
+class TestOCRService(unittest.TestCase):
+
+    def test_one_failing_page_does_not_drop_the_document(self):
+        service = OCRService(workers=1)
+        pages = {1: done("page one"), 2: done(error=RuntimeError("tesseract crashed")), 3: done("page three")}
+        with patch.object(service, "_submit", side_effect=lambda path, n, *args: pages[n]):
+            results = service.ocr_pages("resume.pdf", [1, 2, 3])
+        self.assertEqual(results, {1: "page one", 3: "page three"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+from posting_fingerprints import FingerprintIndex, normalize_key, simhash, hamming, SIMHASH_MAX_DISTANCE
+
+
+DESCRIPTION = ("Acme is hiring a backend engineer to build payment APIs in Python and PostgreSQL. "
+               "You will own services end to end, work with Kafka and Kubernetes, and mentor junior engineers "
+               "on a small remote team shipping weekly to millions of merchants.")
+REWORDED = DESCRIPTION.replace("shipping weekly", "shipping every week").replace("a small", "one small")
+OTHER = ("Beta builds mobile games in Unity and C#. We want a gameplay programmer who loves physics, "
+         "animation systems and rapid prototyping with designers in our Berlin studio.")
+
+
+class TestPostingFingerprints(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FingerprintIndex(os.path.join(tempfile.mkdtemp(), "fp.db"))
+
+    def test_normalized_key(self):
+        self.assertEqual(normalize_key("Acme, Inc.", "Sr. Backend Engineer (Remote)"), normalize_key("acme", "Backend Engineer"))
+
+    def test_simhash_separates_reworded_from_different(self):
+        self.assertLessEqual(hamming(simhash(DESCRIPTION), simhash(REWORDED)), SIMHASH_MAX_DISTANCE)
+        self.assertGreater(hamming(simhash(DESCRIPTION), simhash(OTHER)), SIMHASH_MAX_DISTANCE)
+
+    def test_duplicates_are_per_user(self):
+        self.index.add("u1", "Acme", "Backend Engineer", DESCRIPTION)
+        self.assertIsNotNone(self.index.find_duplicate("u1", "Acme Inc", "Senior Backend Engineer", ""))
+        self.assertIsNotNone(self.index.find_duplicate("u1", "Acme Payments", "Software Engineer, Payments", REWORDED))
+        self.assertIsNone(self.index.find_duplicate("u1", "Beta", "Gameplay Programmer", OTHER))
+        self.assertIsNone(self.index.find_duplicate("u2", "Acme", "Backend Engineer", DESCRIPTION))
+
+
+if __name__ == "__main__":
+    unittest.main()
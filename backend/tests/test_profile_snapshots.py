@@ -0,0 +1,45 @@
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import profile_snapshots
+from profile_snapshots import SnapshotStore, _on_passport_event, materialize_snapshot
+
+
+class TestProfileSnapshots(unittest.TestCase):
+
+    def test_misses_are_cached_until_published(self):
+        store = SnapshotStore(snapshot_dir=tempfile.mkdtemp())
+        fake_db = MagicMock(enabled=True)
+        fake_db.supabase.table.return_value.select.return_value.eq.return_value.limit.return_value.execute.return_value.data = []
+        with patch.object(profile_snapshots, "db_manager", fake_db):
+            self.assertIsNone(store.get("ghost"))
+            self.assertIsNone(store.get("ghost"))
+            self.assertEqual(fake_db.supabase.table.call_count, 1)
+            store.write("ghost", {"candidate_id": "ghost", "recent_achievements": []})
+            self.assertEqual(store.get("ghost")["document"]["candidate_id"], "ghost")
+
+    def test_global_invalidation_rebuilds_nothing(self):
+        with patch.object(profile_snapshots.snapshot_store, "schedule_rebuild") as rebuild:
+            _on_passport_event("invalidated", None, None)
+        rebuild.assert_not_called()
+
+    def test_degraded_mint_is_not_published(self):
+        with patch.object(profile_snapshots, "_mint_skill_passport", return_value=({"github_trust_score": 0}, False)), \
+             patch.object(profile_snapshots.snapshot_store, "write") as write:
+            self.assertIn("error", materialize_snapshot("alice"))
+        write.assert_not_called()
+
+    def test_memory_copy_expires(self):
+        directory = tempfile.mkdtemp()
+        mine, other = SnapshotStore(snapshot_dir=directory), SnapshotStore(snapshot_dir=directory)
+        mine.write("alice", {"candidate_id": "alice", "github_trust_score": 50, "recent_achievements": []})
+        self.assertEqual(other.get("alice")["document"]["github_trust_score"], 50)
+        mine.write("alice", {"candidate_id": "alice", "github_trust_score": 70, "recent_achievements": []})
+        self.assertEqual(other.get("alice")["document"]["github_trust_score"], 50)  # Still within its TTL
+        other._memory["alice"] = (0, other._memory["alice"][1])  # TTL elapsed
+        self.assertEqual(other.get("alice")["document"]["github_trust_score"], 70)
+
+
+if __name__ == "__main__":
+    unittest.main()
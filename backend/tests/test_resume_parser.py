@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pymupdf
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+import resume_parser
+from resume_cache import text_cache, file_digest
+
+
+class TestResumeParser(unittest.TestCase):
+
+    def setUp(self):
+        # Two pages without a text layer: both need OCR
+        self.path = os.path.join(tempfile.mkdtemp(), "scan.pdf")
+        with pymupdf.open() as doc:
+            doc.new_page()
+            doc.new_page()
+            doc.save(self.path)
+        text_cache.invalidate(file_digest(self.path))
+
+    def test_partial_ocr_is_not_cached(self):
+        page = "Senior engineer. Python, PostgreSQL and Kubernetes. " * 3
+        with patch.object(resume_parser.ocr_service, "ocr_pages", return_value={1: page}):
+            text = resume_parser.extract_resume_text(self.path)
+        self.assertIn("Python", text)
+        self.assertIsNone(text_cache.get(file_digest(self.path)))
+
+        with patch.object(resume_parser.ocr_service, "ocr_pages", return_value={1: page, 2: page}):
+            resume_parser.extract_resume_text(self.path)
+        self.assertIn("--- Page 2 ---", text_cache.get(file_digest(self.path)))
+
+    def test_ocr_cap_does_not_drop_text_layer_pages(self):
+        # 12 born-digital pages followed by 2 scans; the OCR cap of 1 must only apply to the scans
+        path = os.path.join(tempfile.mkdtemp(), "long.pdf")
+        with pymupdf.open() as doc:
+            for n in range(1, 13):
+                line = f"Page {n}: shipped Python services on PostgreSQL and Kafka for the payments platform team."
+                doc.new_page().insert_text((72, 72), line + " Mentored two engineers.")
+            doc.new_page()
+            doc.new_page()
+            doc.save(path)
+        with patch.object(resume_parser.ocr_service, "ocr_pages", return_value={13: "scanned"}) as ocr:
+            result = resume_parser.extract_text_hybrid(path, max_pages=1)
+        ocr.assert_called_once_with(path, [13])
+        self.assertIn("Page 12:", result["text"])
+        self.assertEqual((result["pages_total"], result["pages_text_layer"], result["pages_ocr"]), (14, 12, 1))
+        self.assertEqual(result["pages_skipped"], 1)
+        self.assertTrue(result["complete"])
+
+
+if __name__ == "__main__":
+    unittest.main()
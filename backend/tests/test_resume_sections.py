@@ -0,0 +1,49 @@
+import unittest
+from resume_sections import segment_resume, select_sections, apply_edits
+
+
+RESUME = """Jane Doe
+jane@example.com
+Summary
+Backend engineer working in Python and AWS.
+Experience
+Acme Corp
+Senior Engineer  Jan 2020 - Present
+- Built Kafka pipelines in Python on AWS
+- Moved the fleet to Kubernetes
+Beta Inc  2017 – 2019
+- Maintained PHP templates
+Skills
+Python, Docker, Kafka, React
+Education
+BSc Computer Science 2013 - 2017
+"""
+
+JD = "Python engineer with Kafka, AWS and Kubernetes experience."
+
+
+class TestResumeSections(unittest.TestCase):
+
+    def test_experience_split_per_entry(self):
+        sections = {s.section_id: s for s in segment_resume(RESUME)}
+        self.assertEqual(list(sections), ["header-1", "summary-1", "experience-1", "experience-2", "skills-1", "education-1"])
+        self.assertTrue(sections["experience-1"].content.startswith("Acme Corp"))
+        self.assertTrue(sections["experience-2"].content.startswith("Beta Inc"))
+
+    def test_selection_respects_budget_and_relevance(self):
+        chosen = [s.section_id for s in select_sections(segment_resume(RESUME), JD, token_budget=45)]
+        self.assertEqual(chosen, ["summary-1", "experience-1"])
+
+    def test_edits_tolerate_whitespace_and_skip_misses(self):
+        content = "- Built Kafka pipelines\n  in Python on AWS"
+        tailored, applied = apply_edits(content, [
+            ("Built Kafka pipelines in Python", "Designed streaming Kafka pipelines in Python"),
+            ("Invented by the model", "anything"),
+            ("", "never inserted"),
+        ])
+        self.assertEqual(applied, 1)
+        self.assertEqual(tailored, "- Designed streaming Kafka pipelines in Python on AWS")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+import roadmap_generator
+from roadmap_generator import SkillModule, DailyTask, pack_weeks, target_level, generate_learning_roadmap, stream_learning_roadmap
+
+
+def module(theme, hours):
+    return SkillModule(theme=theme, goal=f"Pass {theme}", tasks=[
+        DailyTask(day_title=f"{theme} {i}", task_description="Do it.", resource_link="https://docs.example", estimated_hours=h)
+        for i, h in enumerate(hours)
+    ])
+
+
+class TestRoadmapGenerator(unittest.TestCase):
+
+    def setUp(self):
+        roadmap_generator.module_cache.clear()
+
+    def test_weeks_are_packed_by_estimated_hours(self):
+        modules = [{"skill": "sql", **module("SQL", [6, 6, 6]).dict()}, {"skill": "go", **module("Go", [4, 20]).dict()}]
+        weeks = pack_weeks(modules, hours_per_week=15)
+        self.assertEqual([len(w["daily_plan"]) for w in weeks], [2, 2, 1])
+        self.assertEqual(weeks[1]["theme"], "SQL + Go")
+        self.assertEqual(weeks[1]["goal"], "Pass SQL")  # Go isn't finished until week 3
+        self.assertEqual(weeks[2]["goal"], "Pass Go")   # An oversized task gets its own week
+        self.assertEqual([w["week_number"] for w in weeks], [1, 2, 3])
+
+    def test_modules_are_cached_per_skill_and_level(self):
+        structured = MagicMock()
+        structured.invoke.side_effect = lambda messages: module(messages[1].content.split(": ")[1], [5])
+        with patch.object(roadmap_generator, "llm") as llm:
+            llm.with_structured_output.return_value = structured
+            first = generate_learning_roadmap(["PostgreSQL Indexing", "Redis"], "Backend Engineer")
+            second = generate_learning_roadmap([" postgresql  indexing", "Kafka"], "Backend Engineer")
+            generate_learning_roadmap(["PostgreSQL Indexing"], "Senior Backend Engineer")
+
+        self.assertEqual(structured.invoke.call_count, 4)  # Indexing, Redis, Kafka, Senior Indexing
+        self.assertEqual((first["candidate_level"], first["total_weeks"]), ("Mid", 1))
+        self.assertEqual(second["roadmap"][0]["theme"], "PostgreSQL Indexing + Kafka")
+        self.assertEqual(target_level("Sr. Platform Engineer"), "Senior")
+
+    def test_stream_drops_a_module_that_fails_midway(self):
+        sql, go = module("SQL", [6, 6]).dict(), module("Go", [4]).dict()
+
+        def fake_stream(skill, level):
+            if skill == "SQL":
+                yield "task", sql["tasks"][0]  # Written, then the stream breaks
+                yield "done", None
+                return
+            for task in go["tasks"]:
+                yield "task", task
+            yield "done", {"skill": skill, **go}
+
+        with patch.object(roadmap_generator, "stream_skill_module", side_effect=fake_stream), \
+             patch.object(roadmap_generator, "generate_skill_module",
+                          side_effect=lambda skill, level: None if skill == "SQL" else {"skill": skill, **go}):
+            events = list(stream_learning_roadmap(["SQL", "Go"], "Backend Engineer"))
+            blocking = generate_learning_roadmap(["SQL", "Go"], "Backend Engineer")
+
+        weeks = [{k: v for k, v in e.items() if k != "type"} for e in events if e["type"] == "week"]
+        self.assertEqual(weeks, blocking["roadmap"])
+        self.assertEqual(events[-1]["failed_skills"], ["SQL"])
+
+
+if __name__ == "__main__":
+    unittest.main()
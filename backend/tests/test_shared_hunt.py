@@ -0,0 +1,63 @@
+import os
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+import job_fetcher
+from job_fetcher import PostingExtraction, ExtractedPosting, score_posting_for_user, match_shared_postings
+
+
+POSTINGS = [
+    {"title": "Platform Engineer", "company": "Acme", "url": "https://jobs.lever.co/acme/1", "snippet": "k8s, Go", "first_seen": 1.0},
+    {"title": "Backend Engineer", "company": "Beta", "url": "https://jobs.lever.co/beta/2", "snippet": "Python", "first_seen": 2.0},
+]
+EXTRACTION = PostingExtraction(postings=[
+    ExtractedPosting(posting_number=0, role_title="Platform Engineer", company="Acme",
+                     required_skills=["Kubernetes", "Go", "Terraform"], summary="Infra team."),
+    ExtractedPosting(posting_number=1, role_title="Backend Engineer", company="Beta",
+                     required_skills=["Python", "PostgreSQL"], summary="Payments API."),
+])
+
+
+class TestSharedHunt(unittest.TestCase):
+
+    def setUp(self):
+        job_fetcher.extraction_cache.clear()
+
+    def test_gap_on_main_requirement_sinks_the_score(self):
+        posting = {"role_title": "Platform Engineer", "company": "Acme", "url": "u", "summary": "",
+                   "required_skills": ["Kubernetes", "Go", "Terraform"]}
+        blocked = score_posting_for_user(posting, ["k8s"])
+        clear = score_posting_for_user(posting, ["GraphQL"])
+        self.assertEqual((blocked["match_score"], clear["match_score"]), (50, 100))
+        self.assertIn("kubernetes", blocked["cautionary_warning"])
+        self.assertIsNone(clear["cautionary_warning"])
+
+    def test_users_with_same_query_share_one_extraction(self):
+        structured = MagicMock()
+        structured.invoke.return_value = EXTRACTION
+        with patch.object(job_fetcher, "find_postings", return_value=POSTINGS) as search, \
+             patch.object(job_fetcher, "llm") as llm:
+            llm.with_structured_output.return_value = structured
+            results = {}
+
+            def hunt(name, role, gaps):
+                results[name] = match_shared_postings(role, gaps, "Remote")
+
+            threads = [threading.Thread(target=hunt, args=("a", "Backend Engineer", ["Kubernetes"])),
+                       threading.Thread(target=hunt, args=("b", "  backend engineer ", ["Python"]))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(search.call_count, 1)
+        self.assertEqual(structured.invoke.call_count, 1)
+        self.assertEqual(results["a"]["opportunities"][0]["company"], "Beta")  # Gap on Acme's main skill
+        self.assertEqual(results["b"]["opportunities"][0]["company"], "Acme")  # Gap on Beta's main skill
+        self.assertEqual(results["a"]["opportunities"][0]["apply_link_guess"], "https://jobs.lever.co/beta/2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from unittest.mock import patch
+
+import skill_passport
+from skill_passport import get_skill_passport, passport_cache, on_challenge_passed
+
+
+class TestSkillPassport(unittest.TestCase):
+
+    def setUp(self):
+        passport_cache.clear()
+        self.events = []
+        skill_passport._passport_listeners.append(lambda event, name, passport: self.events.append((event, name)))
+
+    def tearDown(self):
+        skill_passport._passport_listeners.pop()
+
+    def test_degraded_mint_is_neither_cached_nor_announced(self):
+        offline = {"error": "User not found or Auditor Offline", "trust_score": 0}
+        with patch.object(skill_passport.auditor, "calculate_trust_score", return_value=offline) as audit:
+            first = get_skill_passport("octocat")
+            get_skill_passport("octocat")
+        self.assertEqual(first["github_trust_score"], 0)
+        self.assertEqual(audit.call_count, 2)
+        self.assertEqual(self.events, [])
+
+        with patch.object(skill_passport.auditor, "calculate_trust_score", return_value={"trust_score": 80}) as audit:
+            get_skill_passport("octocat")
+            get_skill_passport("octocat")
+        self.assertEqual(audit.call_count, 1)
+        self.assertEqual(self.events, [("minted", "octocat")])
+
+    def test_pass_only_invalidates_the_passers_passports(self):
+        passport_cache.set(("alice", ""), {"candidate_id": "alice"})
+        passport_cache.set(("bob", ""), {"candidate_id": "bob"})
+        with patch.object(skill_passport, "handles_of", return_value=["Alice"]):
+            on_challenge_passed("user-1")
+        self.assertIsNone(passport_cache.get(("alice", "")))
+        self.assertIsNotNone(passport_cache.get(("bob", "")))
+
+
+if __name__ == "__main__":
+    unittest.main()
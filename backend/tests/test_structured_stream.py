@@ -0,0 +1,93 @@
+import json
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from pydantic import ValidationError
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+import roadmap_generator
+from structured_stream import JsonStreamParser, stream_structured
+from job_fetcher import JobHuntReport, JobOpportunity
+
+
+class FakeStreamingLLM:
+    """Streams a fixed JSON answer in small chunks, like a chat model's token stream."""
+
+    def __init__(self, answer_for, chunk_size=7):
+        self.answer_for = answer_for
+        self.chunk_size = chunk_size
+        self.calls = 0
+
+    def stream(self, messages):
+        self.calls += 1
+        text = "```json\n" + json.dumps(self.answer_for(messages)) + "\n```"
+        for i in range(0, len(text), self.chunk_size):
+            yield SimpleNamespace(content=text[i:i + self.chunk_size])
+
+
+def opportunity(company, score):
+    return {"role_title": "Backend Engineer", "company": company, "match_score": score,
+            "why_good_fit": "Python, \"APIs\" [remote]", "cautionary_warning": None, "apply_link_guess": "https://x/y"}
+
+
+class TestStructuredStream(unittest.TestCase):
+
+    def test_parser_emits_elements_as_they_close(self):
+        document = {"title": "T, {x}", "items": [{"a": [1, {"b": "]"}]}, "s", 3], "n": -1.5, "ok": True}
+        text = json.dumps(document)
+        parser, seen = JsonStreamParser(), []
+        for i, char in enumerate(text):
+            for event in parser.feed(char):
+                seen.append((event, i))
+        events = [event for event, _ in seen]
+        self.assertEqual(events[:4], [("field", "title", "T, {x}"), ("item", "items", {"a": [1, {"b": "]"}]}),
+                                      ("item", "items", "s"), ("item", "items", 3)])
+        self.assertIn(("field", "ok", True), events)
+        # The first element is out before the next one has even started
+        self.assertLess(seen[1][1], text.index('"s"'))
+        self.assertEqual(parser.document(), document)
+
+    def test_validated_items_then_document(self):
+        answer = {"opportunities": [opportunity("Acme", 90), opportunity("Beta", 60)], "strategic_advice": "Acme first."}
+        events = list(stream_structured(FakeStreamingLLM(lambda m: answer), JobHuntReport, [],
+                                        items={"opportunities": JobOpportunity}))
+        self.assertEqual([(e[0], e[2].company) for e in events[:2]], [("item", "Acme"), ("item", "Beta")])
+        self.assertEqual(events[2], ("field", "strategic_advice", "Acme first."))
+        self.assertEqual(events[3][0], "done")
+        self.assertEqual(events[3][2].dict(), answer)
+
+        # An invalid element is skipped as it streams, and the final document fails validation
+        answer["opportunities"].insert(1, {"company": "Broken"})
+        events = []
+        with self.assertRaises(ValidationError):
+            for event in stream_structured(FakeStreamingLLM(lambda m: answer), JobHuntReport, [],
+                                           items={"opportunities": JobOpportunity}):
+                events.append(event)
+        self.assertEqual([e[2].company for e in events if e[0] == "item"], ["Acme", "Beta"])
+
+    def test_streamed_roadmap_matches_blocking_roadmap(self):
+        def module_for(messages):
+            skill = messages[-1].content.split(": ")[1]
+            return {"theme": skill, "goal": f"Pass {skill}", "tasks": [
+                {"day_title": f"{skill} {i}", "task_description": "Do it.", "resource_link": "https://docs", "estimated_hours": 6}
+                for i in range(3)]}
+
+        roadmap_generator.module_cache.clear()
+        llm = FakeStreamingLLM(module_for)
+        with patch.object(roadmap_generator, "llm", llm):
+            events = list(roadmap_generator.stream_learning_roadmap(["SQL", "Redis", "sql"], "Backend Engineer"))
+            replay = list(roadmap_generator.stream_learning_roadmap(["Redis"], "Backend Engineer"))
+
+        weeks = [e for e in events if e["type"] == "week"]
+        modules = [roadmap_generator.module_cache.get(("sql", "Mid")), roadmap_generator.module_cache.get(("redis", "Mid"))]
+        expected = roadmap_generator.pack_weeks(modules)
+        self.assertEqual([{k: v for k, v in w.items() if k != "type"} for w in weeks], expected)
+        self.assertEqual(events[-1], {"type": "complete", "candidate_level": "Mid", "total_weeks": 3, "failed_skills": []})
+        self.assertEqual(llm.calls, 2)  # Duplicate gap merged; the replay came from the cache
+        self.assertEqual(replay[-1]["total_weeks"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,13 @@
 import unittest
+import tempfile
 from unittest.mock import patch, MagicMock
 from auditor import GitHubAuditor
+from github_cache import ConditionalCache
 import requests
 
 class TestAuditorResilience(unittest.TestCase):
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_auditor_handles_offline_mode(self, mock_get):
         """
         Simulate a total network failure (Wi-Fi off).
@@ -15,7 +17,7 @@ class TestAuditorResilience(unittest.TestCase):
         # 1. Force requests.get to raise a Connection Error (like pulling the plug)
         mock_get.side_effect = requests.exceptions.ConnectionError("No Internet Connection")
         
-        auditor = GitHubAuditor()
+        auditor = GitHubAuditor(cache=ConditionalCache(tempfile.mkdtemp()))
         
         # 2. Attempt to calculate trust score
         result = auditor.calculate_trust_score("torvalds")
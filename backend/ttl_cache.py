@@ -0,0 +1,90 @@
+# backend/ttl_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU cache with per-entry expiry.
+    Shared building block for the engines that memoize expensive GitHub / LLM / search results.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024, name: str = "cache"):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.time():
+                if item is not None:
+                    del self._data[key]
+                self.counters["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self.counters["hits"] += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Returns the cached value or computes it once.
+        Concurrent callers for the same key wait for the first computation instead of repeating it.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            value = self.get(key)
+            if value is None:
+                value = compute()
+                if value is not None:
+                    self.set(key, value, ttl)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def invalidate(self, key: Hashable) -> bool:
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.counters["invalidations"] += 1
+                return True
+            return False
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drops every entry whose key matches predicate. Returns how many were removed."""
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                del self._data[key]
+            self.counters["invalidations"] += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        self.invalidate_where(lambda key: True)
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"name": self.name, "entries": len(self._data), **self.counters}
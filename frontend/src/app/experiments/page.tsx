@@ -68,24 +68,19 @@ export default function ExperimentsPage() {
         {/* RESULTS */}
         {result && !result.error && (
             <div className="grid grid-cols-1 md:grid-cols-2 gap-8">
-                {/* VARIANT A */}
-                <div className="border border-blue-500 rounded p-4 bg-gray-900/50">
-                    <h2 className="text-xl font-bold text-blue-400 mb-2">Variant A: {result.variant_a.variant_name}</h2>
-                    <p className="text-sm text-gray-400 mb-4 h-12">{result.variant_a.strategy_explanation}</p>
-                    <div className="bg-white text-black p-4 rounded h-96 overflow-y-auto whitespace-pre-wrap text-xs">
-                        {result.variant_a.tailored_content}
+                {/* VARIANTS (one card per generated strategy; failed ones are listed in result.failed) */}
+                {result.variants.map((variant: any, i: number) => (
+                    <div key={variant.strategy} className={`border ${i % 2 ? "border-purple-500" : "border-blue-500"} rounded p-4 bg-gray-900/50`}>
+                        <h2 className={`text-xl font-bold ${i % 2 ? "text-purple-400" : "text-blue-400"} mb-2`}>
+                            Variant {String.fromCharCode(65 + i)}: {variant.variant_name} ({variant.match_score}/100)
+                        </h2>
+                        <p className="text-sm text-gray-400 mb-4 h-12">{variant.strategy_explanation}</p>
+                        <div className="bg-white text-black p-4 rounded h-96 overflow-y-auto whitespace-pre-wrap text-xs">
+                            {variant.tailored_content}
+                        </div>
                     </div>
-                </div>
+                ))}
 
-                {/* VARIANT B */}
-                <div className="border border-purple-500 rounded p-4 bg-gray-900/50">
-                    <h2 className="text-xl font-bold text-purple-400 mb-2">Variant B: {result.variant_b.variant_name}</h2>
-                    <p className="text-sm text-gray-400 mb-4 h-12">{result.variant_b.strategy_explanation}</p>
-                    <div className="bg-white text-black p-4 rounded h-96 overflow-y-auto whitespace-pre-wrap text-xs">
-                        {result.variant_b.tailored_content}
-                    </div>
-                </div>
-                
                 <div className="md:col-span-2 bg-green-900/30 border border-green-500 p-4 rounded text-center">
                     <h3 className="text-green-400 font-bold uppercase tracking-widest">AI Recommendation</h3>
                     <p className="text-xl mt-2">{result.recommendation}</p>
@@ -55,7 +55,7 @@ export default function ResumePage() {
       
       // Backend returns "analysis" string or object. Mapping it:
       setAuditRes({
-        score: data.analysis.score || 65, // Fallback if mocked
+        score: data.analysis.match_score ?? data.analysis.score ?? 65, // Local ATS score; fallback if mocked
         critiques: data.analysis.critiques || ["Bullet points lack quantifiable metrics."],
         red_flags: data.analysis.red_flags || ["Formatting inconsistencies detected."],
         missing_keywords: data.analysis.missing_keywords || ["Docker", "Kubernetes"]
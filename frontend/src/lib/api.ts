@@ -118,6 +118,7 @@ export interface TailoredResume {
     original_content: string;
     tailored_content: string;
     reasoning: string;
+    diff?: string;
   }>;
   email_cover_letter_draft: string;
 }
@@ -153,6 +154,36 @@ export const huntJobs = async (target_role: string, location: string = "Remote",
   return res.json();
 };
 
+// NDJSON streams (?stream=true): calls onEvent for every line as soon as it arrives
+export const readNdjson = async (res: Response, onEvent: (event: any) => void): Promise<void> => {
+  const reader = res.body!.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop() || "";
+    lines.filter((line) => line.trim()).forEach((line) => onEvent(JSON.parse(line)));
+  }
+  if (buffer.trim()) onEvent(JSON.parse(buffer));
+};
+
+// Events: {type: "opportunity", ...}, then {type: "complete", strategic_advice}
+export const huntJobsStream = async (target_role: string, location: string, skill_gaps: string[], onEvent: (event: any) => void): Promise<void> => {
+  const res = await fetch(`${API_BASE}/career/hunt?stream=true`, {
+    method: "POST",
+    headers: {
+        "Content-Type": "application/json",
+        ...(await getAuthHeaders())
+    },
+    body: JSON.stringify({ target_role, location, current_skill_gaps: skill_gaps }),
+  });
+  if (!res.ok) throw new Error("Failed to hunt jobs");
+  await readNdjson(res, onEvent);
+};
+
 export const getMarketDemand = async (role: string, location: string = "Global"): Promise<any> => {
   const res = await fetch(`${API_BASE}/career/demand`, {
     method: "POST",